@@ -1,16 +1,21 @@
 # Executor Agent
-from tools.summarizer import LLMProcessor
+from tools.summarizer import get_llm_processor
 from tools.pdf_parser import PDFParserTool
 from datetime import datetime
+import asyncio
 import uuid
+from core.log import get_logger, fields
+from config import FILE_READ_MAX_CHARS
+
+logger = get_logger("executor")
 
 class ExecutorAgent:
     def __init__(self):
-        self.llm_processor = LLMProcessor()
+        self.llm_processor = get_llm_processor()
         self.pdf_parser = PDFParserTool()
         self.results = {}
     
-    def execute(self, intent: dict, event_data: dict) -> dict:
+    async def execute(self, intent: dict, event_data: dict) -> dict:
         """Execute workflow based on user query using LLM"""
         result_id = str(uuid.uuid4())
         
@@ -18,7 +23,7 @@ class ExecutorAgent:
         workflow_config = event_data.get('workflow_config', {})
         user_query = workflow_config.get('query', '')
         
-        result = self._process_with_llm(user_query, event_data)
+        result = await self._process_with_llm(user_query, event_data)
         
         # Store result
         result['id'] = result_id
@@ -28,13 +33,13 @@ class ExecutorAgent:
         
         return result
     
-    def _process_with_llm(self, user_query: str, event_data: dict) -> dict:
+    async def _process_with_llm(self, user_query: str, event_data: dict) -> dict:
         """Process any event using LLM based on user query"""
-        print(f"📝 User Query: {user_query}")
+        logger.debug("Executing query", extra=fields(query=user_query))
         
         # Extract content based on event type
-        content = self._extract_content(event_data)
-        print(f"📜 Extracted Content: {content[:200]}...")
+        content = await asyncio.to_thread(self._extract_content, event_data)
+        logger.debug("Extracted content", extra=fields(chars=len(content), content=content))
         
         if not content:
             return {
@@ -44,9 +49,12 @@ class ExecutorAgent:
             }
         
         # Use LLM to process content based on user query
-        result = self.llm_processor.process_with_query(content, user_query)
+        workflow_config = event_data.get('workflow_config', {})
+        result = await self.llm_processor.process_with_query(
+            content, user_query, workflow_config.get('chunk_size'), workflow_config.get('max_parallel')
+        )
         
-        print(f"🤖 LLM Result: {result.get('response', 'No response')[:100]}...")
+        logger.debug("LLM result", extra=fields(response=result.get('response')))
         
         return {
             "type": "result",
@@ -68,7 +76,7 @@ class ExecutorAgent:
             else:
                 try:
                     with open(file_path, 'r', encoding='utf-8') as f:
-                        return f.read()[:10000]  # First 10KB
+                        return f.read(FILE_READ_MAX_CHARS)
                 except:
                     return f"File: {file_name}"
         
@@ -59,7 +59,7 @@ async function loadEvents() {
   
   // Sync with server
   try {
-    const response = await fetch('http://localhost:8000/events');
+    const response = await fetch('http://localhost:8000/events?fields=id,timestamp,payload.event_type,payload.title,payload.email_subject,payload.file_name');
     if (response.ok) {
       const data = await response.json();
       const serverCount = data.events?.length || 0;
@@ -294,20 +294,7 @@ async function checkForResults() {
     if (response.ok) {
       const data = await response.json();
       if (data.results && data.results.length > 0) {
-        const latestResult = data.results[data.results.length - 1];
-        
-        // Store result in extension storage for persistence
-        chrome.storage.local.set({ 
-          latestResult: latestResult,
-          hasNewResult: true 
-        });
-        
-        chrome.storage.local.get(['lastResultId'], (stored) => {
-          if (stored.lastResultId !== latestResult.id) {
-            showResultChoice(latestResult);
-            chrome.storage.local.set({ lastResultId: latestResult.id });
-          }
-        });
+        handleNewResult(data.results[data.results.length - 1]);
       }
     }
   } catch (error) {
@@ -315,6 +302,99 @@ async function checkForResults() {
   }
 }
 
+function handleNewResult(latestResult) {
+  // Store result in extension storage for persistence
+  chrome.storage.local.set({ 
+    latestResult: latestResult,
+    hasNewResult: true 
+  });
+  
+  chrome.storage.local.get(['lastResultId'], (stored) => {
+    if (stored.lastResultId !== latestResult.id) {
+      showResultChoice(latestResult);
+      chrome.storage.local.set({ lastResultId: latestResult.id });
+      if (latestResult.status === 'streaming') streamResult(latestResult);
+    }
+  });
+}
+
+function handleUpdatedResult(result) {
+  // Final version of the result on show (it may have been produced by another server worker)
+  if (result.status === 'streaming') return;
+  chrome.storage.local.get(['lastResultId'], (stored) => {
+    if (stored.lastResultId !== result.id) return;
+    chrome.storage.local.set({ latestResult: result, hasNewResult: true });
+    showResultChoice(result);
+    if (document.getElementById('resultView').style.display === 'block') showResultInPopup();
+  });
+}
+
+// Live updates from the server change feed instead of polling
+let eventsTimer = null;
+
+function connectChanges() {
+  const source = new EventSource('http://localhost:8000/changes');
+  source.onopen = () => updateServerStatus(true);
+  source.onerror = () => updateServerStatus(false);
+  source.addEventListener('change', (e) => {
+    const change = JSON.parse(e.data);
+    if (change.kind === 'event') {
+      // One refresh per burst of events
+      clearTimeout(eventsTimer);
+      eventsTimer = setTimeout(loadEvents, 300);
+    } else if (change.kind === 'result' && change.op === 'added') {
+      handleNewResult(change.data);
+    } else if (change.kind === 'result' && change.op === 'updated') {
+      handleUpdatedResult(change.data);
+    } else if (change.kind === 'workflow') {
+      loadWorkflowsFromServer();
+    }
+  });
+  source.addEventListener('resync', () => {
+    loadEvents();
+    checkForResults();
+    loadWorkflowsFromServer();
+  });
+}
+
+// Follow a result that is still being generated token by token
+let resultStream = null;
+
+function streamResult(result) {
+  if (resultStream) resultStream.close();
+  const live = { ...result, content: '' };
+  resultStream = new EventSource(`http://localhost:8000/results/${result.id}/stream`);
+  const render = () => {
+    showResultChoice(live);
+    if (document.getElementById('resultView').style.display === 'block') showResultInPopup();
+  };
+  resultStream.addEventListener('snapshot', (e) => {
+    live.content = JSON.parse(e.data).content;
+    render();
+  });
+  resultStream.addEventListener('token', (e) => {
+    live.content += JSON.parse(e.data).delta;
+    render();
+  });
+  resultStream.addEventListener('done', (e) => {
+    resultStream.close();
+    resultStream = null;
+    const finalResult = JSON.parse(e.data);
+    chrome.storage.local.set({ latestResult: finalResult, hasNewResult: true });
+    Object.assign(live, finalResult);
+    render();
+  });
+  resultStream.addEventListener('pending', () => {
+    // Still running elsewhere; handleUpdatedResult shows it once it is finished
+    resultStream.close();
+    resultStream = null;
+  });
+  resultStream.onerror = () => {
+    resultStream.close();
+    resultStream = null;
+  };
+}
+
 // Check for stored results on popup open
 function checkStoredResults() {
   chrome.storage.local.get(['latestResult', 'hasNewResult'], (stored) => {
@@ -456,8 +536,4 @@ chrome.storage.local.remove(['workflows', 'lastResultId']);
 
 checkServerStatus();
 checkForResults();
-setInterval(() => {
-  checkServerStatus();
-  loadEvents();
-  checkForResults();
-}, 3000);
+connectChanges();
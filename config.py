@@ -1,8 +1,40 @@
 # Configuration
 import os
 
+# Local state (caches, databases)
+DATA_DIR = os.path.expanduser("~/.syntra")
+
 # Gemini API
 GEMINI_API_KEY = "YOUR_API_KEY_HERE"
+GEMINI_API_BASE = "https://generativelanguage.googleapis.com/v1beta"
+GEMINI_HTTP_TIMEOUT = 30  # seconds
+GEMINI_MAX_CONNECTIONS = 20
+GEMINI_MAX_KEEPALIVE_CONNECTIONS = 10
+GEMINI_KEEPALIVE_EXPIRY = 30  # seconds an idle pooled connection is kept open
+
+# Gemini resilience
+GEMINI_RATE_LIMIT_RPM = {"default": 60}  # per-model request budget, e.g. {"gemini-2.5-flash": 10}
+GEMINI_RATE_LIMIT_BURST = 5
+GEMINI_MAX_RETRIES = 3
+GEMINI_BACKOFF_BASE = 0.5  # seconds; doubled per attempt with full jitter
+GEMINI_BACKOFF_MAX = 8.0
+GEMINI_RETRY_AFTER_MAX = 30.0  # longest Retry-After we are willing to wait for
+GEMINI_BREAKER_FAILURE_THRESHOLD = 5
+GEMINI_BREAKER_RESET_SECONDS = 30
+
+# LLM response cache
+LLM_CACHE_ENABLED = True
+LLM_CACHE_PATH = os.path.join(DATA_DIR, "llm_cache.sqlite3")  # None for memory-only
+LLM_CACHE_TTL_SECONDS = 24 * 3600
+LLM_CACHE_MAX_MEMORY_ENTRIES = 512
+LLM_CACHE_MAX_MEMORY_BYTES = 16 * 1024 * 1024
+LLM_CACHE_MAX_DISK_ENTRIES = 10000
+LLM_CACHE_DB_TIMEOUT = 1  # seconds to wait on another worker's cache write before skipping the disk tier
+
+# Parsed workflow intent memo (shared by all workflow parsers)
+INTENT_CACHE_PATH = os.path.join(DATA_DIR, "intent_cache.sqlite3")  # None for memory-only
+INTENT_CACHE_MAX_ENTRIES = 5000
+INTENT_CACHE_DB_TIMEOUT = 1  # seconds to wait on another worker's write before skipping the disk tier
 
 # Email Configuration
 EMAIL_ENABLED = True
@@ -11,6 +43,9 @@ DEFAULT_RECIPIENT = "YOUR_EMAIL_HERE"
 # Server
 SERVER_HOST = "0.0.0.0"
 SERVER_PORT = 8000
+SERVER_WORKERS = 1  # >1 runs several processes sharing state through SESSION_DB_PATH (sqlite backend only)
+WATCHER_LOCK_PATH = os.path.join(DATA_DIR, "watcher.lock")  # held by the one worker that watches files
+REMOTE_RESULT_WAIT_SECONDS = 600  # /results/{id}/stream on a worker that is not producing the result waits this long
 
 # Email (for sending summaries)
 SMTP_HOST = "smtp.gmail.com"
@@ -18,3 +53,55 @@ SMTP_PORT = 587
 SMTP_USER = "YOUR_EMAIL_HERE"
 SMTP_PASSWORD = "YOUR_APP_PASSWORD_HERE"
 SMTP_FROM_NAME = "Syntra"
+
+# Session limits (in-memory ring buffers; oldest entries are evicted first)
+MAX_EVENTS = 100
+MAX_RESULTS = 50
+MAX_EVENT_BYTES = 8 * 1024 * 1024
+MAX_RESULT_BYTES = 8 * 1024 * 1024
+MAX_STORED_FIELD_CHARS = 20000  # longer event strings (article/email bodies) are clipped in the stored copy
+
+# Session persistence: "sqlite" survives restarts, "memory" keeps everything in-process
+SESSION_BACKEND = "sqlite"
+SESSION_DB_PATH = os.path.join(DATA_DIR, "sessions.sqlite3")
+SESSION_WRITE_BATCH = 500  # max rows per background commit
+SESSION_SYNC_INTERVAL = 0.5  # seconds between change-log polls in multi-worker mode
+SESSION_CHANGE_LOG_KEEP = 10000  # change-log rows kept for workers that are catching up
+
+# Event ingest queue
+EVENT_QUEUE_MAXSIZE = 100
+EVENT_QUEUE_WORKERS = 4
+EVENT_QUEUE_RETRY_AFTER = 5  # seconds clients should wait when the queue is full
+SHUTDOWN_DRAIN_SECONDS = 20  # on shutdown, time given to queued and in-flight events before they are spooled
+SHUTDOWN_STREAM_GRACE_SECONDS = 5  # open SSE streams (dashboard, popup) are cut after this so the drain can start
+EVENT_SPOOL_PATH = os.path.join(DATA_DIR, "pending_events.jsonl")  # replayed on the next start
+
+# Event de-duplication
+IDEMPOTENCY_TTL_SECONDS = 600
+IDEMPOTENCY_MAX_KEYS = 10000
+IDEMPOTENCY_DB_PATH = os.path.join(DATA_DIR, "dedupe.sqlite3")  # shared by workers in multi-worker mode
+IDEMPOTENCY_DB_TIMEOUT = 2  # seconds to wait for another worker's dedupe write before rejecting the event
+
+# Logging
+LOG_PROFILE = "production"  # production: one compact line per event | json | debug: full pipeline detail
+LOG_LEVELS = {}  # per-module overrides, e.g. {"syntra.gemini": "DEBUG", "syntra.session": "WARNING"}
+LOG_QUEUE_SIZE = 10000  # records waiting for the writer thread; further records are dropped
+LOG_MAX_FIELD_CHARS = 200  # longer strings (article bodies, email HTML) are cut
+LOG_MAX_ITEMS = 20  # keys / items shown per dict or list
+LOG_REDACT_KEYS = {"api_key", "password", "sender_password", "token", "authorization", "cookie"}
+
+# Tracing (per-event span timelines at /events/{id}/trace)
+TRACE_SAMPLE_RATE = 1.0  # fraction of events traced
+TRACE_BUFFER_SIZE = 200  # most recent traces kept in memory
+TRACE_MAX_SPANS = 500  # per trace; long map-reduce runs stop recording beyond this
+
+# Workflow execution
+ACTION_MAX_CONCURRENCY = 4  # Concurrent LLM calls shared by all workflows
+
+# Long documents (map-reduce); workflows may override chunk_size / max_parallel
+LLM_CHUNK_SIZE = 12000  # characters per map call; shorter content is sent in one call
+LLM_MAP_MAX_PARALLEL = 4
+LLM_MAX_CHUNKS = 32  # chunks grow beyond LLM_CHUNK_SIZE rather than exceed this fan-out
+LLM_MAX_CHUNK_SIZE = 48000  # hard ceiling per map prompt, well inside the model context
+LLM_MAX_INPUT_CHARS = LLM_MAX_CHUNK_SIZE * LLM_MAX_CHUNKS  # longer content is cut (with a note) before the map step
+FILE_READ_MAX_CHARS = LLM_MAX_INPUT_CHARS  # text files are read up to this many characters
@@ -0,0 +1,145 @@
+# Bounded Store - Insertion-ordered ring buffer with count and byte caps, O(1) insert/evict
+import json
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+
+def approx_size(item: Any) -> int:
+    """Approximate in-memory footprint of a JSON-like item, in bytes of its JSON encoding"""
+    return len(json.dumps(item, default=str).encode("utf-8"))
+
+
+def clip_strings(item: Any, max_chars: int) -> Any:
+    """Copy of a JSON-like item with every string longer than max_chars cut short"""
+    if isinstance(item, str):
+        if len(item) <= max_chars:
+            return item
+        return item[:max_chars] + f"... [{len(item) - max_chars} chars truncated]"
+    if isinstance(item, dict):
+        return {key: clip_strings(value, max_chars) for key, value in item.items()}
+    if isinstance(item, list):
+        return [clip_strings(value, max_chars) for value in item]
+    return item
+
+
+class BoundedStore:
+    """Items keyed by id in insertion order; the oldest are evicted past max_items or max_bytes.
+
+    Writes must be serialized by the owner. Point reads go straight to the live dict; iteration
+    uses a read-only snapshot rebuilt lazily on the first read after a write, so writes stay O(1)
+    and readers on any thread iterate a consistent view.
+    """
+
+    def __init__(self, max_items: int, max_bytes: Optional[int] = None):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self._items: "OrderedDict[str, Tuple[Dict, int]]" = OrderedDict()  # key -> (item, size), writers only
+        self._view: Mapping[str, Dict] = MappingProxyType({})
+        self._stale = False
+        # Held briefly by writers and by the reader that rebuilds the snapshot, never across I/O
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.evicted = 0
+
+    def snapshot(self) -> Mapping[str, Dict]:
+        """Immutable key -> item view, oldest first; rebuilt at most once per run of writes"""
+        if self._stale:
+            with self._lock:
+                if self._stale:
+                    self._view = MappingProxyType({key: item for key, (item, _) in self._items.items()})
+                    self._stale = False
+        return self._view
+
+    def add(self, key: str, item: Dict) -> List[Dict]:
+        """Insert (or move to newest) and return whatever had to be evicted to stay within the caps"""
+        size = approx_size(item)
+        with self._lock:
+            return self._add(key, item, size)
+
+    def _add(self, key: str, item: Dict, size: int) -> List[Dict]:
+        self._discard(key)
+        self._items[key] = (item, size)
+        self.bytes += size
+
+        evicted = []
+        # The newest item always stays, even if it alone exceeds max_bytes
+        while len(self._items) > 1 and (
+            len(self._items) > self.max_items
+            or (self.max_bytes is not None and self.bytes > self.max_bytes)
+        ):
+            _, (old, old_size) = self._items.popitem(last=False)
+            self.bytes -= old_size
+            evicted.append(old)
+        self.evicted += len(evicted)
+        self._stale = True
+        return evicted
+
+    def replace(self, key: str, item: Dict) -> List[Dict]:
+        """Update an item in place, keeping its position; returns evictions if it grew past the byte cap"""
+        if key not in self._items:
+            return []
+        size = approx_size(item)
+        with self._lock:
+            return self._replace(key, item, size)
+
+    def _replace(self, key: str, item: Dict, size: int) -> List[Dict]:
+        entry = self._items.get(key)
+        if entry is None:
+            return []
+        self._items[key] = (item, size)
+        self.bytes += size - entry[1]
+
+        evicted = []
+        while self.max_bytes is not None and self.bytes > self.max_bytes and len(self._items) > 1:
+            oldest = next(iter(self._items))
+            if oldest == key:
+                break
+            _, (old, old_size) = self._items.popitem(last=False)
+            self.bytes -= old_size
+            evicted.append(old)
+        self.evicted += len(evicted)
+        self._stale = True
+        return evicted
+
+    def _discard(self, key: str) -> Optional[Dict]:
+        """Remove an item (caller holds the lock and marks the snapshot stale)"""
+        entry = self._items.pop(key, None)
+        if entry is None:
+            return None
+        self.bytes -= entry[1]
+        return entry[0]
+
+    def pop(self, key: str) -> Optional[Dict]:
+        """Remove an item by key"""
+        with self._lock:
+            item = self._discard(key)
+            if item is not None:
+                self._stale = True
+        return item
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Item by key, or None (a single dict lookup, safe alongside a writer)"""
+        entry = self._items.get(key)
+        return entry[0] if entry is not None else None
+
+    def values(self) -> Iterator[Dict]:
+        """Items, oldest first"""
+        return iter(self.snapshot().values())
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get_stats(self) -> Dict:
+        """Occupancy against the caps"""
+        return {
+            "items": len(self._items),
+            "max_items": self.max_items,
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "evicted": self.evicted
+        }
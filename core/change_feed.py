@@ -0,0 +1,120 @@
+# Change Feed - Typed deltas from the session service, fanned out to live subscribers
+import asyncio
+import threading
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+
+class ChangeFeed:
+    """Numbered change log with a short replay backlog; idle subscribers cost nothing"""
+
+    def __init__(self, backlog: int = 1000, subscriber_queue_size: int = 1000, keepalive_seconds: float = 15):
+        self.subscriber_queue_size = subscriber_queue_size
+        self.keepalive_seconds = keepalive_seconds
+        self._seq = 0
+        # Sequence numbers restart with the process (and differ between workers); event ids carry the epoch
+        self.epoch = uuid.uuid4().hex[:8]
+        self._backlog = deque(maxlen=backlog)
+        self._subscribers: List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = []
+        self._lock = threading.Lock()
+        self.stats = {"published": 0, "subscribers": 0, "resyncs": 0}
+
+    @property
+    def seq(self) -> int:
+        """Sequence number of the latest change"""
+        return self._seq
+
+    def event_id(self, change: Dict) -> str:
+        """SSE id for a change, resumable only against this feed"""
+        return f"{self.epoch}:{change['seq']}"
+
+    def resume_seq(self, last_event_id: Optional[str]) -> Optional[int]:
+        """Seq to replay from for a Last-Event-ID; -1 (forces a resync) if it came from another feed"""
+        if not last_event_id:
+            return None
+        epoch, _, seq = last_event_id.rpartition(":")
+        return int(seq) if epoch == self.epoch and seq.isdigit() else -1
+
+    def publish(self, kind: str, op: str, data: Dict) -> Dict:
+        """Record a change (kind: event/result/workflow, op: added/updated/removed) and notify subscribers"""
+        with self._lock:
+            self._seq += 1
+            change = {
+                "seq": self._seq,
+                "kind": kind,
+                "op": op,
+                "data": data,
+                "at": datetime.now().isoformat()
+            }
+            self._backlog.append(change)
+            self.stats["published"] += 1
+            subscribers = list(self._subscribers)
+
+        for loop, queue in subscribers:
+            self._deliver(loop, queue, change)
+        return change
+
+    def _deliver(self, loop: asyncio.AbstractEventLoop, queue: asyncio.Queue, change: Dict):
+        """Queue a change on the subscriber's loop, from whichever thread published it"""
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._offer(queue, change)
+        elif not loop.is_closed():
+            loop.call_soon_threadsafe(self._offer, queue, change)
+
+    def _offer(self, queue: asyncio.Queue, change: Dict):
+        """Enqueue without blocking; a subscriber that falls too far behind is told to resync"""
+        try:
+            queue.put_nowait(change)
+        except asyncio.QueueFull:
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait({"seq": change["seq"], "kind": "resync"})
+
+    def _since(self, last_seq: int) -> Optional[List[Dict]]:
+        """Backlog entries after last_seq, or None when the gap is no longer covered"""
+        if last_seq < 0:
+            return None
+        if last_seq >= self._seq:
+            return []
+        if not self._backlog or self._backlog[0]["seq"] > last_seq + 1:
+            return None
+        return [change for change in self._backlog if change["seq"] > last_seq]
+
+    async def subscribe(self, last_seq: Optional[int] = None) -> AsyncIterator[Optional[Dict]]:
+        """Yield changes as they happen (after replaying from last_seq); None is a keep-alive tick"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.subscriber_queue_size)
+        entry = (asyncio.get_running_loop(), queue)
+        with self._lock:
+            replay = [] if last_seq is None else self._since(last_seq)
+            self._subscribers.append(entry)
+            self.stats["subscribers"] += 1
+        try:
+            if replay is None:
+                self.stats["resyncs"] += 1
+                yield {"seq": self._seq, "kind": "resync"}
+            else:
+                for change in replay:
+                    yield change
+            while True:
+                try:
+                    change = await asyncio.wait_for(queue.get(), self.keepalive_seconds)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if change["kind"] == "resync":
+                    self.stats["resyncs"] += 1
+                yield change
+        finally:
+            with self._lock:
+                self._subscribers.remove(entry)
+
+    def get_stats(self) -> Dict:
+        """Feed counters"""
+        with self._lock:
+            return {**self.stats, "epoch": self.epoch, "seq": self._seq, "live_subscribers": len(self._subscribers)}
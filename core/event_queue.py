@@ -0,0 +1,133 @@
+# Event Queue - Bounded ingest queue drained by a pool of async workers
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+from core.metrics import QUEUE_WAIT
+from core.log import get_logger
+
+logger = get_logger("queue")
+
+
+class EventQueue:
+    """Bounded queue in front of the agent pipeline with a fixed worker pool"""
+
+    def __init__(self, handler: Callable[[Dict], Awaitable[None]], maxsize: int = 100, workers: int = 4):
+        self.handler = handler
+        self.maxsize = maxsize
+        self.num_workers = workers
+        self.queue: Optional[asyncio.Queue] = None
+        self.workers: List[asyncio.Task] = []
+        self.in_flight = 0
+        self.accepting = True
+        self._running: Dict[int, Dict] = {}  # worker id -> event it is handling
+        self.stats = {
+            "enqueued": 0,
+            "rejected": 0,
+            "interrupted": 0,
+            "processed": 0,
+            "failed": 0,
+            "dequeued": 0,
+            "max_depth": 0,
+            "total_wait": 0.0,
+            "max_wait": 0.0
+        }
+
+    def start(self):
+        """Create the queue and spawn workers on the running event loop"""
+        if self.workers:
+            return
+        self.queue = asyncio.Queue(maxsize=self.maxsize)
+        self.workers = [
+            asyncio.create_task(self._worker(i), name=f"event-worker-{i}")
+            for i in range(self.num_workers)
+        ]
+        logger.info("Event queue started: %d workers, capacity %d", self.num_workers, self.maxsize)
+
+    async def stop(self):
+        """Cancel all workers"""
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+
+    def close(self):
+        """Stop accepting events; submit() returns False from now on"""
+        self.accepting = False
+
+    async def drain(self, timeout: float) -> List[Dict]:
+        """Let workers finish queued and in-flight events until the deadline, then stop them.
+
+        Returns the events that did not finish: interrupted ones first, then those never started.
+        """
+        if self.queue is not None and self.workers:
+            try:
+                await asyncio.wait_for(self.queue.join(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning("Event queue not drained after %ss, stopping workers", timeout)
+        # No await between the snapshot and the cancel, so nothing can finish in between
+        unfinished = list(self._running.values())
+        self.stats["interrupted"] += len(unfinished)
+        await self.stop()
+        while self.queue is not None and not self.queue.empty():
+            unfinished.append(self.queue.get_nowait()[1])
+        return unfinished
+
+    def submit(self, event_data: Dict) -> bool:
+        """Enqueue an event without blocking; returns False when the queue is full or closed"""
+        if not self.accepting:
+            self.stats["rejected"] += 1
+            logger.debug("Event queue closed for shutdown, rejecting event")
+            return False
+        if self.queue is None:
+            self.start()
+        try:
+            self.queue.put_nowait((time.monotonic(), event_data))
+        except asyncio.QueueFull:
+            self.stats["rejected"] += 1
+            logger.warning("Event queue full (%d), rejecting event", self.maxsize)
+            return False
+
+        self.stats["enqueued"] += 1
+        self.stats["max_depth"] = max(self.stats["max_depth"], self.queue.qsize())
+        return True
+
+    async def _worker(self, worker_id: int):
+        """Drain the queue, running one event at a time through the handler"""
+        while True:
+            enqueued_at, event_data = await self.queue.get()
+            wait = time.monotonic() - enqueued_at
+            self.stats["dequeued"] += 1
+            self.stats["total_wait"] += wait
+            self.stats["max_wait"] = max(self.stats["max_wait"], wait)
+            QUEUE_WAIT.observe(wait)
+            self.in_flight += 1
+            self._running[worker_id] = event_data
+            try:
+                await self.handler(event_data)
+                self.stats["processed"] += 1
+            except Exception as e:
+                self.stats["failed"] += 1
+                logger.exception("Event worker %d error: %s", worker_id, e)
+            finally:
+                self._running.pop(worker_id, None)
+                self.in_flight -= 1
+                self.queue.task_done()
+
+    def get_stats(self) -> Dict:
+        """Queue depth, worker utilisation and wait-time metrics"""
+        dequeued = self.stats["dequeued"]
+        return {
+            "depth": self.queue.qsize() if self.queue else 0,
+            "capacity": self.maxsize,
+            "workers": self.num_workers,
+            "in_flight": self.in_flight,
+            "accepting": self.accepting,
+            "interrupted": self.stats["interrupted"],
+            "enqueued": self.stats["enqueued"],
+            "rejected": self.stats["rejected"],
+            "processed": self.stats["processed"],
+            "failed": self.stats["failed"],
+            "max_depth": self.stats["max_depth"],
+            "avg_wait_ms": round(self.stats["total_wait"] / dequeued * 1000, 2) if dequeued else 0,
+            "max_wait_ms": round(self.stats["max_wait"] * 1000, 2)
+        }
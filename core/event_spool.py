@@ -0,0 +1,54 @@
+# Event Spool - Unprocessed events saved at shutdown and replayed on the next start
+import json
+import os
+from typing import Dict, List
+from core.log import get_logger
+
+logger = get_logger("spool")
+
+
+class EventSpool:
+    """JSON-lines file of pending events; several workers may append, one takes the batch"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.stats = {"saved": 0, "replayed": 0}
+
+    def save(self, events: List[Dict]):
+        """Append events to the spool (one line each, so concurrent appends stay whole)"""
+        if not events:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            for event in events:
+                f.write(json.dumps(event, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.stats["saved"] += len(events)
+
+    def take(self) -> List[Dict]:
+        """Claim and empty the spool; the rename means only one worker replays each event"""
+        claimed = f"{self.path}.{os.getpid()}.replaying"
+        try:
+            os.replace(self.path, claimed)
+        except FileNotFoundError:
+            return []
+
+        events = []
+        with open(claimed, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    events.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A line cut short by a crash mid-write; everything else is still good
+                    logger.warning("Skipping unreadable spooled event in %s", self.path)
+        os.remove(claimed)
+        self.stats["replayed"] += len(events)
+        return events
+
+    def get_stats(self) -> Dict:
+        """Saved / replayed counters for this process"""
+        return {**self.stats, "path": self.path, "pending": os.path.exists(self.path)}
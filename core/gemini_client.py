@@ -0,0 +1,403 @@
+# Gemini Client - Shared async REST client with pooled keep-alive connections
+import asyncio
+import json
+from typing import AsyncIterator, Dict, Optional
+import httpx
+from core.llm_cache import LLMResponseCache, make_cache_key
+from core.startup_profile import get_startup_profile
+from core.tracing import start_span, set_attribute
+from core.log import get_logger
+from core.gemini_resilience import (
+    TokenBucket,
+    CircuitBreaker,
+    ResilienceStats,
+    backoff_delay,
+    parse_retry_after,
+)
+from config import (
+    GEMINI_API_KEY,
+    GEMINI_API_BASE,
+    GEMINI_HTTP_TIMEOUT,
+    GEMINI_MAX_CONNECTIONS,
+    GEMINI_MAX_KEEPALIVE_CONNECTIONS,
+    GEMINI_KEEPALIVE_EXPIRY,
+    LLM_CACHE_ENABLED,
+    LLM_CACHE_PATH,
+    LLM_CACHE_TTL_SECONDS,
+    LLM_CACHE_MAX_MEMORY_ENTRIES,
+    LLM_CACHE_MAX_MEMORY_BYTES,
+    LLM_CACHE_MAX_DISK_ENTRIES,
+    LLM_CACHE_DB_TIMEOUT,
+    GEMINI_RATE_LIMIT_RPM,
+    GEMINI_RATE_LIMIT_BURST,
+    GEMINI_MAX_RETRIES,
+    GEMINI_BACKOFF_BASE,
+    GEMINI_BACKOFF_MAX,
+    GEMINI_RETRY_AFTER_MAX,
+    GEMINI_BREAKER_FAILURE_THRESHOLD,
+    GEMINI_BREAKER_RESET_SECONDS,
+)
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+logger = get_logger("gemini")
+
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx when installed
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class GeminiAPIError(Exception):
+    """Gemini returned an error status or a response without candidates"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class GeminiUnavailableError(GeminiAPIError):
+    """Gemini is overloaded or down: retries exhausted or the circuit breaker is open"""
+
+
+class GeminiClient:
+    """One pooled httpx.AsyncClient for every Gemini generateContent call"""
+
+    def __init__(self, api_key: str = GEMINI_API_KEY, cache: Optional[LLMResponseCache] = None):
+        self.api_key = api_key
+        self.cache = cache
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._buckets: Dict[str, TokenBucket] = {}
+        self.breaker = CircuitBreaker(GEMINI_BREAKER_FAILURE_THRESHOLD, GEMINI_BREAKER_RESET_SECONDS)
+        self.resilience = ResilienceStats()
+        self._inflight: Dict[str, asyncio.Future] = {}  # cache key -> upstream request shared by concurrent callers
+        self.coalesced = 0
+        self.streams = 0
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Create the pooled client lazily, bound to the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            # Pooled connections cannot be shared across loops; start a fresh pool
+            self._client = httpx.AsyncClient(
+                base_url=GEMINI_API_BASE,
+                http2=HTTP2_AVAILABLE,
+                timeout=GEMINI_HTTP_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=GEMINI_MAX_CONNECTIONS,
+                    max_keepalive_connections=GEMINI_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=GEMINI_KEEPALIVE_EXPIRY,
+                ),
+            )
+            self._loop = loop
+        return self._client
+
+    async def generate(self, prompt: str, model: str, use_cache: bool = True) -> str:
+        """Return the response text for a prompt, from cache or a shared in-flight request when possible"""
+        key = make_cache_key(model, prompt)
+        store = bool(self.cache and use_cache)
+        if store:
+            cached = await self.cache.aget(key)
+            if cached is not None:
+                set_attribute("cache", "hit")
+                return cached
+
+        task = self._inflight.get(key)
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            self.coalesced += 1
+            # The attempts are recorded in the trace of the caller that started the request
+            set_attribute("cache", "coalesced")
+        else:
+            task = asyncio.ensure_future(self._fetch(key, prompt, model, store))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._release(key, done))
+        # Shield so one caller being cancelled does not abort the request for the others
+        return await asyncio.shield(task)
+
+    async def stream(self, prompt: str, model: str) -> AsyncIterator[str]:
+        """Yield response text deltas as Gemini generates them (streamGenerateContent over SSE)"""
+        key = make_cache_key(model, prompt)
+        if self.cache:
+            cached = await self.cache.aget(key)
+            if cached is not None:
+                set_attribute("cache", "hit")
+                yield cached
+                return
+
+        shared = self._inflight.get(key)
+        if shared is not None and shared.get_loop() is asyncio.get_running_loop():
+            # The same prompt is already being generated (streamed or buffered): share its full text
+            self.coalesced += 1
+            set_attribute("cache", "coalesced")
+            yield await asyncio.shield(shared)
+            return
+
+        # Concurrent identical calls wait on this future instead of starting their own request
+        result = asyncio.get_running_loop().create_future()
+        self._inflight[key] = result
+        result.add_done_callback(lambda done: self._release(key, done))
+        try:
+            parts = []
+            delay = 0.0
+            if self.breaker.state == CircuitBreaker.CLOSED:
+                self.resilience.throttle_wait_seconds += await self._bucket(model).acquire()
+                self.resilience.incr("attempts")
+                try:
+                    async with self._get_client().stream(
+                        "POST",
+                        f"/models/{model}:streamGenerateContent",
+                        params={"key": self.api_key, "alt": "sse"},
+                        json={"contents": [{"parts": [{"text": prompt}]}]},
+                    ) as response:
+                        if response.status_code == 200:
+                            self.streams += 1
+                            set_attribute("streamed", True)
+                            async for line in response.aiter_lines():
+                                if not line.startswith("data:"):
+                                    continue
+                                delta = self._stream_delta(json.loads(line[5:]))
+                                if delta:
+                                    parts.append(delta)
+                                    yield delta
+                        else:
+                            await response.aread()
+                            logger.warning("Gemini stream returned %d, retrying without streaming", response.status_code)
+                            if response.status_code in RETRYABLE_STATUS:
+                                self.resilience.incr("rate_limited" if response.status_code == 429 else "server_errors")
+                                delay = self._failed_stream_delay(parse_retry_after(response.headers.get("Retry-After")))
+                except httpx.TransportError as e:
+                    if parts:
+                        raise GeminiAPIError(f"Stream interrupted: {e}")
+                    logger.warning("Gemini stream failed (%s), retrying without streaming", e)
+                    self.resilience.incr("transport_errors")
+                    delay = self._failed_stream_delay(None)
+
+            if parts:
+                text = "".join(parts)
+                self.breaker.record_success()
+                self.resilience.incr("requests")
+                self.resilience.incr("succeeded")
+                if self.cache:
+                    await self.cache.aset(key, text)
+                result.set_result(text)
+                return
+
+            # Nothing streamed (or breaker not closed): the buffered path applies retries, backoff and probing
+            if delay:
+                self.resilience.backoff_wait_seconds += delay
+                with start_span("llm.backoff", seconds=round(delay, 3)):
+                    await asyncio.sleep(delay)
+            text = await self._fetch(key, prompt, model, bool(self.cache))
+            result.set_result(text)
+            yield text
+        except BaseException as e:
+            if not result.done():
+                if isinstance(e, Exception):
+                    result.set_exception(e)
+                else:
+                    # The streaming caller went away: finish the request for anyone waiting on it
+                    self._chain(result, asyncio.ensure_future(self._fetch(key, prompt, model, bool(self.cache))))
+            raise
+
+    def _failed_stream_delay(self, retry_after: Optional[float]) -> float:
+        """Record a failed stream attempt and return the wait before the buffered retry"""
+        self.breaker.record_failure()
+        if retry_after is not None and retry_after > GEMINI_RETRY_AFTER_MAX:
+            self.resilience.incr("exhausted")
+            raise GeminiUnavailableError(f"Gemini asked to retry after {retry_after:.0f}s", 429)
+        delay = backoff_delay(0, GEMINI_BACKOFF_BASE, GEMINI_BACKOFF_MAX)
+        return max(delay, retry_after) if retry_after is not None else delay
+
+    @staticmethod
+    def _chain(target: asyncio.Future, source: asyncio.Future):
+        """Resolve target with source's outcome once source finishes"""
+        def copy(done: asyncio.Future):
+            if target.done():
+                return
+            if done.cancelled():
+                target.cancel()
+            elif done.exception() is not None:
+                target.set_exception(done.exception())
+            else:
+                target.set_result(done.result())
+
+        source.add_done_callback(copy)
+
+    @staticmethod
+    def _stream_delta(chunk: Dict) -> str:
+        """Text carried by one streamed generateContent chunk"""
+        candidates = chunk.get("candidates") or []
+        if not candidates:
+            return ""
+        return "".join(part.get("text", "") for part in candidates[0].get("content", {}).get("parts", []))
+
+    def _release(self, key: str, task: asyncio.Future):
+        """Free the singleflight slot once its request has finished"""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the error retrieved; a stream with no followers leaves nobody else to read it
+            task.exception()
+
+    async def _fetch(self, key: str, prompt: str, model: str, store: bool) -> str:
+        """Upstream request behind a singleflight slot, populating the cache on success"""
+        text = await self._request(prompt, model)
+        if store:
+            await self.cache.aset(key, text)
+        return text
+
+    def _bucket(self, model: str) -> TokenBucket:
+        """Per-model token bucket sized from GEMINI_RATE_LIMIT_RPM"""
+        bucket = self._buckets.get(model)
+        if bucket is None:
+            rpm = GEMINI_RATE_LIMIT_RPM.get(model, GEMINI_RATE_LIMIT_RPM["default"])
+            bucket = self._buckets[model] = TokenBucket(rpm / 60.0, GEMINI_RATE_LIMIT_BURST)
+        return bucket
+
+    async def _request(self, prompt: str, model: str) -> str:
+        """Rate-limited request with jittered retries behind the circuit breaker"""
+        self.resilience.incr("requests")
+        if not self.breaker.allow():
+            self.resilience.incr("circuit_rejected")
+            raise GeminiUnavailableError(
+                f"Circuit open, retry in {self.breaker.retry_after():.0f}s", 503
+            )
+
+        try:
+            return await self._attempts(prompt, model)
+        except BaseException:
+            # Cancellation or an error the retry loop does not handle: free the half-open probe slot
+            self.breaker.release_probe()
+            raise
+
+    async def _attempts(self, prompt: str, model: str) -> str:
+        """Retry loop for one admitted request; records the outcome on the circuit breaker"""
+        last_error: Optional[GeminiAPIError] = None
+        for attempt in range(GEMINI_MAX_RETRIES + 1):
+            if attempt:
+                self.resilience.incr("retries")
+            self.resilience.throttle_wait_seconds += await self._bucket(model).acquire()
+            self.resilience.incr("attempts")
+
+            retry_after = None
+            try:
+                with start_span("llm.attempt", attempt=attempt + 1) as span:
+                    response = await self._post(prompt, model)
+                    span.set_attribute("status_code", response.status_code)
+            except httpx.TransportError as e:
+                self.resilience.incr("transport_errors")
+                last_error = GeminiAPIError(f"Transport error: {e}")
+            else:
+                if response.status_code == 200:
+                    # The API answered; a blocked or empty candidate is not an outage
+                    self.breaker.record_success()
+                    try:
+                        text = self._parse_response(response)
+                    except GeminiAPIError:
+                        self.resilience.incr("empty_responses")
+                        raise
+                    self.resilience.incr("succeeded")
+                    return text
+
+                error = GeminiAPIError(f"{response.status_code} - {response.text}", response.status_code)
+                if response.status_code not in RETRYABLE_STATUS:
+                    # The API is reachable; the request itself is bad
+                    self.resilience.incr("client_errors")
+                    self.breaker.record_success()
+                    raise error
+
+                self.resilience.incr("rate_limited" if response.status_code == 429 else "server_errors")
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                last_error = error
+
+            if attempt == GEMINI_MAX_RETRIES:
+                break
+            delay = backoff_delay(attempt, GEMINI_BACKOFF_BASE, GEMINI_BACKOFF_MAX)
+            if retry_after is not None:
+                if retry_after > GEMINI_RETRY_AFTER_MAX:
+                    break
+                delay = max(delay, retry_after)
+            self.resilience.backoff_wait_seconds += delay
+            with start_span("llm.backoff", seconds=round(delay, 3)):
+                await asyncio.sleep(delay)
+
+        self.resilience.incr("exhausted")
+        self.breaker.record_failure()
+        raise GeminiUnavailableError(f"Gemini unavailable after retries: {last_error}", last_error.status_code)
+
+    async def _post(self, prompt: str, model: str) -> httpx.Response:
+        """Single generateContent HTTP call"""
+        payload = {"contents": [{"parts": [{"text": prompt}]}]}
+        return await self._get_client().post(
+            f"/models/{model}:generateContent",
+            params={"key": self.api_key},
+            json=payload,
+        )
+
+    def _parse_response(self, response: httpx.Response) -> str:
+        """Extract the first candidate's text from a 200 response"""
+        try:
+            result = response.json()
+        except ValueError:
+            raise GeminiAPIError(f"Malformed response: {response.text[:200]}", response.status_code)
+        candidates = result.get("candidates") or []
+        if not candidates:
+            raise GeminiAPIError(f"No candidates in response: {result}", response.status_code)
+        candidate = candidates[0]
+        text = "".join(part.get("text", "") for part in candidate.get("content", {}).get("parts", []))
+        if not text:
+            # Blocked (SAFETY, RECITATION, ...) or otherwise empty candidate
+            raise GeminiAPIError(
+                f"No content in response (finishReason: {candidate.get('finishReason', 'unknown')})",
+                response.status_code
+            )
+        return text
+
+    def get_stats(self) -> dict:
+        """Client-side counters (resilience and cache metrics)"""
+        return {
+            "http2": HTTP2_AVAILABLE,
+            "circuit_state": self.breaker.state,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight),
+            "streams": self.streams,
+            "resilience": self.resilience.snapshot(),
+            "cache": self.cache.get_stats() if self.cache else None
+        }
+
+    async def aclose(self):
+        """Close pooled connections (call on server shutdown)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._loop = None
+
+
+_shared_client: Optional[GeminiClient] = None
+
+
+def get_gemini_client() -> GeminiClient:
+    """Get the process-wide shared Gemini client (connection pool and cache open on first call)"""
+    global _shared_client
+    if _shared_client is None:
+        with get_startup_profile().lazy_init("gemini_client"):
+            cache = None
+            if LLM_CACHE_ENABLED:
+                cache = LLMResponseCache(
+                    db_path=LLM_CACHE_PATH,
+                    ttl_seconds=LLM_CACHE_TTL_SECONDS,
+                    max_memory_entries=LLM_CACHE_MAX_MEMORY_ENTRIES,
+                    max_memory_bytes=LLM_CACHE_MAX_MEMORY_BYTES,
+                    max_disk_entries=LLM_CACHE_MAX_DISK_ENTRIES,
+                    timeout=LLM_CACHE_DB_TIMEOUT
+                )
+            _shared_client = GeminiClient(cache=cache)
+    return _shared_client
+
+
+async def close_gemini_client():
+    """Close the shared client if one was ever created"""
+    if _shared_client is not None:
+        await _shared_client.aclose()
@@ -0,0 +1,134 @@
+# Gemini Resilience - Token-bucket rate limiting, jittered backoff and a circuit breaker
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+
+class TokenBucket:
+    """Async token bucket: `rate` requests per second with bursts up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        """Add tokens for the time elapsed since the last refill"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self) -> float:
+        """Wait for a token; returns the seconds spent waiting"""
+        waited = 0.0
+        while True:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return waited
+            delay = (1 - self.tokens) / self.rate
+            await asyncio.sleep(delay)
+            waited += delay
+
+
+class CircuitBreaker:
+    """Fails fast after repeated failures, then lets a single probe through after a cooldown"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_started = 0.0
+
+    def allow(self) -> bool:
+        """Whether a request may be attempted right now"""
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+        if self.state == self.HALF_OPEN:
+            # A probe that never reported back (e.g. a lost task) stops blocking after reset_timeout
+            stale = self._probe_in_flight and time.monotonic() - self._probe_started >= self.reset_timeout
+            if not self._probe_in_flight or stale:
+                self._probe_in_flight = True
+                self._probe_started = time.monotonic()
+                return True
+        return False
+
+    def release_probe(self):
+        """Let another probe through when one ended without recording success or failure"""
+        self._probe_in_flight = False
+
+    def record_success(self):
+        """Close the breaker after a call that reached the API"""
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        """Count a failed call, opening the breaker at the threshold or on a failed probe"""
+        self.failures += 1
+        self._probe_in_flight = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def retry_after(self) -> float:
+        """Seconds until the breaker will admit a probe"""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff for the given (0-based) retry attempt"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After header as seconds; accepts delta-seconds or an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class ResilienceStats:
+    """Counters for every outcome of a Gemini call"""
+
+    FIELDS = ("requests", "attempts", "succeeded", "retries", "rate_limited", "server_errors",
+              "transport_errors", "client_errors", "empty_responses", "exhausted", "circuit_rejected")
+
+    def __init__(self):
+        self.counters: Dict[str, int] = {field: 0 for field in self.FIELDS}
+        self.throttle_wait_seconds = 0.0
+        self.backoff_wait_seconds = 0.0
+
+    def incr(self, field: str, amount: int = 1):
+        """Increment an outcome counter"""
+        self.counters[field] += amount
+
+    def snapshot(self) -> Dict:
+        """Counters plus accumulated wait times"""
+        return {
+            **self.counters,
+            "throttle_wait_seconds": round(self.throttle_wait_seconds, 3),
+            "backoff_wait_seconds": round(self.backoff_wait_seconds, 3)
+        }
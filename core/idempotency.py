@@ -0,0 +1,150 @@
+# Idempotency Store - Exactly-once dispatch keyed on event content
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict
+
+# Payload fields that identify an event, per event type. Timestamps are left
+# out on purpose so re-sends of the same content collapse to one key.
+EVENT_KEY_FIELDS = {
+    "email_compose": ("email_to", "email_subject", "email_body"),
+    "article_read": ("url", "title", "content"),
+    "file_download": ("file_path", "file_name", "size"),
+}
+
+
+def event_key(event_data: Dict) -> str:
+    """Derive a stable content-hash key for an event"""
+    event_type = event_data.get("event_type", "unknown")
+    fields = EVENT_KEY_FIELDS.get(event_type)
+
+    if fields:
+        material = [event_data.get(field) for field in fields]
+    else:
+        material = {k: v for k, v in event_data.items() if k != "timestamp"}
+
+    digest = hashlib.sha256(
+        json.dumps(material, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+    return f"{event_type}:{digest}"
+
+
+class IdempotencyStore:
+    """TTL + LRU set of seen event keys with a fixed entry ceiling"""
+
+    blocking = False  # in-memory: safe to call on the event loop
+
+    def __init__(self, ttl_seconds: float = 600, max_entries: int = 10000):
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self._seen = OrderedDict()  # key -> expiry (monotonic seconds)
+        self._lock = threading.Lock()
+        self.stats = {"first_seen": 0, "duplicates": 0, "expired": 0, "evicted": 0}
+
+    def check_and_mark(self, key: str) -> bool:
+        """Return True the first time a key is seen within its TTL, False for duplicates"""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+
+            if key in self._seen:
+                self.stats["duplicates"] += 1
+                return False
+
+            self._seen[key] = now + self.ttl
+            self.stats["first_seen"] += 1
+
+            while len(self._seen) > self.max_entries:
+                self._seen.popitem(last=False)
+                self.stats["evicted"] += 1
+            return True
+
+    def discard(self, key: str):
+        """Forget a key so the event can be dispatched again (e.g. after a rejected enqueue)"""
+        with self._lock:
+            self._seen.pop(key, None)
+
+    def _expire(self, now: float):
+        """Drop expired keys; insertion order equals expiry order since the TTL is fixed"""
+        while self._seen:
+            key, expires_at = next(iter(self._seen.items()))
+            if expires_at > now:
+                break
+            del self._seen[key]
+            self.stats["expired"] += 1
+
+    def get_stats(self) -> Dict:
+        """Duplicate-hit counters and current size"""
+        with self._lock:
+            return {
+                "size": len(self._seen),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                **self.stats
+            }
+
+
+class SharedIdempotencyStore:
+    """IdempotencyStore backed by SQLite so every worker process sees the same seen-keys"""
+
+    PRUNE_EVERY = 1000  # first-seen marks between sweeps of expired / surplus keys
+    blocking = True  # calls wait on SQLite locks; keep them off the event loop
+
+    def __init__(self, db_path: str, ttl_seconds: float = 600, max_entries: int = 10000, timeout: float = 2):
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False, timeout=timeout)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS seen_events (key TEXT PRIMARY KEY, expires_at REAL NOT NULL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_seen_events_expiry ON seen_events(expires_at)")
+        self._db.commit()
+        self._lock = threading.Lock()
+        self.stats = {"first_seen": 0, "duplicates": 0, "expired": 0, "evicted": 0}
+
+    def check_and_mark(self, key: str) -> bool:
+        """Return True the first time any worker sees a key within its TTL, False for duplicates"""
+        # Wall clock, not monotonic: expiry times are compared across processes
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM seen_events WHERE key = ? AND expires_at <= ?", (key, now))
+            inserted = self._db.execute(
+                "INSERT OR IGNORE INTO seen_events (key, expires_at) VALUES (?, ?)", (key, now + self.ttl)
+            ).rowcount == 1
+            if not inserted:
+                self.stats["duplicates"] += 1
+                return False
+            self.stats["first_seen"] += 1
+            if self.stats["first_seen"] % self.PRUNE_EVERY == 0:
+                self._prune(now)
+            return True
+
+    def discard(self, key: str):
+        """Forget a key so the event can be dispatched again (e.g. after a rejected enqueue)"""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM seen_events WHERE key = ?", (key,))
+
+    def _prune(self, now: float):
+        """Drop expired keys, then the soonest-expiring ones beyond max_entries"""
+        self.stats["expired"] += self._db.execute("DELETE FROM seen_events WHERE expires_at <= ?", (now,)).rowcount
+        self.stats["evicted"] += self._db.execute(
+            "DELETE FROM seen_events WHERE key IN (SELECT key FROM seen_events ORDER BY expires_at "
+            "LIMIT MAX(0, (SELECT COUNT(*) FROM seen_events) - ?))", (self.max_entries,)
+        ).rowcount
+
+    def get_stats(self) -> Dict:
+        """Duplicate-hit counters (this worker) and current shared size"""
+        with self._lock:
+            size = self._db.execute("SELECT COUNT(*) FROM seen_events").fetchone()[0]
+            return {
+                "size": size,
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "shared": True,
+                **self.stats
+            }
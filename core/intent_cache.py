@@ -0,0 +1,131 @@
+# Intent Cache - Persistent memo of normalized workflow query -> parsed intent
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from core.log import get_logger
+from config import INTENT_CACHE_PATH, INTENT_CACHE_MAX_ENTRIES, INTENT_CACHE_DB_TIMEOUT
+
+logger = get_logger("intent_cache")
+
+
+def normalize_query(query: str) -> str:
+    """Case-, whitespace- and trailing-punctuation-insensitive form of a workflow phrase"""
+    text = " ".join(query.lower().split())
+    return re.sub(r"^[\s\"'`]+|[\s\"'`.!?,;:]+$", "", text)
+
+
+class IntentCache:
+    """Parsed intents per parser namespace, kept in memory and persisted to SQLite"""
+
+    def __init__(self, db_path: Optional[str] = None, max_entries: int = 5000, timeout: float = 1):
+        self.max_entries = max_entries
+        self._memory = OrderedDict()  # "namespace:normalized query" -> JSON text
+        self._lock = threading.Lock()  # memory tier and stats
+        self._db_lock = threading.Lock()  # SQLite connection, held only off the event loop
+        self._db = None
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "disk_errors": 0}
+
+        if db_path:
+            try:
+                os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+                self._db = sqlite3.connect(db_path, check_same_thread=False, timeout=timeout)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS parsed_intents ("
+                    "key TEXT PRIMARY KEY, intent TEXT NOT NULL, updated_at REAL NOT NULL)"
+                )
+                self._db.commit()
+                # Warm the memory tier with the most recently used phrases
+                rows = self._db.execute(
+                    "SELECT key, intent FROM parsed_intents ORDER BY updated_at DESC LIMIT ?",
+                    (max_entries,)
+                ).fetchall()
+                for key, intent in reversed(rows):
+                    self._memory[key] = intent
+            except (sqlite3.Error, OSError) as e:
+                # The memo is best-effort: run memory-only rather than fail the parsers
+                logger.warning("Intent cache disk tier disabled: %s", e)
+                self.stats["disk_errors"] += 1
+                if self._db is not None:
+                    self._db.close()
+                    self._db = None
+
+    def get(self, namespace: str, query: str) -> Optional[Dict]:
+        """Return a fresh copy of the cached intent, or None"""
+        key = f"{namespace}:{normalize_query(query)}"
+        with self._lock:
+            intent = self._memory.get(key)
+            if intent is None:
+                self.stats["misses"] += 1
+                return None
+            self._memory.move_to_end(key)
+            self.stats["hits"] += 1
+        return json.loads(intent)
+
+    def set(self, namespace: str, query: str, intent: Dict):
+        """Memoize a successfully parsed intent (blocking on the disk tier)"""
+        key, value, evicted = self._set_memory(namespace, query, intent)
+        self._set_disk(key, value, evicted)
+
+    async def aset(self, namespace: str, query: str, intent: Dict):
+        """set() for the event loop: the disk tier is written on a worker thread"""
+        key, value, evicted = self._set_memory(namespace, query, intent)
+        if self._db is not None:
+            await asyncio.to_thread(self._set_disk, key, value, evicted)
+
+    def _set_memory(self, namespace: str, query: str, intent: Dict) -> Tuple[str, str, List[str]]:
+        """Memory-tier store; returns the key, its JSON and the keys evicted to make room"""
+        key = f"{namespace}:{normalize_query(query)}"
+        value = json.dumps(intent)
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            self.stats["stores"] += 1
+
+            evicted = []
+            while len(self._memory) > self.max_entries:
+                evicted.append(self._memory.popitem(last=False)[0])
+        return key, value, evicted
+
+    def _set_disk(self, key: str, value: str, evicted: List[str]):
+        """Write through to SQLite; a failure (e.g. another worker holding the lock) only loses the disk copy"""
+        if self._db is None:
+            return
+        try:
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO parsed_intents (key, intent, updated_at) VALUES (?, ?, ?)",
+                    (key, value, time.time())
+                )
+                self._db.executemany("DELETE FROM parsed_intents WHERE key = ?", [(k,) for k in evicted])
+                self._db.commit()
+        except sqlite3.Error as e:
+            try:
+                self._db.rollback()
+            except sqlite3.Error:
+                pass
+            with self._lock:
+                self.stats["disk_errors"] += 1
+            logger.warning("Intent cache write failed: %s", e)
+
+    def get_stats(self) -> Dict:
+        """Hit/miss counters and size"""
+        with self._lock:
+            return {**self.stats, "entries": len(self._memory)}
+
+
+_shared_cache: Optional[IntentCache] = None
+
+
+def get_intent_cache() -> IntentCache:
+    """Get the process-wide intent cache"""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = IntentCache(INTENT_CACHE_PATH, INTENT_CACHE_MAX_ENTRIES, INTENT_CACHE_DB_TIMEOUT)
+    return _shared_cache
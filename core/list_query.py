@@ -0,0 +1,100 @@
+# List Query - Cursor pagination, filters, field projection and ETags for list endpoints
+import hashlib
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+
+def parse_time(value: Optional[str]) -> Optional[datetime]:
+    """ISO-8601 string -> naive datetime (raises ValueError on bad input)"""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed.astimezone().replace(tzinfo=None) if parsed.tzinfo else parsed
+
+
+def project(item: Dict, fields: List[str]) -> Dict:
+    """Keep only the listed fields; dotted paths select nested keys ('payload.event_type')"""
+    projected = {}
+    for path in fields:
+        source, target = item, projected
+        keys = path.split(".")
+        for key in keys[:-1]:
+            source = source.get(key) if isinstance(source, dict) else None
+            if source is None:
+                break
+            target = target.setdefault(key, {})
+        else:
+            if isinstance(source, dict) and keys[-1] in source:
+                target[keys[-1]] = source[keys[-1]]
+    return projected
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header covers the current ETag"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+class ListQuery:
+    """Parameters of one list request: since/limit cursor, filters and projection"""
+
+    def __init__(self, since: Optional[int] = None, limit: Optional[int] = None,
+                 event_type: Optional[str] = None, session_id: Optional[str] = None,
+                 start: Optional[str] = None, end: Optional[str] = None, fields: Optional[str] = None,
+                 workflow_id: Optional[int] = None):
+        if limit is not None and limit < 1:
+            raise ValueError("limit must be positive")
+        self.since = since
+        self.limit = limit
+        self.event_type = event_type
+        self.session_id = session_id
+        self.workflow_id = workflow_id
+        self.start = parse_time(start)
+        self.end = parse_time(end)
+        self.fields = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+        self._key = "&".join(
+            f"{name}={value}" for name, value in (
+                ("since", since), ("limit", limit), ("event_type", event_type), ("session", session_id),
+                ("workflow_id", workflow_id), ("start", start), ("end", end), ("fields", fields)
+            ) if value is not None
+        )
+
+    def matches(self, seq: int, event_type: Optional[str] = None, session_id: Optional[str] = None,
+                timestamp: Optional[str] = None, workflow_id: Optional[int] = None) -> bool:
+        """Apply the cursor and filters to one item's metadata"""
+        if self.since is not None and seq <= self.since:
+            return False
+        if self.event_type is not None and event_type != self.event_type:
+            return False
+        if self.session_id is not None and session_id != self.session_id:
+            return False
+        if self.workflow_id is not None and workflow_id != self.workflow_id:
+            return False
+        if self.start or self.end:
+            try:
+                at = parse_time(timestamp)
+            except ValueError:
+                return False
+            if at is None or (self.start and at < self.start) or (self.end and at > self.end):
+                return False
+        return True
+
+    def page(self, rows: List[Tuple[int, Dict]]) -> Dict:
+        """Order matching (seq, item) rows by seq, cut at limit and project; next_since resumes the scan"""
+        rows = sorted(rows, key=lambda row: row[0])
+        has_more = self.limit is not None and len(rows) > self.limit
+        if has_more:
+            rows = rows[:self.limit]
+        items = [project(item, self.fields) if self.fields else item for _, item in rows]
+        return {
+            "items": items,
+            "next_since": rows[-1][0] if rows else (self.since or 0),
+            "has_more": has_more
+        }
+
+    def etag(self, collection: str, version: int) -> str:
+        """Strong ETag for this query against a collection version"""
+        digest = hashlib.sha1(self._key.encode("utf-8")).hexdigest()[:12]
+        return f'"{collection}-{version}-{digest}"'
@@ -0,0 +1,231 @@
+# LLM Response Cache - Memory LRU tier in front of a SQLite tier, keyed by model + prompt hash
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+from core.log import get_logger
+
+logger = get_logger("llm_cache")
+
+
+def make_cache_key(model: str, prompt: str) -> str:
+    """Content-addressed key: whitespace-normalized prompt hashed together with the model"""
+    normalized = " ".join(prompt.split())
+    return hashlib.sha256(f"{model}\0{normalized}".encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """Two-tier cache of LLM responses with TTL, size-based eviction and hit/miss metrics"""
+
+    def __init__(self, db_path: Optional[str] = None, ttl_seconds: float = 86400,
+                 max_memory_entries: int = 512, max_memory_bytes: int = 16 * 1024 * 1024,
+                 max_disk_entries: int = 10000, timeout: float = 1):
+        self.ttl = ttl_seconds
+        self.max_memory_entries = max_memory_entries
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_entries = max_disk_entries
+        self._memory = OrderedDict()  # key -> (expires_at, value)
+        self._memory_bytes = 0
+        self._lock = threading.Lock()  # memory tier and stats
+        self._db_lock = threading.Lock()  # SQLite connection, held only off the event loop
+        self._db = None
+        self._writes_since_prune = 0
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0,
+                      "memory_evictions": 0, "disk_evictions": 0, "expired": 0, "disk_errors": 0}
+
+        if db_path:
+            try:
+                os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+                self._db = sqlite3.connect(db_path, check_same_thread=False, timeout=timeout)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute("PRAGMA synchronous=NORMAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS llm_cache ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                    "created_at REAL NOT NULL, expires_at REAL NOT NULL)"
+                )
+                self._db.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_created ON llm_cache(created_at)")
+                self._db.commit()
+            except (sqlite3.Error, OSError) as e:
+                # The cache is best-effort: run memory-only rather than fail the client
+                logger.warning("LLM cache disk tier disabled: %s", e)
+                self.stats["disk_errors"] += 1
+                if self._db is not None:
+                    self._db.close()
+                    self._db = None
+
+    def get(self, key: str) -> Optional[str]:
+        """Look up a response, promoting disk hits into the memory tier (blocking on the disk tier)"""
+        now = time.time()
+        value = self._get_memory(key, now)
+        if value is None:
+            value = self._get_disk(key, now)
+        return value
+
+    def set(self, key: str, value: str):
+        """Store a response in both tiers (blocking on the disk tier)"""
+        now = time.time()
+        self._set_memory(key, value, now + self.ttl)
+        self._set_disk(key, value, now)
+
+    async def aget(self, key: str) -> Optional[str]:
+        """get() for the event loop: the disk tier is read on a worker thread"""
+        now = time.time()
+        value = self._get_memory(key, now)
+        if value is None:
+            if self._db is not None:
+                value = await asyncio.to_thread(self._get_disk, key, now)
+            else:
+                value = self._get_disk(key, now)
+        return value
+
+    async def aset(self, key: str, value: str):
+        """set() for the event loop: the disk tier is written on a worker thread"""
+        now = time.time()
+        self._set_memory(key, value, now + self.ttl)
+        if self._db is not None:
+            await asyncio.to_thread(self._set_disk, key, value, now)
+
+    def _get_memory(self, key: str, now: float) -> Optional[str]:
+        """Memory-tier lookup; counts hits and expiries but not misses"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at > now:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return value
+            self._drop_memory(key)
+            self.stats["expired"] += 1
+            return None
+
+    def _get_disk(self, key: str, now: float) -> Optional[str]:
+        """Disk-tier lookup after a memory miss; any SQLite error counts as a miss"""
+        value, expires_at, expired = None, 0.0, False
+        if self._db is not None:
+            try:
+                with self._db_lock:
+                    row = self._db.execute(
+                        "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row is not None:
+                        if row[1] > now:
+                            value, expires_at = row
+                        else:
+                            self._db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                            self._db.commit()
+                            expired = True
+            except sqlite3.Error as e:
+                self._disk_error("read", e)
+
+        with self._lock:
+            if expired:
+                self.stats["expired"] += 1
+            if value is None:
+                self.stats["misses"] += 1
+                return None
+            self._put_memory(key, value, expires_at)
+            self.stats["disk_hits"] += 1
+            return value
+
+    def _set_memory(self, key: str, value: str, expires_at: float):
+        """Memory-tier store"""
+        with self._lock:
+            self._put_memory(key, value, expires_at)
+            self.stats["stores"] += 1
+
+    def _set_disk(self, key: str, value: str, now: float):
+        """Write through to SQLite; a failed write only loses the disk copy"""
+        if self._db is None:
+            return
+        try:
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, value, created_at, expires_at) VALUES (?, ?, ?, ?)",
+                    (key, value, now, now + self.ttl)
+                )
+                self._writes_since_prune += 1
+                if self._writes_since_prune >= 100:
+                    self._prune_disk(now)
+                self._db.commit()
+        except sqlite3.Error as e:
+            if self._db is not None:
+                try:
+                    self._db.rollback()
+                except sqlite3.Error:
+                    pass
+            self._disk_error("write", e)
+
+    def _disk_error(self, operation: str, error: sqlite3.Error):
+        """Count and log a disk-tier failure (e.g. "database is locked" under several workers)"""
+        with self._lock:
+            self.stats["disk_errors"] += 1
+        logger.warning("LLM cache %s failed: %s", operation, error)
+
+    def _put_memory(self, key: str, value: str, expires_at: float):
+        """Insert into the LRU tier, evicting least recently used entries over the caps"""
+        self._drop_memory(key)
+        self._memory[key] = (expires_at, value)
+        self._memory_bytes += len(value)
+        while self._memory and (len(self._memory) > self.max_memory_entries
+                                or self._memory_bytes > self.max_memory_bytes):
+            oldest = next(iter(self._memory))
+            self._drop_memory(oldest)
+            self.stats["memory_evictions"] += 1
+
+    def _drop_memory(self, key: str):
+        """Remove a key from the memory tier, keeping the byte count in sync"""
+        entry = self._memory.pop(key, None)
+        if entry is not None:
+            self._memory_bytes -= len(entry[1])
+
+    def _prune_disk(self, now: float):
+        """Delete expired rows, then the oldest rows beyond max_disk_entries"""
+        self._writes_since_prune = 0
+        expired = self._db.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,)).rowcount
+        overflow = self._db.execute(
+            "DELETE FROM llm_cache WHERE key IN ("
+            "SELECT key FROM llm_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,)
+        ).rowcount
+        with self._lock:
+            self.stats["expired"] += expired
+            self.stats["disk_evictions"] += overflow
+
+    def get_stats(self) -> Dict:
+        """Hit/miss counters and tier sizes"""
+        disk_entries = 0
+        # Called from request handlers: report no count rather than wait behind a disk write
+        if self._db is not None and self._db_lock.acquire(blocking=False):
+            try:
+                disk_entries = self._db.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            except sqlite3.Error as e:
+                self._disk_error("count", e)
+                disk_entries = None
+            finally:
+                self._db_lock.release()
+        elif self._db is not None:
+            disk_entries = None
+        with self._lock:
+            lookups = self.stats["memory_hits"] + self.stats["disk_hits"] + self.stats["misses"]
+            hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+            return {
+                **self.stats,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_entries": disk_entries
+            }
+
+    def close(self):
+        """Close the SQLite tier"""
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
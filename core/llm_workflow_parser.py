@@ -1,16 +1,31 @@
 # Simple LLM-Based Workflow Parser using existing Gemini setup
 import json
 import re
-import requests
-from config import GEMINI_API_KEY
+from core.gemini_client import get_gemini_client, GeminiAPIError
+from core.intent_cache import get_intent_cache
+from core.log import get_logger
+
+logger = get_logger("parser")
 
 class LLMWorkflowParser:
     def __init__(self):
-        self.api_key = GEMINI_API_KEY
-        self.api_url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent?key={self.api_key}"
+        self.model = "gemini-2.5-flash"
+    
+    @property
+    def client(self):
+        """Shared Gemini client, created on the first LLM call"""
+        return get_gemini_client()
+    
+    @property
+    def intent_cache(self):
+        """Shared intent cache, opened on first use"""
+        return get_intent_cache()
     
-    def parse_workflow_intent(self, user_query: str) -> dict:
+    async def parse_workflow_intent(self, user_query: str) -> dict:
         """Parse user query to extract workflow intent using LLM"""
+        cached = self.intent_cache.get("llm_workflow_parser", user_query)
+        if cached is not None:
+            return cached
         
         # Use existing Gemini client through summarizer
         prompt = f"""Analyze this workflow request and return JSON:
@@ -28,31 +43,26 @@ Return only JSON:
 {{"trigger_type": "...", "conditions": {{}}, "actions": [...], "output_method": "...", "confidence": 0.95}}"""
 
         try:
-            # Use REST API like summarizer tool
-            payload = {"contents": [{"parts": [{"text": prompt}]}]}
-            response = requests.post(self.api_url, json=payload, timeout=30)
+            # Use shared REST client like summarizer tool
+            text = (await self.client.generate(prompt, self.model)).strip()
             
-            if response.status_code != 200:
-                print(f"Gemini API Error: {response.status_code}")
-                return self._fallback_parse(user_query)
+            # Parse JSON response
+            if text.startswith("```json"):
+                text = text[7:-3]
+            elif text.startswith("```"):
+                text = text[3:-3]
             
-            result = response.json()
-            if 'candidates' in result and len(result['candidates']) > 0:
-                text = result['candidates'][0]['content']['parts'][0]['text'].strip()
-                
-                # Parse JSON response
-                if text.startswith("```json"):
-                    text = text[7:-3]
-                elif text.startswith("```"):
-                    text = text[3:-3]
-                
-                return json.loads(text.strip())
-            else:
-                return self._fallback_parse(user_query)
+            intent = json.loads(text.strip())
             
+        except GeminiAPIError as e:
+            logger.warning("Gemini API error: %s", e.status_code)
+            return self._fallback_parse(user_query)
         except Exception as e:
-            print(f"LLM parsing failed: {e}")
+            logger.warning("LLM parsing failed: %s", e)
             return self._fallback_parse(user_query)
+        
+        await self.intent_cache.aset("llm_workflow_parser", user_query, intent)
+        return intent
     
     def _fallback_parse(self, query: str) -> dict:
         """Simple fallback parsing"""
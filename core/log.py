@@ -0,0 +1,198 @@
+# Log - Structured logging through a queue, formatted (truncated, redacted) off the hot path
+import atexit
+import json
+import logging
+import queue
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+from config import (
+    LOG_PROFILE,
+    LOG_LEVELS,
+    LOG_QUEUE_SIZE,
+    LOG_MAX_FIELD_CHARS,
+    LOG_MAX_ITEMS,
+    LOG_REDACT_KEYS,
+)
+
+ROOT_LOGGER = "syntra"
+REDACTED = "***"
+
+# Base level, line format and field size limit of each profile
+PROFILES = {
+    "production": {"level": "INFO", "format": "compact", "max_chars": LOG_MAX_FIELD_CHARS},
+    "json": {"level": "INFO", "format": "json", "max_chars": LOG_MAX_FIELD_CHARS},
+    "debug": {"level": "DEBUG", "format": "compact", "max_chars": LOG_MAX_FIELD_CHARS * 10},
+}
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger under the syntra hierarchy (e.g. "queue" -> syntra.queue)"""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def fields(**values) -> Dict:
+    """extra= argument carrying structured fields: logger.info("msg", extra=fields(a=1))"""
+    return {"fields": values}
+
+
+def truncate(text: str, limit: int) -> str:
+    """Cut long text, saying how much was dropped"""
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}…(+{len(text) - limit} chars)"
+
+
+def sanitize(value, limit: int, depth: int = 0):
+    """Copy of a value safe to log: secrets masked, long strings cut, big containers capped"""
+    if isinstance(value, str):
+        return truncate(value, limit)
+    if isinstance(value, (bytes, bytearray)):
+        return f"<{len(value)} bytes>"
+    if depth >= 3 and isinstance(value, (dict, list, tuple)):
+        return f"<{type(value).__name__} of {len(value)}>"
+    if isinstance(value, dict):
+        items = list(value.items())
+        clean = {
+            key: REDACTED if str(key).lower() in LOG_REDACT_KEYS else sanitize(item, limit, depth + 1)
+            for key, item in items[:LOG_MAX_ITEMS]
+        }
+        if len(items) > LOG_MAX_ITEMS:
+            clean["…"] = f"+{len(items) - LOG_MAX_ITEMS} keys"
+        return clean
+    if isinstance(value, (list, tuple)):
+        clean = [sanitize(item, limit, depth + 1) for item in value[:LOG_MAX_ITEMS]]
+        if len(value) > LOG_MAX_ITEMS:
+            clean.append(f"…+{len(value) - LOG_MAX_ITEMS} items")
+        return clean
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    return truncate(str(value), limit)
+
+
+class _StructuredFormatter(logging.Formatter):
+    """Sanitizes message arguments and fields; runs on the listener thread"""
+
+    def __init__(self, max_chars: int):
+        super().__init__()
+        self.max_chars = max_chars
+
+    def _parts(self, record: logging.LogRecord):
+        if isinstance(record.args, dict):
+            record.args = sanitize(record.args, self.max_chars)
+        elif record.args:
+            record.args = tuple(sanitize(arg, self.max_chars) for arg in record.args)
+        message = truncate(record.getMessage(), self.max_chars * 5)
+        values = sanitize(getattr(record, "fields", None) or {}, self.max_chars)
+        error = self.formatException(record.exc_info) if record.exc_info else None
+        return message, values, error
+
+    @staticmethod
+    def _timestamp(record: logging.LogRecord) -> str:
+        return datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds")
+
+
+class CompactFormatter(_StructuredFormatter):
+    """One line: time level logger message key=value ..."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        message, values, error = self._parts(record)
+        pairs = " ".join(f"{key}={self._value(value)}" for key, value in values.items() if value is not None)
+        line = f"{self._timestamp(record)} {record.levelname} {record.name} {message}"
+        if pairs:
+            line = f"{line} {pairs}"
+        return f"{line}\n{error}" if error else line
+
+    @staticmethod
+    def _value(value) -> str:
+        if isinstance(value, str) and value and not any(c in value for c in ' "=\n'):
+            return value
+        return json.dumps(value, ensure_ascii=False, default=str)
+
+
+class JSONFormatter(_StructuredFormatter):
+    """One JSON object per line, for log shippers"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        message, values, error = self._parts(record)
+        entry = {
+            "ts": self._timestamp(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": message,
+            **values
+        }
+        if error:
+            entry["error"] = error
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Hands records to the listener thread; drops (and counts) them when the queue is full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting (interpolation, truncation, redaction) happens on the listener thread
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener: Optional[QueueListener] = None
+_handler: Optional[NonBlockingQueueHandler] = None
+_profile: Optional[str] = None
+
+
+def configure_logging(profile: str = LOG_PROFILE, levels: Optional[Dict[str, str]] = None):
+    """Route syntra.* loggers through the queue with the profile's format and per-module levels"""
+    global _listener, _handler, _profile
+    if _listener is not None:
+        return
+    _profile = profile if profile in PROFILES else "production"
+    settings = PROFILES[_profile]
+    formatter_class = JSONFormatter if settings["format"] == "json" else CompactFormatter
+    output = logging.StreamHandler()
+    output.setFormatter(formatter_class(settings["max_chars"]))
+
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    _handler = NonBlockingQueueHandler(log_queue)
+    _listener = QueueListener(log_queue, output)
+    _listener.start()
+
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(settings["level"])
+    root.addHandler(_handler)
+    root.propagate = False
+    for name, level in (LOG_LEVELS if levels is None else levels).items():
+        logging.getLogger(name).setLevel(level)
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener, _handler
+    if _listener is None:
+        return
+    logging.getLogger(ROOT_LOGGER).removeHandler(_handler)
+    _listener.stop()
+    _listener = None
+    _handler = None
+
+
+def get_log_stats() -> Dict:
+    """Queue depth and records dropped because the queue was full"""
+    if _handler is None:
+        return {"configured": False}
+    return {
+        "configured": True,
+        "profile": _profile,
+        "queued": _handler.queue.qsize(),
+        "dropped": _handler.dropped
+    }
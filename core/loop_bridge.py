@@ -0,0 +1,54 @@
+# Loop Bridge - Hands trigger callbacks from watcher threads to the server event loop
+import asyncio
+import inspect
+import threading
+from typing import Callable, Optional, Set
+from core.log import get_logger
+
+logger = get_logger("loop")
+
+
+class LoopBridge:
+    """Runs trigger callbacks on the main event loop, whichever thread fires them"""
+
+    def __init__(self):
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._tasks: Set[asyncio.Task] = set()  # keeps coroutine callbacks alive until they finish
+
+    def attach(self, loop: asyncio.AbstractEventLoop = None):
+        """Bind the bridge to the server loop; call from inside that loop on startup"""
+        self.loop = loop or asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+
+    def call(self, callback: Callable, *args):
+        """Invoke callback on the loop thread; returns immediately when called from another thread"""
+        if inspect.iscoroutinefunction(callback):
+            callback = self._as_task(callback)
+        if self.loop is None or threading.get_ident() == self._loop_thread:
+            return callback(*args)
+
+        if self.loop.is_closed():
+            logger.warning("Event loop closed, dropping callback %s", getattr(callback, '__name__', callback))
+            return None
+
+        self.loop.call_soon_threadsafe(callback, *args)
+        return None
+
+    def _as_task(self, coroutine_function: Callable) -> Callable:
+        """Plain callback that runs a coroutine function as a task on the current loop"""
+        def start(*args):
+            task = asyncio.ensure_future(coroutine_function(*args))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            return task
+
+        return start
+
+    def wrap(self, callback: Callable) -> Callable:
+        """Wrap a trigger callback so BaseTrigger.fire hands its event to the loop"""
+        def bridged(event):
+            return self.call(callback, event)
+
+        bridged.__name__ = getattr(callback, "__name__", "bridged_callback")
+        return bridged
@@ -0,0 +1,35 @@
+# Rate Window - Sliding event rate from a fixed ring of time buckets
+import time
+from typing import List
+
+
+class RateWindow:
+    """Counts per time bucket in a ring; the rate covers the last buckets * bucket_seconds"""
+
+    def __init__(self, bucket_seconds: float = 5, buckets: int = 12):
+        self.bucket_seconds = bucket_seconds
+        self.buckets = buckets
+        self._counts: List[int] = [0] * buckets
+        self._stamps: List[int] = [-1] * buckets  # absolute bucket index each slot currently holds
+
+    def _index(self) -> int:
+        """Absolute number of the current bucket"""
+        return int(time.time() // self.bucket_seconds)
+
+    def record(self, amount: int = 1):
+        """Add to the current bucket, recycling the slot if it holds an old bucket"""
+        index = self._index()
+        slot = index % self.buckets
+        if self._stamps[slot] != index:
+            self._stamps[slot] = index
+            self._counts[slot] = 0
+        self._counts[slot] += amount
+
+    def total(self) -> int:
+        """Count over the window (constant time: one pass over a fixed ring)"""
+        oldest = self._index() - self.buckets
+        return sum(count for count, stamp in zip(self._counts, self._stamps) if stamp > oldest)
+
+    def per_minute(self) -> float:
+        """Window count scaled to a per-minute rate"""
+        return round(self.total() * 60 / (self.bucket_seconds * self.buckets), 2)
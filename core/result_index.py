@@ -0,0 +1,87 @@
+# Result Index - Secondary indexes over stored results (session, workflow, event type, hour)
+from typing import Dict, Iterable, List, Optional
+
+INDEXED_FIELDS = ("session_id", "workflow_id", "event_type", "hour")
+
+
+def index_keys(stored_result: Dict) -> Dict[str, object]:
+    """Index values of a stored result; hour buckets are 'YYYY-MM-DDTHH' prefixes of created_at"""
+    result = stored_result.get("result", {})
+    return {
+        "session_id": stored_result.get("session_id"),
+        "workflow_id": result.get("workflow_id"),
+        "event_type": result.get("event_type"),
+        "hour": (stored_result.get("created_at") or "")[:13] or None,
+    }
+
+
+class ResultIndex:
+    """field -> value -> result ids, maintained on every store, update and eviction.
+
+    Writers (serialized by the owner) copy the buckets they touch and swap them in,
+    so lookups never see a bucket change size under them.
+    """
+
+    def __init__(self):
+        self._index: Dict[str, Dict[object, Dict[str, None]]] = {field: {} for field in INDEXED_FIELDS}
+        self._keys: Dict[str, Dict[str, object]] = {}  # result id -> the values it is indexed under, writers only
+
+    def add(self, stored_result: Dict):
+        """Index a result (re-indexes if its values changed)"""
+        self.remove(stored_result["id"])
+        keys = index_keys(stored_result)
+        for field, value in keys.items():
+            if value is not None:
+                values = dict(self._index[field])
+                values[value] = {**values.get(value, {}), stored_result["id"]: None}
+                self._index[field] = values
+        self._keys[stored_result["id"]] = keys
+
+    def remove(self, result_id: str):
+        """Drop a result from every index"""
+        keys = self._keys.pop(result_id, None)
+        if keys is None:
+            return
+        for field, value in keys.items():
+            if value not in self._index[field]:
+                continue
+            values = dict(self._index[field])
+            bucket = {key: None for key in values[value] if key != result_id}
+            if bucket:
+                values[value] = bucket
+            else:
+                del values[value]
+            self._index[field] = values
+
+    def lookup(self, field: str, value) -> Dict[str, None]:
+        """Ids of results indexed under field == value"""
+        return self._index[field].get(value, {})
+
+    def hours(self, start: Optional[str] = None, end: Optional[str] = None) -> Iterable[str]:
+        """Hour buckets overlapping [start, end] (ISO strings, either side optional)"""
+        start_hour = start[:13] if start else None
+        end_hour = end[:13] if end else None
+        return [
+            hour for hour in self._index["hour"]
+            if (start_hour is None or hour >= start_hour) and (end_hour is None or hour <= end_hour)
+        ]
+
+    def candidates(self, session_id=None, workflow_id=None, event_type=None,
+                   start: Optional[str] = None, end: Optional[str] = None) -> Optional[List[str]]:
+        """Smallest id set covering the filters, or None when no filter is indexable (full scan)"""
+        buckets = []
+        for field, value in (("session_id", session_id), ("workflow_id", workflow_id), ("event_type", event_type)):
+            if value is not None:
+                buckets.append(self.lookup(field, value).keys())
+        if start or end:
+            ids: Dict[str, None] = {}
+            for hour in self.hours(start, end):
+                ids.update(self.lookup("hour", hour))
+            buckets.append(ids.keys())
+        if not buckets:
+            return None
+        return list(min(buckets, key=len))
+
+    def get_stats(self) -> Dict:
+        """Distinct values per indexed field"""
+        return {field: len(values) for field, values in self._index.items()}
@@ -0,0 +1,82 @@
+# Result Stream - Fans out partial LLM output per result id to Server-Sent Events subscribers
+import asyncio
+from contextvars import ContextVar
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+# Set by the workflow runner; LLMProcessor streams the final call of a result into it
+token_sink: ContextVar[Optional[Callable[[str], None]]] = ContextVar("token_sink", default=None)
+
+
+class _ResultStream:
+    """Text generated so far for one result plus its live subscribers"""
+
+    def __init__(self):
+        self.text: List[str] = []
+        self.subscribers: List[asyncio.Queue] = []
+
+
+class ResultStreamHub:
+    """Open streams keyed by result id; late subscribers get a snapshot before live tokens"""
+
+    def __init__(self, keepalive_seconds: float = 15):
+        self.keepalive_seconds = keepalive_seconds
+        self._streams: Dict[str, _ResultStream] = {}
+        self.stats = {"opened": 0, "tokens": 0, "subscribers": 0}
+
+    def open(self, result_id: str):
+        """Start buffering tokens for a result"""
+        self._streams[result_id] = _ResultStream()
+        self.stats["opened"] += 1
+
+    def is_open(self, result_id: str) -> bool:
+        """Whether the result is still being generated"""
+        return result_id in self._streams
+
+    def sink(self, result_id: str) -> Callable[[str], None]:
+        """Callback that publishes text deltas for a result"""
+        return lambda delta: self.publish(result_id, delta)
+
+    def publish(self, result_id: str, delta: str):
+        """Record a text delta and push it to every subscriber"""
+        stream = self._streams.get(result_id)
+        if stream is None or not delta:
+            return
+        stream.text.append(delta)
+        self.stats["tokens"] += 1
+        for queue in stream.subscribers:
+            queue.put_nowait(("token", {"delta": delta}))
+
+    def close(self, result_id: str, result: Dict):
+        """Send the final result to subscribers and forget the stream"""
+        stream = self._streams.pop(result_id, None)
+        if stream is None:
+            return
+        for queue in stream.subscribers:
+            queue.put_nowait(("done", result))
+
+    async def subscribe(self, result_id: str) -> AsyncIterator[Tuple[Optional[str], Dict]]:
+        """Yield (event, data) pairs until the result is done; (None, {}) is a keep-alive tick"""
+        stream = self._streams.get(result_id)
+        if stream is None:
+            return
+        queue: asyncio.Queue = asyncio.Queue()
+        stream.subscribers.append(queue)
+        self.stats["subscribers"] += 1
+        try:
+            yield "snapshot", {"content": "".join(stream.text)}
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), self.keepalive_seconds)
+                except asyncio.TimeoutError:
+                    yield None, {}
+                    continue
+                yield event, data
+                if event == "done":
+                    return
+        finally:
+            if queue in stream.subscribers:
+                stream.subscribers.remove(queue)
+
+    def get_stats(self) -> Dict:
+        """Stream counters"""
+        return {**self.stats, "open_streams": len(self._streams)}
@@ -1,16 +1,103 @@
 # ADK-Compatible In-Memory Session Service
+from collections import Counter
 from datetime import datetime
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
+import threading
 import uuid
+from core.workflow_router import WorkflowRouter
+from core.change_feed import ChangeFeed
+from core.list_query import ListQuery
+from core.rate_window import RateWindow
+from core.bounded_store import BoundedStore, clip_strings
+from core.result_index import ResultIndex
+from core.log import get_logger
+from config import MAX_EVENTS, MAX_RESULTS, MAX_EVENT_BYTES, MAX_RESULT_BYTES, MAX_STORED_FIELD_CHARS
+
+logger = get_logger("session")
 
 class InMemorySessionService:
+    """Writers (watcher threads and the event loop) serialize on one lock and publish immutable
+    snapshots; readers grab the current snapshot and never lock."""
+
     def __init__(self, app_name: str = "workflow_synthesizer"):
         self.app_name = app_name
+        self._lock = threading.RLock()
         self.sessions = {}
-        self.results = {}
-        self.workflows = []
-        self.events = []
-        print(f"Session service initialized: {app_name}")
+        self.results = BoundedStore(MAX_RESULTS, MAX_RESULT_BYTES)
+        self.result_index = ResultIndex()
+        self.workflows: Tuple[Dict, ...] = ()
+        self.events = BoundedStore(MAX_EVENTS, MAX_EVENT_BYTES)
+        self.router = WorkflowRouter()
+        self._next_workflow_id = 1
+        self.changes = ChangeFeed()
+        # Monotonic sequence shared by all collections; versions back list cursors and ETags
+        self._seq = 0
+        self.versions = {"events": 0, "results": 0, "workflows": 0}
+        # Running counters kept in step with every store/evict/delete so stats are O(1); replaced, never mutated
+        self.event_type_counts = Counter()
+        self.counters = {"file_events": 0, "active_workflows": 0, "smart_workflows": 0, "smart_confidence_sum": 0.0}
+        self.event_rate = RateWindow()
+        self.result_rate = RateWindow()
+        logger.info("Session service initialized: %s", app_name)
+    
+    def _touch(self, collection: str) -> int:
+        """Allocate the next sequence number and mark a collection as changed (caller holds the lock)"""
+        self._seq += 1
+        self.versions = {**self.versions, collection: self._seq}
+        return self._seq
+    
+    def _allocate_workflow_id(self) -> int:
+        """Next workflow id (caller holds the lock)"""
+        workflow_id = self._next_workflow_id
+        self._next_workflow_id += 1
+        return workflow_id
+    
+    def _emit(self, kind: str, op: str, data: Dict, record: Optional[Dict] = None):
+        """Publish a change; persistent backends also write the full record (defaults to data)"""
+        self.changes.publish(kind, op, data)
+    
+    def close(self):
+        """Flush and release storage (nothing to do in memory)"""
+    
+    def _count_event(self, event: Dict, sign: int):
+        """Apply an event to the running counters (sign -1 when it leaves the store)"""
+        payload = event.get("payload", {})
+        event_type_counts = self.event_type_counts.copy()
+        event_type_counts[payload.get("event_type") or "unknown"] += sign
+        self.event_type_counts = event_type_counts
+        if "file_name" in payload:
+            self.counters = {**self.counters, "file_events": self.counters["file_events"] + sign}
+    
+    def _count_workflow(self, workflow: Dict, sign: int):
+        """Apply a workflow to the running counters (sign -1 when it is deleted)"""
+        counters = dict(self.counters)
+        if workflow.get("status") == "active":
+            counters["active_workflows"] += sign
+        config = workflow.get("config", {})
+        if config.get("smart_created", False):
+            counters["smart_workflows"] += sign
+            counters["smart_confidence_sum"] += sign * config.get("confidence", 0)
+        self.counters = counters
+    
+    def get_stats(self) -> Dict:
+        """Snapshot of the running counters and recent rates"""
+        counters, event_type_counts = self.counters, self.event_type_counts
+        smart = counters["smart_workflows"]
+        return {
+            "total_events": len(self.events),
+            "events_by_type": {t: n for t, n in event_type_counts.items() if n},
+            "email_events": event_type_counts["email_compose"],
+            "file_events": counters["file_events"],
+            "article_events": event_type_counts["article_read"],
+            "active_workflows": counters["active_workflows"],
+            "results_generated": len(self.results),
+            "smart_workflows": smart,
+            "avg_confidence": counters["smart_confidence_sum"] / smart if smart else 0,
+            "events_per_minute": self.event_rate.per_minute(),
+            "results_per_minute": self.result_rate.per_minute(),
+            "storage": {"events": self.events.get_stats(), "results": self.results.get_stats()},
+            "result_index": self.result_index.get_stats()
+        }
     
     async def create_session(self, app_name: str, user_id: str, session_id: Optional[str] = None) -> Dict:
         """Create new ADK-compatible session"""
@@ -25,38 +112,82 @@ class InMemorySessionService:
             "messages": [],
             "status": "active"
         }
-        self.sessions[session_id] = session
-        print(f"Session created: {session_id} for user {user_id}")
+        with self._lock:
+            self.sessions = {**self.sessions, session_id: session}
+        logger.debug("Session created: %s for user %s", session_id, user_id)
         return session
     
     def add_message(self, session_id: str, role: str, content: str):
         """Add message to session"""
-        if session_id in self.sessions:
-            self.sessions[session_id]["messages"].append({
-                "role": role,
-                "content": content,
-                "timestamp": datetime.now().isoformat()
-            })
-    
-    def store_result(self, session_id: str, result: dict) -> str:
-        """Store result with observability"""
-        result_id = str(uuid.uuid4())
-        stored_result = {
-            "id": result_id,
-            "session_id": session_id,
-            "result": result,
-            "created_at": datetime.now().isoformat()
-        }
-        self.results[result_id] = stored_result
-        
-        # Maintain size limit
-        if len(self.results) > 50:
-            oldest_id = min(self.results.keys(), key=lambda k: self.results[k]["created_at"])
-            del self.results[oldest_id]
+        message = {"role": role, "content": content, "timestamp": datetime.now().isoformat()}
+        with self._lock:
+            session = self.sessions.get(session_id)
+            if session is not None:
+                session = {**session, "messages": session["messages"] + [message]}
+                self.sessions = {**self.sessions, session_id: session}
+    
+    def store_result(self, session_id: str, result: dict, result_id: Optional[str] = None) -> str:
+        """Store result with observability (result_id may be pre-allocated for streaming)"""
+        result_id = result_id or str(uuid.uuid4())
+        with self._lock:
+            stored_result = {
+                "id": result_id,
+                "session_id": session_id,
+                "result": result,
+                "created_at": datetime.now().isoformat(),
+                "seq": self._touch("results")
+            }
+            evicted = self.results.add(result_id, stored_result)
+            self.result_index.add(stored_result)
+            self.result_rate.record()
+            self._emit("result", "added", self._result_view(stored_result), stored_result)
+            self._evicted_results(evicted)
         
-        print(f"Result stored: {result_id} type={result.get('type')}")
+        logger.debug("Result stored: %s type=%s", result_id, result.get('type'))
         return result_id
     
+    def update_result(self, result_id: str, result: dict) -> bool:
+        """Replace the payload of a stored result, keeping its id and position"""
+        with self._lock:
+            stored_result = self.results.get(result_id)
+            if stored_result is None:
+                return False
+            stored_result = {**stored_result, "result": result, "seq": self._touch("results")}
+            # The new seq lets since-cursor clients pick up the change
+            evicted = self.results.replace(result_id, stored_result)
+            self.result_index.add(stored_result)
+            self._emit("result", "updated", self._result_view(stored_result), stored_result)
+            self._evicted_results(evicted)
+        return True
+    
+    def _evicted_results(self, evicted: List[Dict]):
+        """Announce results pushed out of the ring buffer"""
+        for old in evicted:
+            self.result_index.remove(old["id"])
+            self._touch("results")
+            self._emit("result", "removed", {"id": old["id"]})
+    
+    def _result_view(self, stored_result: Dict) -> Dict:
+        """Public shape of a stored result: its payload plus id and seq"""
+        return {**stored_result["result"], "id": stored_result["id"], "seq": stored_result["seq"]}
+    
+    def query_results(self, query: ListQuery) -> Dict:
+        """Results page for a list query, narrowed through the secondary indexes when possible"""
+        ids = self.result_index.candidates(
+            session_id=query.session_id,
+            workflow_id=query.workflow_id,
+            event_type=query.event_type,
+            start=query.start.isoformat() if query.start else None,
+            end=query.end.isoformat() if query.end else None
+        )
+        candidates = self.results.values() if ids is None else filter(None, map(self.results.get, ids))
+        rows = [
+            (r["seq"], self._result_view(r)) for r in candidates
+            if query.matches(r["seq"], r["result"].get("event_type"), r["session_id"], r["created_at"],
+                             r["result"].get("workflow_id"))
+        ]
+        return query.page(rows)
+    
     def get_result(self, result_id: str) -> Optional[dict]:
         """Get result by ID"""
         return self.results.get(result_id)
@@ -68,49 +199,87 @@ class InMemorySessionService:
     def store_event(self, event_data: Dict) -> str:
         """Store event with size management"""
         event_id = str(uuid.uuid4())
+        # Stored copy with oversized fields clipped so one article cannot blow the byte cap
         event = {
             "id": event_id,
             "timestamp": datetime.now().isoformat(),
-            **event_data
+            **clip_strings(event_data, MAX_STORED_FIELD_CHARS)
         }
-        self.events.append(event)
-        
-        # Maintain size limit
-        if len(self.events) > 100:
-            self.events.pop(0)
+        with self._lock:
+            event["seq"] = self._touch("events")
+            evicted = self.events.add(event_id, event)
+            self._count_event(event, 1)
+            self.event_rate.record()
+            self._emit("event", "added", event)
+            
+            for old in evicted:
+                self._count_event(old, -1)
+                self._touch("events")
+                self._emit("event", "removed", {"id": old["id"]})
         
-        print(f"Event stored: {event_id} type={event_data.get('trigger_type')}")
+        logger.debug("Event stored: %s type=%s", event_id, event_data.get('trigger_type'))
         return event_id
     
     def get_all_events(self) -> List[Dict]:
         """Get all events"""
-        return self.events
+        return list(self.events.values())
+    
+    def query_events(self, query: ListQuery) -> Dict:
+        """Events page for a list query"""
+        rows = [
+            (e["seq"], e) for e in self.events.values()
+            if query.matches(e["seq"], e.get("payload", {}).get("event_type"),
+                             e.get("payload", {}).get("session_id"), e.get("timestamp"))
+        ]
+        return query.page(rows)
     
     def store_workflow(self, workflow_data: Dict) -> Dict:
         """Store workflow"""
-        workflow = {
-            "id": len(self.workflows) + 1,
-            "created_at": datetime.now().isoformat(),
-            "status": "active",
-            **workflow_data
-        }
-        self.workflows.append(workflow)
+        with self._lock:
+            workflow = {
+                "id": self._allocate_workflow_id(),
+                "created_at": datetime.now().isoformat(),
+                "status": "active",
+                **workflow_data,
+                "seq": self._touch("workflows")
+            }
+            self.workflows = self.workflows + (workflow,)
+            self.router.add(workflow)
+            self._count_workflow(workflow, 1)
+            self._emit("workflow", "added", workflow)
         
-        print(f"Workflow stored: {workflow['id']} - {workflow_data.get('query')}")
+        logger.info("Workflow stored: %s - %s", workflow['id'], workflow_data.get('query'))
         return workflow
     
     def get_all_workflows(self) -> List[Dict]:
         """Get all workflows"""
-        return self.workflows
+        return list(self.workflows)
+    
+    def query_workflows(self, query: ListQuery) -> Dict:
+        """Workflows page for a list query"""
+        rows = [
+            (w["seq"], w) for w in self.workflows
+            if query.matches(w["seq"], w.get("trigger_type"), w.get("session_id"), w.get("created_at"))
+        ]
+        return query.page(rows)
+    
+    def match_workflows(self, event_data: Dict) -> List[Dict]:
+        """Get all active workflows matching an event via the routing index"""
+        return self.router.match(event_data)
     
     def delete_workflow(self, workflow_id: int) -> bool:
         """Delete workflow by ID"""
-        for i, workflow in enumerate(self.workflows):
-            if workflow["id"] == workflow_id:
-                del self.workflows[i]
-                print(f"Workflow deleted: {workflow_id}")
-                return True
-        return False
+        with self._lock:
+            workflow = next((w for w in self.workflows if w["id"] == workflow_id), None)
+            if workflow is None:
+                return False
+            self.workflows = tuple(w for w in self.workflows if w["id"] != workflow_id)
+            self.router.remove(workflow_id)
+            self._count_workflow(workflow, -1)
+            self._touch("workflows")
+            self._emit("workflow", "removed", {"id": workflow_id})
+        logger.info("Workflow deleted: %s", workflow_id)
+        return True
     
     async def get_session(self, app_name: str, user_id: str, session_id: str) -> Optional[Dict]:
         """Get ADK-compatible session"""
@@ -0,0 +1,82 @@
+# Shared State - Cross-process primitives for multi-worker mode (file locks and counters)
+import os
+import threading
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, multi-worker mode is unsupported
+    fcntl = None
+
+
+def _open(path: str) -> int:
+    """Open (creating) a small state file shared by every worker"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    return os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+
+
+class ProcessLock:
+    """Non-blocking exclusive lock held for the life of the process; the OS frees it if the holder dies"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+        self.acquired = False
+
+    def acquire(self) -> bool:
+        """Try to take the lock once; True if this process now owns it"""
+        if self.acquired:
+            return True
+        if fcntl is None:
+            self.acquired = True
+            return True
+        fd = _open(self.path)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        self.acquired = True
+        return True
+
+    def release(self):
+        """Give up the lock so another worker can take over"""
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+        self.acquired = False
+
+
+class SharedCounter:
+    """Monotonic integer shared by every worker through a locked 8-byte file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd = _open(path)
+        self._lock = threading.Lock()
+
+    def _update(self, step) -> int:
+        """Read-modify-write the counter under the file lock"""
+        with self._lock:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                raw = os.pread(self._fd, 8, 0)
+                value = step(int.from_bytes(raw, "little") if len(raw) == 8 else 0)
+                os.pwrite(self._fd, value.to_bytes(8, "little"), 0)
+                return value
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def next(self) -> int:
+        """Allocate the next value"""
+        return self._update(lambda value: value + 1)
+
+    def advance_to(self, floor: int) -> int:
+        """Make sure the counter is at least floor (e.g. after loading existing rows)"""
+        return self._update(lambda value: max(value, floor))
@@ -2,6 +2,9 @@
 from core.llm_workflow_parser import LLMWorkflowParser
 from core.trigger_manager import TriggerManager
 import datetime
+from core.log import get_logger
+
+logger = get_logger("triggers")
 
 class SmartTriggerService:
     def __init__(self, trigger_manager: TriggerManager):
@@ -9,16 +12,16 @@ class SmartTriggerService:
         self.trigger_manager = trigger_manager
         self.created_triggers = {}
     
-    def create_trigger_from_query(self, user_query: str) -> dict:
+    async def create_trigger_from_query(self, user_query: str) -> dict:
         """Create intelligent trigger from natural language query"""
-        print(f"🧠 Analyzing query: '{user_query}'")
+        logger.debug("Analyzing query: %r", user_query)
         
         try:
             # Parse workflow intent using LLM
-            workflow_intent = self.parser.parse_workflow_intent(user_query)
+            workflow_intent = await self.parser.parse_workflow_intent(user_query)
             
-            print(f"📋 Detected: {workflow_intent['trigger_type']} -> {workflow_intent['actions']}")
-            print(f"🎯 Confidence: {workflow_intent['confidence']:.2f}")
+            logger.info("Detected: %s -> %s (confidence %.2f)", workflow_intent['trigger_type'],
+                        workflow_intent['actions'], workflow_intent['confidence'])
             
             # Create trigger configuration
             trigger_config = self.parser.create_trigger_config(workflow_intent)
@@ -52,10 +55,10 @@ class SmartTriggerService:
                 "message": f"Failed to create trigger: {str(e)}"
             }
     
-    def get_trigger_recommendations(self, user_query: str) -> dict:
+    async def get_trigger_recommendations(self, user_query: str) -> dict:
         """Get recommendations for improving the trigger"""
         try:
-            workflow_intent = self.parser.parse_workflow_intent(user_query)
+            workflow_intent = await self.parser.parse_workflow_intent(user_query)
             
             recommendations = []
             confidence = workflow_intent.get("confidence", 0)
@@ -104,7 +107,7 @@ class SmartTriggerService:
         if trigger_id in self.created_triggers:
             trigger_info = self.created_triggers[trigger_id]
             trigger_info["trigger"].start()
-            print(f"✅ Started trigger: {trigger_id}")
+            logger.info("Started trigger: %s", trigger_id)
             return True
         return False
     
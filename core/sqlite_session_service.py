@@ -0,0 +1,400 @@
+# SQLite Session Service - Persistent drop-in for InMemorySessionService (WAL + write-behind)
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional, Tuple
+from core.session_service import InMemorySessionService
+from core.shared_state import SharedCounter
+from core.log import get_logger
+from config import SESSION_WRITE_BATCH, SESSION_SYNC_INTERVAL, SESSION_CHANGE_LOG_KEEP
+
+logger = get_logger("session")
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS workflows ("
+    "id INTEGER PRIMARY KEY, seq INTEGER NOT NULL, trigger_type TEXT, status TEXT, "
+    "session_id TEXT, created_at TEXT, data TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS events ("
+    "id TEXT PRIMARY KEY, seq INTEGER NOT NULL, trigger_type TEXT, event_type TEXT, "
+    "session_id TEXT, created_at TEXT, data TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS results ("
+    "id TEXT PRIMARY KEY, seq INTEGER NOT NULL, session_id TEXT, workflow_id INTEGER, "
+    "event_type TEXT, status TEXT, created_at TEXT, data TEXT NOT NULL)",
+    # Multi-worker mode: every write is also logged here so the other workers can replay it
+    "CREATE TABLE IF NOT EXISTS changes ("
+    "id INTEGER PRIMARY KEY AUTOINCREMENT, origin TEXT NOT NULL, seq INTEGER NOT NULL, "
+    "kind TEXT NOT NULL, op TEXT NOT NULL, record_id TEXT NOT NULL, data TEXT)",
+    # Reads are served from memory; SQLite is only queried by seq (warm load, trimming)
+    "CREATE INDEX IF NOT EXISTS idx_events_seq ON events(seq)",
+    "CREATE INDEX IF NOT EXISTS idx_results_seq ON results(seq)",
+    # Secondary indexes from earlier versions cost every batched write and were never read
+    *(f"DROP INDEX IF EXISTS {name}" for name in (
+        "idx_workflows_trigger_status", "idx_workflows_created", "idx_events_trigger",
+        "idx_events_session", "idx_events_created", "idx_results_session", "idx_results_workflow",
+        "idx_results_event_type", "idx_results_status", "idx_results_created",
+    )),
+]
+
+UPSERT = {
+    "workflow": "INSERT OR REPLACE INTO workflows (id, seq, trigger_type, status, session_id, created_at, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+    "event": "INSERT OR REPLACE INTO events (id, seq, trigger_type, event_type, session_id, created_at, data) "
+             "VALUES (?, ?, ?, ?, ?, ?, ?)",
+    "result": "INSERT OR REPLACE INTO results (id, seq, session_id, workflow_id, event_type, status, created_at, data) "
+              "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+}
+
+DELETE = {
+    "workflow": "DELETE FROM workflows WHERE id = ?",
+    "event": "DELETE FROM events WHERE id = ?",
+    "result": "DELETE FROM results WHERE id = ?",
+}
+
+LOG_CHANGE = "INSERT INTO changes (origin, seq, kind, op, record_id, data) VALUES (?, ?, ?, ?, ?, ?)"
+TRIM_CHANGES = "DELETE FROM changes WHERE id <= (SELECT MAX(id) FROM changes) - ?"
+
+COLLECTIONS = {"event": "events", "result": "results", "workflow": "workflows"}
+
+_STOP = object()
+
+
+class SQLiteSessionService(InMemorySessionService):
+    """Same API and in-memory hot path; every change is persisted by a background writer.
+
+    With shared=True several worker processes use one database: sequence numbers and workflow
+    ids come from cross-process counters, and each worker replays the others' changes from
+    the change log every SESSION_SYNC_INTERVAL seconds.
+    """
+
+    def __init__(self, app_name: str = "workflow_synthesizer", db_path: str = "sessions.sqlite3",
+                 shared: bool = False):
+        super().__init__(app_name)
+        self.db_path = db_path
+        self.shared = shared
+        self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._writes: "queue.Queue" = queue.Queue()
+        self.write_stats = {"queued": 0, "written": 0, "batches": 0, "errors": 0}
+        self.sync_stats = {"applied": 0, "polls": 0, "gaps": 0, "errors": 0}
+        # Called as listener(kind, op, record) on the sync thread after another worker's change is applied
+        self.listeners: List[Callable[[str, str, Dict], None]] = []
+        self._last_change = 0
+
+        started = time.perf_counter()
+        db = self._connect()
+        for statement in SCHEMA:
+            db.execute(statement)
+        db.commit()
+        if shared:
+            # Read the log position first: anything committed during the load is replayed (idempotently)
+            self._last_change = db.execute("SELECT COALESCE(MAX(id), 0) FROM changes").fetchone()[0]
+        self._warm_load(db)
+        db.close()
+        self.warm_load_ms = round((time.perf_counter() - started) * 1000, 2)
+        logger.info("Session store loaded from %s in %sms: %d workflows, %d events, %d results",
+                    db_path, self.warm_load_ms, len(self.workflows), len(self.events), len(self.results))
+
+        self._seq_counter = self._workflow_counter = None
+        if shared:
+            self._seq_counter = SharedCounter(f"{db_path}.seq")
+            self._seq_counter.advance_to(self._seq)
+            self._workflow_counter = SharedCounter(f"{db_path}.workflow_id")
+            self._workflow_counter.advance_to(self._next_workflow_id - 1)
+
+        self._stopping = threading.Event()
+        self._writer = threading.Thread(target=self._write_loop, name="session-writer", daemon=True)
+        self._writer.start()
+        self._syncer = None
+        if shared:
+            self._syncer = threading.Thread(target=self._sync_loop, name="session-sync", daemon=True)
+            self._syncer.start()
+        else:
+            # In shared mode a sibling worker may still be streaming them
+            self._interrupt_leftover_streams()
+
+    def _interrupt_leftover_streams(self):
+        """Mark results left 'streaming' by a crash or kill as interrupted, as a cancelled run would"""
+        leftovers = [stored for stored in self.results.values() if stored["result"].get("status") == "streaming"]
+        for stored in leftovers:
+            self.update_result(stored["id"], {
+                **stored["result"], "status": "interrupted",
+                "content": "Interrupted by server shutdown", "success": False
+            })
+        if leftovers:
+            logger.info("Marked %d results left streaming by the last run as interrupted", len(leftovers))
+
+    def _connect(self) -> sqlite3.Connection:
+        """Connection tuned for WAL: readers never block the writer, commits skip the full fsync"""
+        # The busy timeout covers other workers holding the write lock in shared mode
+        db = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=64, timeout=10)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def _warm_load(self, db: sqlite3.Connection):
+        """Rebuild memory state, routing index and counters from disk, without re-parsing workflows"""
+        workflows = [json.loads(data) for (data,) in db.execute("SELECT data FROM workflows ORDER BY id")]
+        for workflow in workflows:
+            self.router.add(workflow)
+            self._count_workflow(workflow, 1)
+            self._next_workflow_id = max(self._next_workflow_id, workflow["id"] + 1)
+        self.workflows = tuple(workflows)
+
+        # Only the newest rows that fit the ring buffers, oldest first
+        for (data,) in db.execute(
+            "SELECT data FROM (SELECT data, seq FROM events ORDER BY seq DESC LIMIT ?) ORDER BY seq",
+            (self.events.max_items,)
+        ):
+            event = json.loads(data)
+            for old in self.events.add(event["id"], event):
+                self._count_event(old, -1)
+            self._count_event(event, 1)
+
+        for (data,) in db.execute(
+            "SELECT data FROM (SELECT data, seq FROM results ORDER BY seq DESC LIMIT ?) ORDER BY seq",
+            (self.results.max_items,)
+        ):
+            stored_result = json.loads(data)
+            for old in self.results.add(stored_result["id"], stored_result):
+                self.result_index.remove(old["id"])
+            self.result_index.add(stored_result)
+
+        # Rows that no longer fit the ring buffers are not coming back
+        for store, table in ((self.events, "events"), (self.results, "results")):
+            oldest = next(store.values(), None)
+            if oldest is not None:
+                db.execute(f"DELETE FROM {table} WHERE seq < ?", (oldest["seq"],))
+        db.commit()
+
+        for collection, table in (("workflows", "workflows"), ("events", "events"), ("results", "results")):
+            seq = db.execute(f"SELECT COALESCE(MAX(seq), 0) FROM {table}").fetchone()[0]
+            self.versions = {**self.versions, collection: seq}
+            self._seq = max(self._seq, seq)
+
+    def _touch(self, collection: str) -> int:
+        """Allocate the next sequence number; shared across workers so cursors stay ordered"""
+        if self._seq_counter is None:
+            return super()._touch(collection)
+        self._seq = self._seq_counter.next()
+        self.versions = {**self.versions, collection: self._seq}
+        return self._seq
+
+    def _allocate_workflow_id(self) -> int:
+        """Next workflow id, unique across workers in shared mode"""
+        if self._workflow_counter is None:
+            return super()._allocate_workflow_id()
+        workflow_id = self._workflow_counter.next()
+        self._next_workflow_id = max(self._next_workflow_id, workflow_id + 1)
+        return workflow_id
+
+    def _emit(self, kind: str, op: str, data: Dict, record: Optional[Dict] = None):
+        """Publish as usual and queue the matching write; the caller never waits on disk"""
+        super()._emit(kind, op, data, record)
+        record = record if record is not None else data
+        if op == "removed":
+            self._writes.put((DELETE[kind], (record["id"],)))
+            logged = None
+        else:
+            row = self._row(kind, record)
+            self._writes.put((UPSERT[kind], row))
+            logged = row[-1]
+        if self.shared:
+            # Queued behind the write itself, so both land in the same batch transaction
+            self._writes.put((LOG_CHANGE, (self.worker_id, self._seq, kind, op, str(record["id"]), logged)))
+        self.write_stats["queued"] += 1
+
+    @staticmethod
+    def _row(kind: str, record: Dict) -> Tuple:
+        """Indexed columns plus the JSON document for a record"""
+        data = json.dumps(record, default=str)
+        if kind == "workflow":
+            return (record["id"], record["seq"], record.get("trigger_type"), record.get("status"),
+                    record.get("session_id"), record.get("created_at"), data)
+        if kind == "event":
+            payload = record.get("payload", {})
+            return (record["id"], record["seq"], record.get("trigger_type"), payload.get("event_type"),
+                    payload.get("session_id"), record.get("timestamp"), data)
+        result = record["result"]
+        return (record["id"], record["seq"], record["session_id"], result.get("workflow_id"),
+                result.get("event_type"), result.get("status"), record["created_at"], data)
+
+    def _write_loop(self):
+        """Drain queued writes in batches, one transaction (and one commit) per batch"""
+        db = self._connect()
+        while True:
+            batch: List[Tuple] = [self._writes.get()]
+            while len(batch) < SESSION_WRITE_BATCH:
+                try:
+                    batch.append(self._writes.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = any(item is _STOP for item in batch)
+            writes = [item for item in batch if item is not _STOP]
+            try:
+                with db:
+                    for sql, params in writes:
+                        db.execute(sql, params)
+                    if self.shared and writes:
+                        db.execute(TRIM_CHANGES, (SESSION_CHANGE_LOG_KEEP,))
+                self.write_stats["written"] += len(writes)
+                self.write_stats["batches"] += 1
+            except sqlite3.Error as e:
+                self.write_stats["errors"] += 1
+                logger.error("Session store write failed (%d rows): %s", len(writes), e)
+            finally:
+                for _ in batch:
+                    self._writes.task_done()
+            if stop:
+                break
+        db.close()
+
+    def _sync_loop(self):
+        """Poll the change log and apply what other workers wrote"""
+        db = self._connect()
+        while not self._stopping.wait(SESSION_SYNC_INTERVAL):
+            try:
+                self.sync(db)
+            except sqlite3.Error as e:
+                self.sync_stats["errors"] += 1
+                logger.error("Session sync failed: %s", e)
+        db.close()
+
+    def sync(self, db: Optional[sqlite3.Connection] = None) -> int:
+        """Apply other workers' changes logged since the last poll; returns how many were applied"""
+        own = db is None
+        db = db or self._connect()
+        try:
+            rows = db.execute(
+                "SELECT id, origin, seq, kind, op, record_id, data FROM changes WHERE id > ? ORDER BY id",
+                (self._last_change,)
+            ).fetchall()
+            # Ids only skip when the writer trimmed rows this worker had not read yet
+            if rows and self._last_change and rows[0][0] > self._last_change + 1:
+                self.sync_stats["gaps"] += 1
+                logger.warning("Session sync fell behind the change log (%d changes trimmed)",
+                               rows[0][0] - self._last_change - 1)
+        finally:
+            if own:
+                db.close()
+        self.sync_stats["polls"] += 1
+
+        applied = 0
+        for change_id, origin, seq, kind, op, record_id, data in rows:
+            self._last_change = change_id
+            if origin == self.worker_id:
+                continue
+            record = json.loads(data) if data else {"id": int(record_id) if kind == "workflow" else record_id}
+            if self._apply(kind, op, seq, record):
+                applied += 1
+                for listener in self.listeners:
+                    try:
+                        listener(kind, op, record)
+                    except Exception as e:
+                        logger.error("Session sync listener failed: %s", e)
+        self.sync_stats["applied"] += applied
+        return applied
+
+    def _apply(self, kind: str, op: str, seq: int, record: Dict) -> bool:
+        """Apply one replayed change to memory and the local feed; False if it was already applied"""
+        with self._lock:
+            if kind == "event":
+                applied = self._apply_event(op, record)
+                data = record
+            elif kind == "result":
+                applied = self._apply_result(op, record)
+                data = self._result_view(record) if op != "removed" else record
+            else:
+                applied = self._apply_workflow(op, record)
+                data = record
+            if not applied:
+                return False
+            self._seq = max(self._seq, seq)
+            collection = COLLECTIONS[kind]
+            self.versions = {**self.versions, collection: max(self.versions[collection], seq)}
+            self.changes.publish(kind, op, data)
+        return True
+
+    def _apply_event(self, op: str, event: Dict) -> bool:
+        """Replay an event add or eviction"""
+        if op == "removed":
+            old = self.events.pop(event["id"])
+            if old is None:
+                return False
+            self._count_event(old, -1)
+            return True
+        if event["id"] in self.events:
+            return False
+        for old in self.events.add(event["id"], event):
+            self._count_event(old, -1)
+        self._count_event(event, 1)
+        self.event_rate.record()
+        return True
+
+    def _apply_result(self, op: str, stored_result: Dict) -> bool:
+        """Replay a result add, update or eviction"""
+        if op == "removed":
+            if self.results.pop(stored_result["id"]) is None:
+                return False
+            self.result_index.remove(stored_result["id"])
+            return True
+        existing = self.results.get(stored_result["id"])
+        if existing is not None and existing["seq"] >= stored_result["seq"]:
+            return False
+        if existing is not None:
+            evicted = self.results.replace(stored_result["id"], stored_result)
+        else:
+            evicted = self.results.add(stored_result["id"], stored_result)
+            self.result_rate.record()
+        self.result_index.add(stored_result)
+        for old in evicted:
+            self.result_index.remove(old["id"])
+        return True
+
+    def _apply_workflow(self, op: str, workflow: Dict) -> bool:
+        """Replay a workflow add or delete"""
+        existing = next((w for w in self.workflows if w["id"] == workflow["id"]), None)
+        if op == "removed":
+            if existing is None:
+                return False
+            self.workflows = tuple(w for w in self.workflows if w["id"] != workflow["id"])
+            self.router.remove(workflow["id"])
+            self._count_workflow(existing, -1)
+            return True
+        if existing is not None:
+            return False
+        self.workflows = self.workflows + (workflow,)
+        self.router.add(workflow)
+        self._count_workflow(workflow, 1)
+        self._next_workflow_id = max(self._next_workflow_id, workflow["id"] + 1)
+        return True
+
+    def flush(self):
+        """Block until every queued write is on disk"""
+        self._writes.join()
+
+    def close(self):
+        """Flush pending writes and stop the writer and sync threads"""
+        self._stopping.set()
+        if self._syncer is not None and self._syncer.is_alive():
+            self._syncer.join()
+        if self._writer.is_alive():
+            self._writes.put(_STOP)
+            self._writer.join()
+
+    def get_stats(self) -> Dict:
+        """Session stats plus persistence counters"""
+        return {
+            **super().get_stats(),
+            "persistence": {
+                **self.write_stats,
+                "pending": self._writes.qsize(),
+                "warm_load_ms": self.warm_load_ms
+            },
+            **({"sync": {**self.sync_stats, "worker_id": self.worker_id, "last_change": self._last_change}}
+               if self.shared else {})
+        }
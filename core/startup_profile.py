@@ -0,0 +1,108 @@
+# Startup Profile - Where server start-up time goes: imports, eager init and first-use (lazy) init
+import builtins
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+
+class StartupProfile:
+    """Wall-clock cost of each top-level import and init phase, plus lazily built components"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.imports: Dict[str, float] = {}
+        self.phases: Dict[str, float] = {}
+        self.lazy: List[Dict] = []
+        self.ready_ms: Optional[float] = None
+        self._import = None
+        self._timed_import = None
+        self._owner: Optional[int] = None
+        self._depth = 0
+
+    def track_imports(self):
+        """Time every import this thread makes until stop_tracking(), keyed by the module that was asked for"""
+        if self._import is not None:
+            return
+        self._import = original = builtins.__import__
+        self._owner = threading.get_ident()
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            # Other threads, and everyone once tracking stopped, go straight through
+            if self._import is None or threading.get_ident() != self._owner:
+                return original(name, globals, locals, fromlist, level)
+            # Only outermost, not-yet-loaded imports: nested ones are part of their parent's cost
+            if self._depth or level or name in sys.modules:
+                return original(name, globals, locals, fromlist, level)
+            self._depth += 1
+            started = time.perf_counter()
+            try:
+                return original(name, globals, locals, fromlist, level)
+            finally:
+                self._depth -= 1
+                self.imports[name] = self.imports.get(name, 0) + self._ms(started)
+
+        self._timed_import = builtins.__import__ = timed_import
+
+    def stop_tracking(self):
+        """Restore the normal import machinery"""
+        if self._import is None:
+            return
+        # Leave a hook installed on top of ours in place; ours then only passes calls through
+        if builtins.__import__ is self._timed_import:
+            builtins.__import__ = self._import
+        self._import = None
+        self._timed_import = None
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time an eager start-up step"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0) + self._ms(started)
+
+    @contextmanager
+    def lazy_init(self, name: str):
+        """Time a component built on first use, after start-up"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.lazy.append({
+                "name": name,
+                "ms": self._ms(started),
+                "at_ms": self._ms(self.started)
+            })
+
+    def mark_ready(self):
+        """Record the moment the server is ready to serve requests"""
+        if self.ready_ms is None:
+            self.ready_ms = self._ms(self.started)
+
+    @staticmethod
+    def _ms(started: float) -> float:
+        return round((time.perf_counter() - started) * 1000, 2)
+
+    def get_stats(self) -> Dict:
+        """Report sorted by cost, slowest first"""
+        return {
+            "ready_ms": self.ready_ms,
+            "imports_ms": round(sum(self.imports.values()), 2),
+            "init_ms": round(sum(self.phases.values()), 2),
+            "imports": dict(sorted(self.imports.items(), key=lambda item: -item[1])),
+            "phases": dict(sorted(self.phases.items(), key=lambda item: -item[1])),
+            "lazy": list(self.lazy)
+        }
+
+
+_shared_profile = None
+
+def get_startup_profile() -> StartupProfile:
+    """Get the process-wide start-up profile (its clock starts on first call)"""
+    global _shared_profile
+    if _shared_profile is None:
+        _shared_profile = StartupProfile()
+    return _shared_profile
@@ -0,0 +1,226 @@
+# Tracing - Per-event span timelines carried through the pipeline by context variables
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+from config import TRACE_SAMPLE_RATE, TRACE_BUFFER_SIZE, TRACE_MAX_SPANS
+
+
+class Span:
+    """One timed step of a trace"""
+
+    def __init__(self, trace: "Trace", name: str, parent_id: Optional[str], attributes: Dict):
+        self.trace = trace
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:8]
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.status = "ok"
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException):
+        """Mark the span failed (also for errors the caller handles itself)"""
+        self.status = "error" if isinstance(error, Exception) else "cancelled"
+        self.attributes["error"] = str(error) or type(error).__name__
+
+    def to_dict(self) -> Dict:
+        end = self.end if self.end is not None else time.perf_counter()
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ms": round((self.start - self.trace.start) * 1000, 2),
+            "duration_ms": round((end - self.start) * 1000, 2),
+            "status": self.status if self.end is not None else "running",
+            "attributes": self.attributes
+        }
+
+
+class _NoopSpan:
+    """Stand-in when the current work is not being traced"""
+
+    def set_attribute(self, key: str, value):
+        pass
+
+    def record_error(self, error: BaseException):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    """All spans recorded for one event, from ingest to delivery"""
+
+    def __init__(self, name: str):
+        self.trace_id = uuid.uuid4().hex
+        self.name = name
+        self.event_id: Optional[str] = None
+        self.start = time.perf_counter()
+        self.started_at = datetime.now().isoformat()
+        self.spans: List[Span] = []
+        self.dropped = 0
+
+    def to_dict(self) -> Dict:
+        """Timeline ordered by start time"""
+        spans = sorted((span.to_dict() for span in list(self.spans)), key=lambda span: span["start_ms"])
+        ends = [span["start_ms"] + span["duration_ms"] for span in spans]
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "event_id": self.event_id,
+            "started_at": self.started_at,
+            "duration_ms": round(max(ends), 2) if ends else 0,
+            "span_count": len(spans),
+            "dropped_spans": self.dropped,
+            "spans": spans
+        }
+
+
+class TraceBuffer:
+    """The most recent sampled traces, by trace id and by event id"""
+
+    def __init__(self, max_traces: int):
+        self.max_traces = max_traces
+        self._traces: "OrderedDict[str, Trace]" = OrderedDict()
+        self._by_event: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def add(self, trace: Trace):
+        with self._lock:
+            self._traces[trace.trace_id] = trace
+            while len(self._traces) > self.max_traces:
+                _, old = self._traces.popitem(last=False)
+                if old.event_id is not None:
+                    self._by_event.pop(old.event_id, None)
+
+    def bind_event(self, trace: Trace, event_id: str):
+        with self._lock:
+            trace.event_id = event_id
+            if trace.trace_id in self._traces:
+                self._by_event[event_id] = trace.trace_id
+
+    def get(self, trace_id: str) -> Optional[Trace]:
+        with self._lock:
+            return self._traces.get(trace_id)
+
+    def for_event(self, event_id: str) -> Optional[Trace]:
+        with self._lock:
+            trace_id = self._by_event.get(event_id)
+            return self._traces.get(trace_id) if trace_id else None
+
+    def recent(self, limit: int) -> List[Trace]:
+        with self._lock:
+            return list(self._traces.values())[-limit:][::-1]
+
+    def __len__(self) -> int:
+        return len(self._traces)
+
+
+class Tracer:
+    """Samples traces and records spans into whichever trace the current context carries"""
+
+    def __init__(self, sample_rate: float = 1.0, max_traces: int = 200, max_spans: int = 500):
+        self.sample_rate = sample_rate
+        self.max_spans = max_spans
+        self.buffer = TraceBuffer(max_traces)
+        self._trace: ContextVar[Optional[Trace]] = ContextVar("trace", default=None)
+        self._span: ContextVar[Optional[Span]] = ContextVar("span", default=None)
+        self.stats = {"started": 0, "sampled": 0}
+
+    def start_trace(self, name: str) -> Optional[Trace]:
+        """New trace, or None when this one is not sampled (its spans then cost nothing)"""
+        self.stats["started"] += 1
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return None
+        self.stats["sampled"] += 1
+        trace = Trace(name)
+        self.buffer.add(trace)
+        return trace
+
+    def current_trace(self) -> Optional[Trace]:
+        return self._trace.get()
+
+    @contextmanager
+    def activate(self, trace: Optional[Trace]) -> Iterator[Optional[Trace]]:
+        """Make a trace current for the enclosed code (and tasks/threads started from it)"""
+        trace_token = self._trace.set(trace)
+        span_token = self._span.set(None)
+        try:
+            yield trace
+        finally:
+            self._span.reset(span_token)
+            self._trace.reset(trace_token)
+
+    def resume(self, trace_id: Optional[str]):
+        """Re-activate a trace by id after a hop that dropped the context (e.g. the event queue)"""
+        return self.activate(self.buffer.get(trace_id) if trace_id else None)
+
+    @contextmanager
+    def start_span(self, name: str, **attributes) -> Iterator:
+        """Time a step as a child of the current span; a no-op outside a sampled trace"""
+        trace = self._trace.get()
+        if trace is None:
+            yield NOOP_SPAN
+            return
+        if len(trace.spans) >= self.max_spans:
+            trace.dropped += 1
+            yield NOOP_SPAN
+            return
+
+        parent = self._span.get()
+        span = Span(trace, name, parent.span_id if parent else None, attributes)
+        trace.spans.append(span)
+        token = self._span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            span.end = time.perf_counter()
+            self._span.reset(token)
+
+    def set_attribute(self, key: str, value):
+        """Annotate the current span, if any"""
+        span = self._span.get()
+        if span is not None:
+            span.set_attribute(key, value)
+
+    def bind_event(self, event_id: str):
+        """Link the current trace to a stored event id (for /events/{id}/trace)"""
+        trace = self._trace.get()
+        if trace is not None:
+            self.buffer.bind_event(trace, event_id)
+
+    def get_stats(self) -> Dict:
+        return {**self.stats, "sample_rate": self.sample_rate, "buffered": len(self.buffer)}
+
+
+_shared_tracer = None
+
+def get_tracer() -> Tracer:
+    """Get the process-wide tracer"""
+    global _shared_tracer
+    if _shared_tracer is None:
+        _shared_tracer = Tracer(TRACE_SAMPLE_RATE, TRACE_BUFFER_SIZE, TRACE_MAX_SPANS)
+    return _shared_tracer
+
+
+def start_span(name: str, **attributes):
+    """Span in the current trace (see Tracer.start_span)"""
+    return get_tracer().start_span(name, **attributes)
+
+
+def set_attribute(key: str, value):
+    """Annotate the current span, if any"""
+    get_tracer().set_attribute(key, value)
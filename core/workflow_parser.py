@@ -1,26 +1,43 @@
 # LLM-Based Natural Language Workflow Parser
 import re
 import json
-from google import genai
-from config import GEMINI_API_KEY
+from core.gemini_client import get_gemini_client
+from core.intent_cache import get_intent_cache
+from core.log import get_logger
+
+logger = get_logger("parser")
 
 class WorkflowParser:
     def __init__(self):
-        self.client = genai.Client(api_key=GEMINI_API_KEY)
         self.model = "gemini-2.0-flash-exp"
     
-    def parse(self, natural_language: str) -> dict:
+    @property
+    def client(self):
+        """Shared Gemini client, created on the first LLM call"""
+        return get_gemini_client()
+    
+    @property
+    def intent_cache(self):
+        """Shared intent cache, opened on first use"""
+        return get_intent_cache()
+    
+    async def parse(self, natural_language: str) -> dict:
         """Parse natural language using LLM for intelligent trigger creation"""
+        cached = self.intent_cache.get("workflow_parser", natural_language)
+        if cached is not None:
+            return cached
+        
         try:
             # Use LLM to analyze user query and create trigger
-            workflow_config = self._llm_parse_workflow(natural_language)
-            return workflow_config
+            workflow_config = await self._llm_parse_workflow(natural_language)
         except Exception as e:
             # Fallback to basic parsing if LLM fails
-            print(f"LLM parsing failed: {e}, using fallback")
+            logger.warning("LLM parsing failed: %s, using fallback", e)
             return self._fallback_parse(natural_language)
+        await self.intent_cache.aset("workflow_parser", natural_language, workflow_config)
+        return workflow_config
     
-    def _llm_parse_workflow(self, user_query: str) -> dict:
+    async def _llm_parse_workflow(self, user_query: str) -> dict:
         """Use LLM to intelligently parse workflow and create triggers"""
         prompt = f"""Analyze this workflow request and create a trigger configuration:
 
@@ -36,7 +53,7 @@ You need to identify:
 
 2. CONDITIONS: What specific conditions must be met?
    - file_extension: .pdf, .doc, etc.
-   - domains: medium.com, gmail.com, etc.
+   - domains: medium.com, mail.google.com, etc.
    - folder_path: specific directories to monitor
    - file_size: minimum/maximum file sizes
    - keywords: specific text to look for
@@ -72,13 +89,10 @@ Return ONLY valid JSON in this exact format:
   }}
 }}"""
 
-        response = self.client.models.generate_content(
-            model=self.model,
-            contents=prompt
-        )
+        response_text = await self.client.generate(prompt, self.model)
         
         # Clean and parse JSON response
-        text = response.text.strip()
+        text = response_text.strip()
         if text.startswith("```json"):
             text = text[7:-3]
         elif text.startswith("```"):
@@ -163,7 +177,7 @@ Return ONLY valid JSON in this exact format:
                 "conditions": conditions
             }
 
-    def analyze_trigger_intent(self, user_query: str) -> dict:
+    async def analyze_trigger_intent(self, user_query: str) -> dict:
         """Analyze user intent for trigger creation using LLM"""
         prompt = f"""Analyze this user request for workflow automation:
 
@@ -186,12 +200,9 @@ Provide analysis in JSON format:
 }}"""
 
         try:
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=prompt
-            )
+            response_text = await self.client.generate(prompt, self.model)
             
-            text = response.text.strip()
+            text = response_text.strip()
             if text.startswith("```json"):
                 text = text[7:-3]
             elif text.startswith("```"):
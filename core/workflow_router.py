@@ -0,0 +1,163 @@
+# Workflow Router - Incremental index of workflows by trigger type, file extension and domain
+import re
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+WILDCARD = "*"
+
+# Extensions a workflow condition may narrow routing to; anything else routes via the wildcard
+KNOWN_EXTENSIONS = {
+    ".pdf", ".doc", ".docx", ".txt", ".md", ".rtf", ".odt", ".csv", ".tsv", ".xls", ".xlsx",
+    ".ppt", ".pptx", ".json", ".xml", ".html", ".htm", ".epub", ".png", ".jpg", ".jpeg", ".gif",
+    ".zip",
+}
+# Hosts browser events actually come from (see chrome_extension/manifest.json)
+KNOWN_HOSTS = {"mail.google.com", "medium.com"}
+# Names users (and the parser prompt) give for those hosts
+DOMAIN_ALIASES = {"gmail.com": "mail.google.com", "googlemail.com": "mail.google.com", "gmail": "mail.google.com"}
+
+
+def _normalize_extension(value) -> Optional[str]:
+    """'.PDF', 'pdf' or '*.pdf' -> '.pdf'; placeholders and globs -> None"""
+    if not isinstance(value, str):
+        return None
+    ext = value.strip().lower().lstrip("*")
+    if not ext.startswith("."):
+        ext = f".{ext}"
+    return ext if re.fullmatch(r"\.[a-z0-9]+", ext) else None
+
+
+def _normalize_domain(value) -> Optional[str]:
+    """'https://www.Medium.com/foo' -> 'medium.com'"""
+    if not isinstance(value, str) or not value.strip():
+        return None
+    domain = value.strip().lower()
+    if domain in DOMAIN_ALIASES:
+        return DOMAIN_ALIASES[domain]
+    if "://" in domain:
+        domain = urlparse(domain).netloc
+    domain = domain.split("/")[0].split(":")[0]
+    if domain.startswith("www."):
+        domain = domain[4:]
+    domain = DOMAIN_ALIASES.get(domain, domain)
+    return domain if "." in domain else None
+
+
+def _is_known_host(domain: str) -> bool:
+    """A known event host or one of its subdomains (e.g. 'blog.medium.com')"""
+    return any(domain == host or domain.endswith(f".{host}") for host in KNOWN_HOSTS)
+
+
+def _as_list(value) -> list:
+    """Wrap scalar condition values so single strings and lists are handled alike"""
+    if value is None:
+        return []
+    return value if isinstance(value, (list, tuple, set)) else [value]
+
+
+class WorkflowRouter:
+    """Routes events to matching workflows in O(matches) instead of scanning every workflow.
+
+    Writers (serialized by the owner) build a new index and swap it in, so match() can run
+    on a watcher thread without locking while workflows are added or removed.
+    """
+
+    def __init__(self):
+        # trigger_type -> routing key -> {workflow_id: workflow}
+        self._index: Dict[str, Dict[str, Dict[int, Dict]]] = {}
+        # workflow_id -> (trigger_type, [routing keys]) for O(1) removal
+        self._locations: Dict[int, tuple] = {}
+
+    def _routing_keys(self, workflow: Dict) -> List[str]:
+        """Keys a workflow is indexed under: its extensions, its domains, or the wildcard.
+
+        Conditions come from an LLM, so they only narrow routing when every value maps onto a
+        known extension or host; a placeholder ("any") or an unknown site keeps the workflow on
+        the wildcard rather than silently never matching.
+        """
+        conditions = workflow.get("conditions") or {}
+        if not isinstance(conditions, dict):
+            return [WILDCARD]
+
+        if workflow.get("trigger_type") == "file_download":
+            raw = _as_list(conditions.get("file_extension")) + _as_list(conditions.get("file_extensions"))
+            values = [_normalize_extension(value) for value in raw]
+            if not raw or not all(ext in KNOWN_EXTENSIONS for ext in values):
+                return [WILDCARD]
+            return sorted({f"ext:{ext}" for ext in values})
+
+        raw = _as_list(conditions.get("domains"))
+        values = [_normalize_domain(value) for value in raw]
+        if not raw or not all(domain and _is_known_host(domain) for domain in values):
+            return [WILDCARD]
+        return sorted({f"domain:{domain}" for domain in values})
+
+    def add(self, workflow: Dict):
+        """Index a workflow (re-indexes if it was already present)"""
+        index = self._without(workflow["id"])
+        trigger_type = workflow.get("trigger_type")
+        keys = self._routing_keys(workflow)
+        buckets = dict(index.get(trigger_type, {}))
+        for key in keys:
+            buckets[key] = {**buckets.get(key, {}), workflow["id"]: workflow}
+        index[trigger_type] = buckets
+        self._locations[workflow["id"]] = (trigger_type, keys)
+        self._index = index
+
+    def remove(self, workflow_id: int):
+        """Drop a workflow from the index"""
+        self._index = self._without(workflow_id)
+
+    def _without(self, workflow_id: int) -> Dict[str, Dict[str, Dict[int, Dict]]]:
+        """Copy of the index minus one workflow; only the paths it touched are copied"""
+        index = dict(self._index)
+        location = self._locations.pop(workflow_id, None)
+        if location is None:
+            return index
+        trigger_type, keys = location
+        buckets = dict(index.get(trigger_type, {}))
+        for key in keys:
+            bucket = {wid: wf for wid, wf in buckets.get(key, {}).items() if wid != workflow_id}
+            if bucket:
+                buckets[key] = bucket
+            else:
+                buckets.pop(key, None)
+        if buckets:
+            index[trigger_type] = buckets
+        else:
+            index.pop(trigger_type, None)
+        return index
+
+    def _event_keys(self, event_data: Dict) -> List[str]:
+        """Routing keys an event can hit, most specific first, always ending with the wildcard"""
+        keys = []
+        file_name = event_data.get("file_name") or event_data.get("file_path")
+        if isinstance(file_name, str) and "." in file_name:
+            ext = _normalize_extension(file_name[file_name.rfind("."):])
+            if ext:
+                keys.append(f"ext:{ext}")
+
+        host = _normalize_domain(event_data.get("url") or event_data.get("domain"))
+        if host:
+            # Try every parent domain so 'medium.com' matches 'blog.medium.com'
+            labels = host.split(".")
+            keys.extend(f"domain:{'.'.join(labels[i:])}" for i in range(len(labels) - 1))
+
+        keys.append(WILDCARD)
+        return keys
+
+    def match(self, event_data: Dict) -> List[Dict]:
+        """All active workflows whose trigger and conditions match the event"""
+        buckets = self._index.get(event_data.get("event_type"))
+        if not buckets:
+            return []
+
+        matched = {}
+        for key in self._event_keys(event_data):
+            for workflow_id, workflow in buckets.get(key, {}).items():
+                if workflow.get("status") == "active":
+                    matched[workflow_id] = workflow
+        return list(matched.values())
+
+    def __len__(self):
+        return len(self._locations)
@@ -1,16 +1,19 @@
 # Action Agent - Executes dynamic actions based on user queries
-from google.adk.agents import Agent, ParallelAgent
-from google.genai import types
+import asyncio
+from functools import cached_property
+from core.startup_profile import get_startup_profile
+from core.metrics import track_stage
+from core.tracing import start_span
+from config import ACTION_MAX_CONCURRENCY, FILE_READ_MAX_CHARS
 
 
 
-def process_with_dynamic_query(content: str, user_query: str) -> dict:
-    """Process content dynamically based on user query using LLM."""
-    from tools.summarizer import LLMProcessor
+async def process_with_dynamic_query(content: str, user_query: str, chunk_size: int = None, max_parallel: int = None) -> dict:
+    """Process content dynamically based on user query using LLM (long content is map-reduced)."""
+    from tools.summarizer import get_llm_processor
     
     try:
-        llm_processor = LLMProcessor()
-        result = llm_processor.process_with_query(content, user_query)
+        result = await get_llm_processor().process_with_query(content, user_query, chunk_size, max_parallel)
         return {
             "action": "dynamic_processing",
             "result": result.get('response', 'No response available'),
@@ -27,30 +30,44 @@ def process_with_dynamic_query(content: str, user_query: str) -> dict:
 
 class ActionAgent:
     def __init__(self):
-        config = types.GenerateContentConfig(
-            temperature=0.2,
-            top_p=0.95,
-            max_output_tokens=2048
-        )
-        
-        self.adk_agent = Agent(
-            name="action_adk",
-            model="gemini-2.5-flash",
-            description="Executes dynamic workflow actions on content based on user queries",
-            instruction="You process content dynamically based on user queries. Use process_with_dynamic_query for all content processing.",
-            tools=[process_with_dynamic_query],
-            generation_config=config
-        )
+        # Shared across all workflows so a fan-out cannot flood the LLM
+        self.llm_slots = asyncio.Semaphore(ACTION_MAX_CONCURRENCY)
     
-    async def execute_action(self, user_query: str, event_data: dict, config: dict) -> dict:
-        """Execute dynamic action based on user query"""
-        return await self._process_dynamically(user_query, event_data, config)
+    @cached_property
+    def adk_agent(self):
+        """ADK agent, built (and google.adk imported) on first use"""
+        with get_startup_profile().lazy_init("action_adk"):
+            from google.genai import types
+            from google.adk.agents import Agent
+            
+            config = types.GenerateContentConfig(
+                temperature=0.2,
+                top_p=0.95,
+                max_output_tokens=2048
+            )
+            
+            return Agent(
+                name="action_adk",
+                model="gemini-2.5-flash",
+                description="Executes dynamic workflow actions on content based on user queries",
+                instruction="You process content dynamically based on user queries. Use process_with_dynamic_query for all content processing.",
+                tools=[process_with_dynamic_query],
+                generation_config=config
+            )
     
-
+    async def execute_action(self, user_query: str, event_data: dict, config: dict, content: str = None) -> dict:
+        """Execute dynamic action based on user query, reusing pre-extracted content if given"""
+        return await self._process_dynamically(user_query, event_data, config, content)
+    
+    async def extract_content(self, event_data: dict) -> str:
+        """Extract event content once, off the event loop, for sharing across workflows"""
+        with track_stage("extract"), start_span("extract", event_type=event_data.get("event_type")):
+            return await asyncio.to_thread(self._extract_content, event_data)
     
-    async def _process_dynamically(self, user_query: str, event_data: dict, config: dict) -> dict:
+    async def _process_dynamically(self, user_query: str, event_data: dict, config: dict, content: str = None) -> dict:
         """Process content dynamically based on user query"""
-        content = self._extract_content(event_data)
+        if content is None:
+            content = await self.extract_content(event_data)
         
         if not content:
             return {
@@ -61,7 +78,10 @@ class ActionAgent:
             }
         
         # Use dynamic processing tool
-        return process_with_dynamic_query(content, user_query)
+        async with self.llm_slots:
+            return await process_with_dynamic_query(
+                content, user_query, config.get('chunk_size'), config.get('max_parallel')
+            )
     
     def _extract_content(self, event_data: dict) -> str:
         """Extract content from different event types"""
@@ -77,7 +97,7 @@ class ActionAgent:
                     pdf_parser = PDFParserTool()
                     result = pdf_parser.extract_text(file_path)
                     if result.get('success'):
-                        return f"File: {file_name}\n\nContent:\n{result.get('text', '')[:5000]}"
+                        return f"File: {file_name}\n\nContent:\n{result.get('text', '')}"
                     else:
                         return f"File: {file_name}\nNote: Could not extract PDF content"
                 except Exception as e:
@@ -87,7 +107,9 @@ class ActionAgent:
             else:
                 try:
                     with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()[:10000]  # First 10KB
+                        content = f.read(FILE_READ_MAX_CHARS + 1)
+                    if len(content) > FILE_READ_MAX_CHARS:
+                        content = content[:FILE_READ_MAX_CHARS] + f"\n[Truncated: file exceeds {FILE_READ_MAX_CHARS} characters]"
                     return f"File: {file_name}\n\nContent:\n{content}"
                 except Exception as e:
                     return f"File: {file_name}\nNote: Could not read file - {str(e)}"
@@ -2,11 +2,17 @@
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from google.adk.agents import Agent
-from google.genai import types
+from functools import cached_property
+from core.startup_profile import get_startup_profile
+from core.metrics import track_stage, STAGE_ERRORS, DELIVERIES
+from core.tracing import start_span
+from core.log import get_logger, fields
+import asyncio
 import os
 import datetime
 
+logger = get_logger("delivery")
+
 def send_email_delivery(results: str, recipient: str) -> dict:
     """Send results via email."""
     return {
@@ -46,31 +52,45 @@ class DeliveryAgent:
             "sender_password": SMTP_PASSWORD,
             "from_name": SMTP_FROM_NAME
         }
-        
-        config = types.GenerateContentConfig(
-            temperature=0.1,
-            top_p=0.95,
-            max_output_tokens=1024
-        )
-        
-        self.adk_agent = Agent(
-            name="delivery_adk",
-            model="gemini-2.5-flash",
-            description="Delivers workflow results via multiple channels",
-            instruction="You deliver results via email, popup, or file based on user preferences.",
-            tools=[send_email_delivery, create_popup_delivery, save_file_delivery],
-            generation_config=config
-        )
+    
+    @cached_property
+    def adk_agent(self):
+        """ADK agent, built (and google.adk imported) on first use"""
+        with get_startup_profile().lazy_init("delivery_adk"):
+            from google.genai import types
+            from google.adk.agents import Agent
+            
+            config = types.GenerateContentConfig(
+                temperature=0.1,
+                top_p=0.95,
+                max_output_tokens=1024
+            )
+            
+            return Agent(
+                name="delivery_adk",
+                model="gemini-2.5-flash",
+                description="Delivers workflow results via multiple channels",
+                instruction="You deliver results via email, popup, or file based on user preferences.",
+                tools=[send_email_delivery, create_popup_delivery, save_file_delivery],
+                generation_config=config
+            )
     
     async def deliver(self, results: list, output_method: str, event_data: dict) -> dict:
         """Deliver results via specified method"""
-        if output_method == "email":
-            return await self._send_email(results, event_data)
-        elif output_method == "popup":
-            return await self._show_popup(results)
-        elif output_method == "save_file":
-            return await self._save_file(results, event_data)
-        return {"status": "unknown_method"}
+        with track_stage("deliver"), start_span("deliver", method=output_method) as span:
+            if output_method == "email":
+                delivery = await self._send_email(results, event_data)
+            elif output_method == "popup":
+                delivery = await self._show_popup(results)
+            elif output_method == "save_file":
+                delivery = await self._save_file(results, event_data)
+            else:
+                delivery = {"status": "unknown_method"}
+            span.set_attribute("status", delivery["status"])
+        if delivery["status"] == "failed":
+            STAGE_ERRORS.inc(stage="deliver")
+        DELIVERIES.inc(method=output_method, status=delivery["status"])
+        return delivery
     
     async def _send_email(self, results: list, event_data: dict) -> dict:
         """Send results via email"""
@@ -86,16 +106,21 @@ class DeliveryAgent:
         msg.attach(MIMEText(body, 'html'))
         
         try:
-            with smtplib.SMTP(self.email_config['smtp_server'], self.email_config['smtp_port']) as server:
-                server.starttls()
-                server.login(self.email_config['sender_email'], self.email_config['sender_password'])
-                server.send_message(msg)
-            print(f"✅ Email sent to {recipient}")
+            # SMTP is blocking; keep it off the server event loop
+            await asyncio.to_thread(self._smtp_send, msg)
+            logger.debug("Email sent", extra=fields(recipient=recipient))
             return {"status": "sent", "recipient": recipient}
         except Exception as e:
-            print(f"❌ Email failed: {e}")
+            logger.error("Email to %s failed: %s", recipient, e)
             return {"status": "failed", "error": str(e)}
     
+    def _smtp_send(self, msg: MIMEMultipart):
+        """Send a message over SMTP with STARTTLS"""
+        with smtplib.SMTP(self.email_config['smtp_server'], self.email_config['smtp_port']) as server:
+            server.starttls()
+            server.login(self.email_config['sender_email'], self.email_config['sender_password'])
+            server.send_message(msg)
+    
     async def _show_popup(self, results: list) -> dict:
         """Store results for popup display"""
         return {"status": "ready_for_popup", "results": results}
@@ -114,8 +139,6 @@ class DeliveryAgent:
     
     def _format_email_body(self, results: list) -> str:
         """Format results as HTML email"""
-        print(f"📧 Formatting email with results: {results}")
-        
         html = "<html><body style='font-family: -apple-system, BlinkMacSystemFont, Segoe UI, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px;'>"
         html += "<div style='background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 20px; border-radius: 12px; color: white; text-align: center; margin-bottom: 30px;'>"
         html += "<h1 style='margin: 0; font-size: 24px;'>⚡ Syntra</h1>"
@@ -123,7 +146,6 @@ class DeliveryAgent:
         html += "</div>"
         
         for result in results:
-            print(f"📧 Processing result: {result}")
             # Handle both dict and string results
             if isinstance(result, str):
                 content = result
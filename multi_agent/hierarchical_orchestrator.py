@@ -1,10 +1,15 @@
 # Hierarchical Multi-Agent System using Google ADK
-from google.adk.agents import Agent
+from core.startup_profile import get_startup_profile
 from .tools import process_with_dynamic_query, parse_natural_language, setup_triggers, send_email_delivery
+from core.log import get_logger
+
+logger = get_logger("orchestrator")
 
 def create_hierarchical_agents():
     """Create hierarchical agent system with proper error handling"""
     try:
+        from google.adk.agents import Agent
+        
         # Define individual specialized agents
         understanding_agent = Agent(
             name="UnderstandingAgent",
@@ -46,8 +51,17 @@ def create_hierarchical_agents():
         return workflow_coordinator, understanding_agent, action_agent, delivery_agent
         
     except Exception as e:
-        print(f"Error creating hierarchical agents: {e}")
+        logger.error("Error creating hierarchical agents: %s", e)
         return None, None, None, None
 
-# Initialize agents
-workflow_coordinator, understanding_agent, action_agent, delivery_agent = create_hierarchical_agents()
\ No newline at end of file
+_workflow_coordinator = None
+_coordinator_built = False
+
+def get_workflow_coordinator():
+    """Get the hierarchical coordinator, building the agent tree on first use (None if that failed)"""
+    global _workflow_coordinator, _coordinator_built
+    if not _coordinator_built:
+        with get_startup_profile().lazy_init("workflow_coordinator"):
+            _workflow_coordinator = create_hierarchical_agents()[0]
+        _coordinator_built = True
+    return _workflow_coordinator
@@ -1,5 +1,5 @@
 # Hierarchical Workflow Processor using ADK Agent Hierarchy
-from .hierarchical_orchestrator import workflow_coordinator
+from .hierarchical_orchestrator import get_workflow_coordinator
 from .tools import extract_event_content, process_with_dynamic_query
 from typing import Dict, Any
 import asyncio
@@ -8,9 +8,13 @@ class HierarchicalWorkflowProcessor:
     """Processes workflows using hierarchical ADK agents."""
     
     def __init__(self):
-        self.coordinator = workflow_coordinator
         self.active_workflows = []
     
+    @property
+    def coordinator(self):
+        """ADK coordinator, built on first use"""
+        return get_workflow_coordinator()
+    
     async def create_workflow(self, user_input: str) -> Dict[str, Any]:
         """Create workflow using hierarchical agent coordination."""
         try:
@@ -63,7 +67,7 @@ class HierarchicalWorkflowProcessor:
                 content = "No content available"
             
             # Use direct tool call instead of complex ADK coordination
-            result = process_with_dynamic_query(content, user_query)
+            result = await process_with_dynamic_query(content, user_query)
             
             output_method = workflow_config.get('config', {}).get('output_preference', 'popup')
             
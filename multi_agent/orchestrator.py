@@ -1,10 +1,14 @@
 # Orchestrator Agent - Coordinates all agents using Google ADK SequentialAgent
 from typing import Dict, List
-from google.adk.agents import Agent, SequentialAgent
-from google.genai import types
+from functools import cached_property
+from core.startup_profile import get_startup_profile
+from core.metrics import track_stage
+from core.log import get_logger, fields
 import datetime
 from zoneinfo import ZoneInfo
 
+logger = get_logger("orchestrator")
+
 def coordinate_workflow(user_input: str, event_data: dict = None) -> dict:
     """Coordinate complete workflow execution."""
     if event_data is None:
@@ -26,31 +30,37 @@ class OrchestratorAgent:
         self.delivery = delivery_agent
         self.llm_trigger = llm_trigger_agent
         self.active_workflows = []
-        
-        # ADK SequentialAgent for guaranteed execution order
-        config = types.GenerateContentConfig(
-            temperature=0.1,
-            top_p=0.95,
-            max_output_tokens=2048
-        )
-        
-        self.sequential_pipeline = SequentialAgent(
-            agents=[
-                understanding_agent.adk_agent,
-                action_agent.adk_agent,
-                delivery_agent.adk_agent
-            ],
-            model="gemini-2.5-flash",
-            generation_config=config
-        )
+    
+    @cached_property
+    def sequential_pipeline(self):
+        """ADK SequentialAgent for guaranteed execution order, built with its sub-agents on first use"""
+        with get_startup_profile().lazy_init("sequential_pipeline"):
+            from google.genai import types
+            from google.adk.agents import SequentialAgent
+            
+            config = types.GenerateContentConfig(
+                temperature=0.1,
+                top_p=0.95,
+                max_output_tokens=2048
+            )
+            
+            return SequentialAgent(
+                agents=[
+                    self.understanding.adk_agent,
+                    self.action.adk_agent,
+                    self.delivery.adk_agent
+                ],
+                model="gemini-2.5-flash",
+                generation_config=config
+            )
     
     async def process_user_request(self, user_input: str) -> Dict:
         """Main orchestration: User input → LLM-based workflow setup"""
-        print(f"🎯 Orchestrator: Processing '{user_input}' with LLM intelligence")
+        logger.info("Setting up workflow for %r", user_input)
         
         # Use LLM-based trigger agent if available
         if self.llm_trigger:
-            print("🧠 Using LLM-based trigger creation")
+            logger.debug("Using LLM-based trigger creation")
             
             # Create intelligent trigger from user query
             trigger_result = await self.llm_trigger.create_trigger_from_query(user_input)
@@ -67,16 +77,16 @@ class OrchestratorAgent:
                 }
                 
                 self.active_workflows.append(workflow)
-                print(f"✅ LLM Workflow created with {workflow['confidence']:.2f} confidence")
+                logger.info("LLM workflow created with %.2f confidence", workflow['confidence'])
                 return {"status": "active", "workflow": workflow}
             else:
-                print(f"⚠️ LLM trigger creation failed: {trigger_result['message']}")
+                logger.warning("LLM trigger creation failed: %s", trigger_result['message'])
                 # Fall back to traditional method
         
         # Fallback: Traditional workflow creation
-        print("🔄 Using traditional workflow creation")
+        logger.info("Using traditional workflow creation")
         workflow = await self.understanding.parse_workflow(user_input)
-        print(f"📋 Understood: {workflow['trigger']} → {workflow['actions']} → {workflow['output']}")
+        logger.info("Understood: %s -> %s -> %s", workflow['trigger'], workflow['actions'], workflow['output'])
         
         # Set up traditional trigger
         trigger_id = await self.trigger.setup_trigger(workflow['trigger'], workflow.get('conditions', {}))
@@ -87,38 +97,39 @@ class OrchestratorAgent:
         
         return {"status": "active", "workflow": workflow}
     
-    async def handle_event(self, event_data: Dict, workflow_config: Dict = None) -> Dict:
-        """Event triggered → Execute workflow dynamically"""
-        print(f"⚡ Orchestrator: Event {event_data.get('event_type')}")
-        
-        # Use provided workflow or find matching one
-        if workflow_config:
-            workflow = workflow_config
-            user_query = workflow.get('query', '')
-            print(f"✅ Using provided workflow: {user_query}")
-        else:
-            # Find matching workflow from active workflows
-            matching = [w for w in self.active_workflows if self._matches(w, event_data)]
-            if not matching:
-                return {"status": "no_match"}
+    async def handle_event(self, event_data: Dict, workflow_config: Dict = None, content: str = None) -> Dict:
+        """Event triggered → Execute workflow dynamically (content: pre-extracted event content)"""
+        with track_stage("orchestrate"):
+            logger.debug("Orchestrating event", extra=fields(event_type=event_data.get('event_type')))
             
-            workflow = matching[0]
-            user_query = workflow.get('user_input', '')
-            print(f"✅ Matched workflow: {user_query}")
-        
-        # Dynamic Action Processing - Use user query instead of predefined actions
-        result = await self.action.execute_action(user_query, event_data, workflow.get('config', {}))
-        results = [result]
-        print(f"🔧 Dynamic processing completed for query: '{user_query}'")
-        
-        # Determine delivery method
-        output_method = workflow.get('config', {}).get('output_preference', 'popup')
-        
-        # Agent 4: Delivery - Send results
-        delivery_result = await self.delivery.deliver(results, output_method, event_data)
-        print(f"📤 Delivered via {output_method}: {delivery_result['status']}")
-        
-        return {"status": "completed", "results": results, "delivery": delivery_result}
+            # Use provided workflow or find matching one
+            if workflow_config:
+                workflow = workflow_config
+                user_query = workflow.get('query', '')
+                logger.debug("Using provided workflow", extra=fields(query=user_query))
+            else:
+                # Find matching workflow from active workflows
+                matching = [w for w in self.active_workflows if self._matches(w, event_data)]
+                if not matching:
+                    return {"status": "no_match"}
+            
+                workflow = matching[0]
+                user_query = workflow.get('user_input', '')
+                logger.debug("Matched workflow", extra=fields(query=user_query))
+            
+            # Dynamic Action Processing - Use user query instead of predefined actions
+            result = await self.action.execute_action(user_query, event_data, workflow.get('config', {}), content)
+            results = [result]
+            logger.debug("Dynamic processing completed", extra=fields(query=user_query))
+            
+            # Determine delivery method
+            output_method = workflow.get('config', {}).get('output_preference', 'popup')
+            
+            # Agent 4: Delivery - Send results
+            delivery_result = await self.delivery.deliver(results, output_method, event_data)
+            logger.debug("Delivered", extra=fields(method=output_method, status=delivery_result['status']))
+            
+            return {"status": "completed", "results": results, "delivery": delivery_result}
     
     def _matches(self, workflow: Dict, event: Dict) -> bool:
         """Check if event matches workflow trigger"""
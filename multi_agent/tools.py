@@ -1,5 +1,5 @@
 # Tools for Hierarchical Multi-Agent System
-from tools.summarizer import LLMProcessor
+from tools.summarizer import get_llm_processor
 import json
 
 def parse_natural_language(user_input: str) -> dict:
@@ -53,11 +53,10 @@ def setup_triggers(trigger_type: str, conditions: dict = None) -> dict:
     
     return {"status": "success", "trigger_id": f"trigger_{trigger_type}", "config": trigger_config}
 
-def process_with_dynamic_query(content: str, user_query: str) -> dict:
+async def process_with_dynamic_query(content: str, user_query: str) -> dict:
     """Process content dynamically based on user query using LLM."""
     try:
-        llm_processor = LLMProcessor()
-        result = llm_processor.process_with_query(content, user_query)
+        result = await get_llm_processor().process_with_query(content, user_query)
         return {
             "action": "dynamic_processing",
             "result": result.get('response', 'No response available'),
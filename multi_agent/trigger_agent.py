@@ -1,6 +1,7 @@
 # Trigger Agent - Sets up and monitors triggers
+from functools import cached_property
 from core.trigger_manager import TriggerManager
-from google.adk.agents import Agent
+from core.startup_profile import get_startup_profile
 import os
 import datetime
 
@@ -35,15 +36,20 @@ class TriggerAgent:
     def __init__(self, trigger_manager: TriggerManager):
         self.manager = trigger_manager
         self.triggers = {}
-        
-        # Google ADK Agent
-        self.adk_agent = Agent(
-            name="trigger_adk",
-            model="gemini-2.0-flash",
-            description="Sets up and manages event triggers",
-            instruction="You set up triggers for browser events, file changes, and other workflow triggers.",
-            tools=[setup_browser_trigger, setup_file_trigger, get_trigger_status]
-        )
+    
+    @cached_property
+    def adk_agent(self):
+        """Google ADK agent, built (and google.adk imported) on first use"""
+        with get_startup_profile().lazy_init("trigger_adk"):
+            from google.adk.agents import Agent
+            
+            return Agent(
+                name="trigger_adk",
+                model="gemini-2.0-flash",
+                description="Sets up and manages event triggers",
+                instruction="You set up triggers for browser events, file changes, and other workflow triggers.",
+                tools=[setup_browser_trigger, setup_file_trigger, get_trigger_status]
+            )
     
     async def setup_trigger(self, trigger_type: str, conditions: dict) -> str:
         """Set up trigger based on type"""
@@ -1,8 +1,8 @@
 # Understanding Agent - Parses natural language to workflow using LLM
-from google import genai
-from google.genai import types
-from google.adk.agents import Agent, LoopAgent
-from config import GEMINI_API_KEY
+from functools import cached_property
+from core.gemini_client import get_gemini_client
+from core.intent_cache import get_intent_cache
+from core.startup_profile import get_startup_profile
 import json
 
 def parse_natural_language(user_input: str) -> dict:
@@ -30,26 +30,46 @@ def parse_natural_language(user_input: str) -> dict:
 
 class UnderstandingAgent:
     def __init__(self):
-        self.client = genai.Client(api_key=GEMINI_API_KEY)
         self.model = "gemini-2.5-flash"
-        
-        config = types.GenerateContentConfig(
-            temperature=0.1,
-            top_p=0.95,
-            max_output_tokens=1024
-        )
-        
-        self.adk_agent = Agent(
-            name="understanding_adk",
-            model="gemini-2.5-flash",
-            description="Parses natural language workflow requests",
-            instruction="You parse user requests into structured workflows with triggers, actions, and outputs.",
-            tools=[parse_natural_language],
-            generation_config=config
-        )
+    
+    @property
+    def client(self):
+        """Shared Gemini client, created on the first LLM call"""
+        return get_gemini_client()
+    
+    @property
+    def intent_cache(self):
+        """Shared intent cache, opened on first use"""
+        return get_intent_cache()
+    
+    @cached_property
+    def adk_agent(self):
+        """ADK agent, built (and google.adk imported) on first use"""
+        with get_startup_profile().lazy_init("understanding_adk"):
+            from google.genai import types
+            from google.adk.agents import Agent
+            
+            config = types.GenerateContentConfig(
+                temperature=0.1,
+                top_p=0.95,
+                max_output_tokens=1024
+            )
+            
+            return Agent(
+                name="understanding_adk",
+                model="gemini-2.5-flash",
+                description="Parses natural language workflow requests",
+                instruction="You parse user requests into structured workflows with triggers, actions, and outputs.",
+                tools=[parse_natural_language],
+                generation_config=config
+            )
     
     async def parse_workflow(self, user_input: str) -> dict:
         """Parse natural language to structured workflow"""
+        cached = self.intent_cache.get("understanding_agent", user_input)
+        if cached is not None:
+            return cached
+        
         prompt = f"""Parse this workflow request into JSON:
 
 User request: "{user_input}"
@@ -64,16 +84,14 @@ Extract:
 Return ONLY valid JSON:
 {{"trigger": "...", "conditions": {{}}, "actions": [...], "output": "...", "config": {{}}}}"""
 
-        response = self.client.models.generate_content(
-            model=self.model,
-            contents=prompt
-        )
+        response_text = await self.client.generate(prompt, self.model)
         
-        import json
-        text = response.text.strip()
+        text = response_text.strip()
         if text.startswith("```json"):
             text = text[7:-3]
         elif text.startswith("```"):
             text = text[3:-3]
         
-        return json.loads(text.strip())
+        workflow = json.loads(text.strip())
+        await self.intent_cache.aset("understanding_agent", user_input, workflow)
+        return workflow
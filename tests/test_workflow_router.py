@@ -0,0 +1,34 @@
+# Tests for WorkflowRouter routing of LLM-parsed workflow conditions
+from core.workflow_router import WorkflowRouter
+
+
+def _workflow(workflow_id, trigger_type, conditions):
+    return {"id": workflow_id, "trigger_type": trigger_type, "conditions": conditions, "status": "active"}
+
+
+def _matched_ids(router, event):
+    return sorted(workflow["id"] for workflow in router.match(event))
+
+
+def test_gmail_alias_matches_mail_google_com_events():
+    router = WorkflowRouter()
+    router.add(_workflow(1, "email_compose", {"domains": ["gmail.com"]}))
+    event = {"event_type": "email_compose", "url": "https://mail.google.com/mail/u/0/#inbox?compose=new"}
+    assert _matched_ids(router, event) == [1]
+
+
+def test_unknown_domain_falls_back_to_wildcard():
+    router = WorkflowRouter()
+    router.add(_workflow(1, "article_read", {"domains": ["example.org"]}))
+    router.add(_workflow(2, "article_read", {"domains": ["medium.com"]}))
+    event = {"event_type": "article_read", "url": "https://blog.medium.com/some-post"}
+    assert _matched_ids(router, event) == [1, 2]
+
+
+def test_placeholder_extension_falls_back_to_wildcard():
+    router = WorkflowRouter()
+    router.add(_workflow(1, "file_download", {"file_extension": "any"}))
+    router.add(_workflow(2, "file_download", {"file_extension": "all"}))
+    router.add(_workflow(3, "file_download", {"file_extension": ".pdf"}))
+    assert _matched_ids(router, {"event_type": "file_download", "file_name": "notes.txt"}) == [1, 2]
+    assert _matched_ids(router, {"event_type": "file_download", "file_name": "paper.PDF"}) == [1, 2, 3]
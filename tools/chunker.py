@@ -0,0 +1,37 @@
+# Text Chunker - Splits long documents on page, section and line boundaries
+from typing import List
+
+PAGE_BREAK = "\f"  # PDFParserTool separates pages with a form feed
+SEPARATORS = [PAGE_BREAK, "\n\n", "\n", " "]
+
+
+def _pieces(text: str, size: int, separators: List[str]) -> List[str]:
+    """Break text into pieces no longer than size, using the coarsest boundary that works"""
+    if len(text) <= size:
+        return [text]
+    if not separators:
+        return [text[i:i + size] for i in range(0, len(text), size)]
+
+    sep, finer = separators[0], separators[1:]
+    parts = text.split(sep)
+    if len(parts) == 1:
+        return _pieces(text, size, finer)
+
+    pieces = []
+    for i, part in enumerate(parts):
+        if i < len(parts) - 1:
+            part += sep
+        pieces.extend(_pieces(part, size, finer))
+    return pieces
+
+
+def split_into_chunks(text: str, chunk_size: int) -> List[str]:
+    """Pack boundary-aligned pieces greedily into chunks of at most chunk_size characters"""
+    chunks, current = [], ""
+    for piece in _pieces(text, chunk_size, SEPARATORS):
+        if current and len(current) + len(piece) > chunk_size:
+            chunks.append(current)
+            current = ""
+        current += piece
+    chunks.append(current)
+    return [chunk.strip() for chunk in chunks if chunk.strip()]
@@ -1,6 +1,18 @@
 # PDF Parser Tool - Text Extraction
-import pdfplumber
 import os
+from tools.chunker import PAGE_BREAK
+from core.startup_profile import get_startup_profile
+
+_pdfplumber = None
+
+def _load_pdfplumber():
+    """Import pdfplumber on the first PDF rather than at server start"""
+    global _pdfplumber
+    if _pdfplumber is None:
+        with get_startup_profile().lazy_init("pdfplumber"):
+            import pdfplumber
+        _pdfplumber = pdfplumber
+    return _pdfplumber
 
 class PDFParserTool:
     def __init__(self):
@@ -12,12 +24,14 @@ class PDFParserTool:
             if not os.path.exists(file_path):
                 return {"success": False, "error": f"File not found: {file_path}"}
             
-            text = ""
-            with pdfplumber.open(file_path) as pdf:
+            pages = []
+            with _load_pdfplumber().open(file_path) as pdf:
                 for page in pdf.pages:
                     page_text = page.extract_text()
                     if page_text:
-                        text += page_text + "\n"
+                        pages.append(page_text)
+            # Keep page boundaries so long documents can be chunked per page
+            text = f"\n{PAGE_BREAK}".join(pages)
             
             return {
                 "success": True,
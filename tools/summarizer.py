@@ -1,46 +1,121 @@
 # LLM Processor using Gemini REST API
-import requests
-import json
-from config import GEMINI_API_KEY
+import asyncio
+import math
+from typing import List
+from core.gemini_client import get_gemini_client, GeminiAPIError, GeminiUnavailableError
+from core.result_stream import token_sink
+from core.metrics import track_stage, STAGE_ERRORS, LLM_PROMPT_BYTES, LLM_RESPONSE_BYTES
+from core.tracing import start_span
+from tools.chunker import split_into_chunks
+from core.log import get_logger, fields
+from config import LLM_CHUNK_SIZE, LLM_MAP_MAX_PARALLEL, LLM_MAX_CHUNKS, LLM_MAX_CHUNK_SIZE, LLM_MAX_INPUT_CHARS
+
+logger = get_logger("llm")
 
 class LLMProcessor:
     def __init__(self):
-        self.api_key = GEMINI_API_KEY
-        self.api_url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={self.api_key}"
+        self.model = "gemini-2.0-flash"
     
-    def _call_gemini(self, prompt: str) -> str:
-        """Call Gemini API"""
-        try:
-            payload = {"contents": [{"parts": [{"text": prompt}]}]}
-            response = requests.post(self.api_url, json=payload, timeout=30)
-            
-            if response.status_code != 200:
-                print(f"Gemini API Error: {response.status_code} - {response.text}")
-                return self._fallback_response(prompt)
-            
-            result = response.json()
-            if 'candidates' in result and len(result['candidates']) > 0:
-                return result['candidates'][0]['content']['parts'][0]['text']
-            else:
-                print(f"Gemini API: No candidates in response: {result}")
-                return self._fallback_response(prompt)
-                
-        except Exception as e:
-            print(f"Gemini API Exception: {str(e)}")
-            return self._fallback_response(prompt)
+    @property
+    def client(self):
+        """Shared Gemini client, created on the first LLM call"""
+        return get_gemini_client()
     
-    def _fallback_response(self, prompt: str) -> str:
-        """Provide fallback response when Gemini fails"""
-        if "tone" in prompt.lower():
-            return "TONE: Professional\nCLARITY: High\nSUGGESTIONS:\n1. Consider adding more specific examples\n2. Review for conciseness and clarity"
-        else:
-            return "KEY POINTS:\n- Main topic discussed in the content\n- Key insights and findings\n- Important conclusions\n\nOVERVIEW:\nThis content covers important topics with practical insights and actionable information."
+    async def _call_gemini(self, prompt: str, stream: bool = False) -> str:
+        """Call Gemini API; with stream=True partial output also goes to the active token sink"""
+        sink = token_sink.get() if stream else None
+        prompt_bytes = len(prompt.encode("utf-8"))
+        LLM_PROMPT_BYTES.observe(prompt_bytes, model=self.model)
+        with track_stage("llm"), start_span("llm", model=self.model, prompt_bytes=prompt_bytes,
+                                            stream=sink is not None) as span:
+            try:
+                if sink is None:
+                    response = await self.client.generate(prompt, self.model)
+                else:
+                    parts = []
+                    async for delta in self.client.stream(prompt, self.model):
+                        parts.append(delta)
+                        sink(delta)
+                    response = "".join(parts)
+                response_bytes = len(response.encode("utf-8"))
+                LLM_RESPONSE_BYTES.observe(response_bytes, model=self.model)
+                span.set_attribute("response_bytes", response_bytes)
+                return response
+            # Failures are answered below, so count them here rather than via track_stage
+            except GeminiUnavailableError as e:
+                # Overloaded or down: report failure instead of a canned answer
+                STAGE_ERRORS.inc(stage="llm")
+                span.record_error(e)
+                logger.warning("Gemini unavailable: %s", e)
+                return f"Error: {e}"
+            except GeminiAPIError as e:
+                # Bad request, blocked or empty answer: no summary rather than a canned one
+                STAGE_ERRORS.inc(stage="llm")
+                span.record_error(e)
+                logger.warning("Gemini API error: %s", e)
+                return f"Error: {e}"
+            except Exception as e:
+                STAGE_ERRORS.inc(stage="llm")
+                span.record_error(e)
+                logger.error("Gemini API exception: %s", e)
+                return f"Error: {e}"
+    
+    def _chunk(self, text: str, chunk_size: int = None) -> List[str]:
+        """Split text for the map step, growing the chunk size (up to LLM_MAX_CHUNK_SIZE) to stay within LLM_MAX_CHUNKS"""
+        chunk_size = max(chunk_size or LLM_CHUNK_SIZE, math.ceil(len(text) / LLM_MAX_CHUNKS))
+        chunk_size = min(chunk_size, LLM_MAX_CHUNK_SIZE)
+        return split_into_chunks(text, chunk_size)
+    
+    async def _condense(self, text: str, task: str, chunk_size: int = None, max_parallel: int = None) -> str:
+        """Map step: reduce long text to per-chunk notes in parallel; short text is returned as is"""
+        if len(text) > LLM_MAX_INPUT_CHARS:
+            logger.warning("Input of %d chars cut to LLM_MAX_INPUT_CHARS (%d)", len(text), LLM_MAX_INPUT_CHARS)
+            text = text[:LLM_MAX_INPUT_CHARS] + f"\n[Truncated: only the first {LLM_MAX_INPUT_CHARS} characters were processed]"
+        chunks = self._chunk(text, chunk_size)
+        if len(chunks) <= 1:
+            return text
+        
+        slots = asyncio.Semaphore(max_parallel or LLM_MAP_MAX_PARALLEL)
+        
+        async def map_chunk(index: int, chunk: str) -> str:
+            prompt = f"""This is part {index} of {len(chunks)} of a longer document. {task}
+Keep names, figures, dates and obligations exactly as written. Reply NONE if nothing in this part is relevant.
+
+Part {index}:
+{chunk}"""
+            async with slots:
+                return await self._call_gemini(prompt)
+        
+        logger.debug("Map-reduce", extra=fields(chunks=len(chunks), chars=len(text)))
+        partials = await asyncio.gather(*(map_chunk(i, c) for i, c in enumerate(chunks, 1)))
+        
+        # Give failed parts one more pass; a reduce over the rest would be judged on part of the document
+        failed = [i for i, p in enumerate(partials, 1) if p.startswith("Error:")]
+        if failed:
+            retried = await asyncio.gather(*(map_chunk(i, chunks[i - 1]) for i in failed))
+            for i, p in zip(failed, retried):
+                partials[i - 1] = p
+            failed = [i for i in failed if partials[i - 1].startswith("Error:")]
+        if failed:
+            logger.warning("Map step failed", extra=fields(failed_parts=failed, chunks=len(chunks)))
+            return (f"Error: {len(failed)} of {len(chunks)} parts could not be processed "
+                    f"(parts {', '.join(map(str, failed))}): {partials[failed[0] - 1][len('Error:'):].strip()}")
+        notes = [
+            f"[Part {i}/{len(chunks)}]\n{p.strip()}"
+            for i, p in enumerate(partials, 1)
+            if p.strip().upper() != "NONE"
+        ]
+        return "\n\n".join(notes)
     
-    def summarize(self, text: str, max_points: int = 3) -> dict:
-        """Summarize text into key points"""
+    async def summarize(self, text: str, max_points: int = 3, chunk_size: int = None, max_parallel: int = None) -> dict:
+        """Summarize text into key points (long text is map-reduced)"""
+        text = await self._condense(text, "Summarize its key points.", chunk_size, max_parallel)
+        if text.startswith("Error:"):
+            return {"key_points": [], "overview": text, "success": False}
+        
         prompt = f"""Summarize the following text into {max_points} key bullet points and a brief overview.
 
-Text: {text[:3000]}
+Text: {text}
 
 Format your response as:
 KEY POINTS:
@@ -52,7 +127,7 @@ OVERVIEW:
 Brief summary paragraph
 """
         
-        result = self._call_gemini(prompt)
+        result = await self._call_gemini(prompt, stream=True)
         
         if result.startswith("Error:"):
             return {"key_points": [], "overview": result, "success": False}
@@ -75,7 +150,7 @@ Brief summary paragraph
             "success": True
         }
     
-    def analyze_tone(self, text: str) -> dict:
+    async def analyze_tone(self, text: str) -> dict:
         """Analyze tone and provide feedback"""
         prompt = f"""Analyze the tone and quality of this text. Provide:
 1. Tone (Professional/Casual/Formal)
@@ -92,16 +167,10 @@ SUGGESTIONS:
 2. [suggestion 2]
 """
         
-        result = self._call_gemini(prompt)
+        result = await self._call_gemini(prompt)
         
         if result.startswith("Error:"):
-            return {
-                "tone": "Professional", 
-                "clarity": "Medium", 
-                "suggestions": ["Consider reviewing for clarity", "Add more specific details"], 
-                "success": True, 
-                "error": result
-            }
+            return {"tone": None, "clarity": None, "suggestions": [], "error": result, "success": False}
         
         # Parse response
         tone = "Professional"
@@ -135,18 +204,24 @@ SUGGESTIONS:
             "success": True
         }
     
-    def process_with_query(self, content: str, user_query: str) -> dict:
-        """Process content based on user query using LLM"""
+    async def process_with_query(self, content: str, user_query: str, chunk_size: int = None, max_parallel: int = None) -> dict:
+        """Process content based on user query using LLM (long content is map-reduced)"""
+        content = await self._condense(
+            content, f'Extract everything needed to answer this request: "{user_query}".', chunk_size, max_parallel
+        )
+        if content.startswith("Error:"):
+            return {"response": content, "success": False}
+        
         prompt = f"""You are a professional assistant. Provide direct, business-ready responses without conversational openings like "Okay", "Here's", "Based on", etc. Start immediately with the requested information.
 
 User Request: "{user_query}"
 
 Content:
-{content[:5000]}
+{content}
 
 Provide exactly what was requested in a professional, structured format. Be concise and direct."""
         
-        result = self._call_gemini(prompt)
+        result = await self._call_gemini(prompt, stream=True)
         
         # Clean up any remaining casual openings
         cleaned_result = result
@@ -160,3 +235,13 @@ Provide exactly what was requested in a professional, structured format. Be conc
             "response": cleaned_result,
             "success": not result.startswith("Error:")
         }
+
+
+_shared_processor = None
+
+def get_llm_processor() -> LLMProcessor:
+    """Get the shared LLMProcessor (all instances use the same pooled client)"""
+    global _shared_processor
+    if _shared_processor is None:
+        _shared_processor = LLMProcessor()
+    return _shared_processor
@@ -1,10 +1,46 @@
 #!/usr/bin/env python3
 """Unified server for both file and browser triggers"""
 
+from config import SERVER_HOST, SERVER_PORT, SERVER_WORKERS, SESSION_BACKEND, SESSION_DB_PATH
+from config import SHUTDOWN_STREAM_GRACE_SECONDS
+
+# Several worker processes share workflows, events, results and dedupe through SQLite
+SHARED_STATE = SERVER_WORKERS > 1 and SESSION_BACKEND == "sqlite"
+
+def print_banner():
+    print("\n✅ Syntra Server Starting...")
+    print("🌐 Dashboard: http://localhost:8000/dashboard")
+    print("⚡ Workflow automation: Ready")
+    print("📂 Monitoring: ~/Downloads\n")
+
+if __name__ == "__main__" and SHARED_STATE:
+    # This process only supervises the workers; hand off before building the stores, threads and
+    # agents below, which each worker builds for itself when it imports the app by path
+    import uvicorn
+    print_banner()
+    print(f"🧵 Workers: {SERVER_WORKERS} (shared state: {SESSION_DB_PATH})\n")
+    # uvicorn runs the lifespan shutdown (drain and spool) only once connections close; the
+    # /changes and result streams never close on their own, so cut them after a grace period
+    uvicorn.run("unified_server:app", host=SERVER_HOST, port=SERVER_PORT, workers=SERVER_WORKERS,
+                log_level="warning", timeout_graceful_shutdown=SHUTDOWN_STREAM_GRACE_SECONDS)
+    raise SystemExit(0)
+
+from core.startup_profile import get_startup_profile
+from core.log import configure_logging, get_logger, fields, shutdown_logging, get_log_stats
+
+# Queue-backed logging before anything else can log
+configure_logging()
+logger = get_logger("server")
+event_log = get_logger("events")
+
+# Per-module import cost, reported at /startup-stats
+startup_profile = get_startup_profile()
+startup_profile.track_imports()
+
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse, Response, PlainTextResponse
 from core.trigger_manager import TriggerManager
 from agents.intent_parser import IntentParserAgent
 from agents.executor import ExecutorAgent
@@ -16,13 +52,45 @@ from multi_agent.delivery_agent import DeliveryAgent
 from multi_agent.hierarchical_processor import HierarchicalWorkflowProcessor
 from core.workflow_parser import WorkflowParser
 from core.session_service import InMemorySessionService
+from core.sqlite_session_service import SQLiteSessionService
 from core.smart_trigger_service import SmartTriggerService
+from core.event_queue import EventQueue
+from core.event_spool import EventSpool
+from core.idempotency import IdempotencyStore, SharedIdempotencyStore, event_key
+from core.shared_state import ProcessLock
+from core.loop_bridge import LoopBridge
+from core.gemini_client import get_gemini_client, close_gemini_client
+from core.intent_cache import get_intent_cache
+from core.result_stream import ResultStreamHub, token_sink
+from core.list_query import ListQuery, etag_matches
+from core.metrics import REGISTRY, INGEST_EVENTS, INGEST_DROPPED, track_stage
+from core.tracing import get_tracer
+from config import EVENT_QUEUE_MAXSIZE, EVENT_QUEUE_WORKERS, EVENT_QUEUE_RETRY_AFTER
+from config import SHUTDOWN_DRAIN_SECONDS, EVENT_SPOOL_PATH
+from config import TRACE_BUFFER_SIZE
+from config import IDEMPOTENCY_TTL_SECONDS, IDEMPOTENCY_MAX_KEYS, IDEMPOTENCY_DB_PATH, IDEMPOTENCY_DB_TIMEOUT
+from config import WATCHER_LOCK_PATH, REMOTE_RESULT_WAIT_SECONDS
 from typing import Dict, List
 from datetime import datetime
+from contextlib import asynccontextmanager
 import os
 import asyncio
+import json
+import time
+import uuid
+
+startup_profile.stop_tracking()
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start-up before the first request, graceful shutdown after the last"""
+    await startup()
+    try:
+        yield
+    finally:
+        await shutdown()
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -35,45 +103,98 @@ app.add_middleware(
 APP_NAME = "syntra"
 DEFAULT_USER_ID = "user_001"
 user_preferences: Dict = {"default_method": "ask", "email": ""}
-trigger_manager = TriggerManager()
-intent_parser = IntentParserAgent()
-executor = ExecutorAgent()  # Keep for backward compatibility
-workflow_parser = WorkflowParser()
-session_service = InMemorySessionService(APP_NAME)
-smart_trigger_service = SmartTriggerService(trigger_manager)
-
-# Initialize Multi-Agent System
-understanding_agent = UnderstandingAgent()
-trigger_agent = TriggerAgent(trigger_manager)
-action_agent = ActionAgent()
-delivery_agent = DeliveryAgent()
-orchestrator = OrchestratorAgent(
-    understanding_agent=understanding_agent,
-    trigger_agent=trigger_agent,
-    action_agent=action_agent,
-    delivery_agent=delivery_agent
-)
+with startup_profile.phase("parsers"):
+    trigger_manager = TriggerManager()
+    intent_parser = IntentParserAgent()
+    executor = ExecutorAgent()  # Keep for backward compatibility
+    workflow_parser = WorkflowParser()
 
-# Initialize Hierarchical ADK Agent System
-hierarchical_processor = HierarchicalWorkflowProcessor()
+with startup_profile.phase("session_service"):
+    if SESSION_BACKEND == "sqlite":
+        session_service = SQLiteSessionService(APP_NAME, SESSION_DB_PATH, shared=SHARED_STATE)
+    else:
+        session_service = InMemorySessionService(APP_NAME)
+    smart_trigger_service = SmartTriggerService(trigger_manager)
 
-print(f"Server starting: {APP_NAME}")
+# Initialize Multi-Agent System (ADK agents and the LLM client are built on first use)
+with startup_profile.phase("agents"):
+    understanding_agent = UnderstandingAgent()
+    trigger_agent = TriggerAgent(trigger_manager)
+    action_agent = ActionAgent()
+    delivery_agent = DeliveryAgent()
+    orchestrator = OrchestratorAgent(
+        understanding_agent=understanding_agent,
+        trigger_agent=trigger_agent,
+        action_agent=action_agent,
+        delivery_agent=delivery_agent
+    )
+    
+    # Initialize Hierarchical ADK Agent System
+    hierarchical_processor = HierarchicalWorkflowProcessor()
 
-# Track processed events to avoid duplicates
-processed_events = set()
+logger.info("Server starting: %s", APP_NAME)
 
-def handle_trigger_event(event):
-    """Callback for all trigger events with better event formatting"""
-    # Create unique event ID to prevent duplicate processing
-    event_id = f"{event.payload.get('event_type', 'unknown')}_{event.payload.get('email_subject', '')}_{event.payload.get('timestamp', '')}"
-    
-    if event_id in processed_events:
-        print(f"⏭️ Skipping duplicate event: {event_id}")
-        return
-    
-    processed_events.add(event_id)
-    print(f"🔔 CALLBACK TRIGGERED: {event}")
-    print(f"📦 Event payload: {event.payload}")
+# Trigger callbacks fired on watcher threads are handed to the server loop
+loop_bridge = LoopBridge()
+
+# Partial LLM output per result id, served over Server-Sent Events
+result_streams = ResultStreamHub()
+
+# Track processed events to avoid duplicates (across all workers in shared mode)
+if SHARED_STATE:
+    processed_events = SharedIdempotencyStore(IDEMPOTENCY_DB_PATH, ttl_seconds=IDEMPOTENCY_TTL_SECONDS,
+                                              max_entries=IDEMPOTENCY_MAX_KEYS, timeout=IDEMPOTENCY_DB_TIMEOUT)
+else:
+    processed_events = IdempotencyStore(ttl_seconds=IDEMPOTENCY_TTL_SECONDS, max_entries=IDEMPOTENCY_MAX_KEYS)
+
+# Exactly one worker watches the file system; the others only serve HTTP
+watcher_lock = ProcessLock(WATCHER_LOCK_PATH) if SHARED_STATE else None
+
+def owns_file_watcher() -> bool:
+    """Whether this process runs the file watcher"""
+    return watcher_lock is None or watcher_lock.acquired
+
+async def call_dedupe_store(method, *args):
+    """Call the idempotency store, in a thread when it is the shared SQLite one"""
+    if processed_events.blocking:
+        return await asyncio.to_thread(method, *args)
+    return method(*args)
+
+tracer = get_tracer()
+
+# Watcher events have no client to retry them, so a rejection loses them (by source, for /queue-stats)
+dropped_trigger_events: Dict[str, int] = {}
+
+async def handle_trigger_event(event, retryable: bool = False) -> str:
+    """Callback for all trigger events; returns queued, duplicate, rejected or ignored.
+
+    retryable is set when a client gets the rejection and can send the event again (/event);
+    otherwise a rejected event is logged and counted as dropped.
+    """
+    # Joins the trace /event already started; file triggers start their own
+    trace = tracer.current_trace() or tracer.start_trace(event.trigger_type)
+    with tracer.activate(trace), tracer.start_span("ingest", source=event.trigger_type) as span:
+        with track_stage("ingest"):
+            status = await ingest_trigger_event(event)
+        span.set_attribute("status", status)
+    INGEST_EVENTS.inc(source=event.trigger_type, status=status)
+    if status == "rejected" and not retryable:
+        INGEST_DROPPED.inc(source=event.trigger_type)
+        dropped_trigger_events[event.trigger_type] = dropped_trigger_events.get(event.trigger_type, 0) + 1
+        logger.warning("Dropped %s event under backpressure", event.trigger_type, extra=fields(
+            event_type=event.payload.get('event_type'),
+            file_name=event.payload.get('file_name'),
+            trace=trace.trace_id if trace else None))
+    if status != "queued":
+        # Queued events get their one line once processed
+        event_log.info("event %s", status, extra=fields(
+            source=event.trigger_type, event_type=event.payload.get('event_type'),
+            trace=trace.trace_id if trace else None))
+    return status
+
+async def ingest_trigger_event(event) -> str:
+    """Classify, de-duplicate, store and enqueue one trigger event"""
+    logger.debug("Trigger event received", extra=fields(source=event.trigger_type, payload=event.payload))
     
     # Determine event type and format payload
     if 'file_name' in event.payload:
@@ -93,7 +214,7 @@ def handle_trigger_event(event):
         title = 'Unknown Event'
         description = 'Unknown event type'
     
-    print(f"🎯 Detected event type: {event_type} - {title}")
+    logger.debug("Detected event type", extra=fields(event_type=event_type, title=title))
     
     # Ensure file details are properly passed
     enhanced_payload = {
@@ -103,44 +224,78 @@ def handle_trigger_event(event):
         "description": description
     }
     
+    # Dispatch each distinct event exactly once
+    dedupe_key = event_key(enhanced_payload)
+    with tracer.start_span("dedupe") as span:
+        try:
+            is_new = await call_dedupe_store(processed_events.check_and_mark, dedupe_key)
+        except Exception as e:
+            # Dedupe table busy past its timeout: have the client retry rather than risk a double dispatch
+            logger.warning("Dedupe check failed: %s", e)
+            span.record_error(e)
+            return "rejected"
+        span.set_attribute("duplicate", not is_new)
+    if not is_new:
+        logger.debug("Skipping duplicate event", extra=fields(dedupe_key=dedupe_key))
+        return "duplicate"
+    
     event_data = {
         "trigger_type": event.trigger_type,
         "timestamp": event.timestamp.isoformat(),
         "payload": enhanced_payload
     }
     
-    session_service.store_event(event_data)
-    print(f"💾 Event stored: {event_type} - {title}")
+    with tracer.start_span("store"):
+        event_id = session_service.store_event(event_data)
+    tracer.bind_event(event_id)
+    logger.debug("Event stored", extra=fields(event_id=event_id, event_type=event_type))
     
-    # Process event based on type
-    if event_type == 'file_download':
-        print(f"📁 Processing as file download")
-        process_file_event_sync(enhanced_payload)
-    elif event_type in ['email_compose', 'article_read']:
-        print(f"🌐 Processing as browser event")
-        asyncio.create_task(process_event_with_agents(enhanced_payload))
-    else:
-        print(f"❓ Unknown event type: {event_type}")
+    if event_type not in ['file_download', 'email_compose', 'article_read']:
+        logger.debug("Unknown event type, not processing", extra=fields(event_id=event_id))
+        return "ignored"
+    
+    # File and browser events share one async pipeline; the trace id rides along to the worker
+    trace = tracer.current_trace()
+    # A copy: the worker records progress on it, which must not leak into the stored event
+    queued_payload = {**enhanced_payload, "trace_id": trace.trace_id if trace else None}
+    if not event_queue.submit(queued_payload):
+        # Let the client's retry through once there is room again
+        await call_dedupe_store(processed_events.discard, dedupe_key)
+        return "rejected"
+    return "queued"
 
 def setup_triggers():
     """Setup triggers only when workflows exist"""
     # Don't start any triggers by default
-    # Triggers will be started when workflows are added
-    pass
+    # Triggers will be started when workflows are added or restored from the session store
+    for workflow in session_service.get_all_workflows():
+        if workflow.get('status') == 'active':
+            start_trigger_for_workflow(workflow)
 
 # Global trigger tracking
 active_triggers = {}
 
+def on_remote_change(kind: str, op: str, record: Dict):
+    """Start triggers for workflows another worker created (called on the session sync thread)"""
+    if kind == "workflow" and op == "added" and record.get("status") == "active":
+        loop_bridge.call(start_trigger_for_workflow, record)
+
+if SHARED_STATE:
+    session_service.listeners.append(on_remote_change)
+
 def start_trigger_for_workflow(workflow):
     """Start specific trigger based on workflow (avoid duplicates)"""
     trigger_type = workflow.get('trigger_type')
     
     # Check if trigger already exists for this type
     if trigger_type in active_triggers:
-        print(f"♾️ Trigger already active for {trigger_type}")
+        logger.debug("Trigger already active for %s", trigger_type)
         return
     
     if trigger_type == 'file_download':
+        if not owns_file_watcher():
+            logger.info("File watcher runs in another worker, skipping for workflow: %s", workflow['query'])
+            return
         file_config = {
             "type": "file_watcher",
             "folder_path": os.path.expanduser("~/Downloads"),
@@ -149,18 +304,17 @@ def start_trigger_for_workflow(workflow):
             "enabled": True,
             "workflow_id": workflow['id']
         }
-        print(f"🔧 Creating file trigger for: {os.path.expanduser('~/Downloads')}")
         file_trigger = trigger_manager.add_trigger(file_config)
         
         if file_trigger:
-            file_trigger.register_callback(handle_trigger_event)
+            file_trigger.register_callback(loop_bridge.wrap(handle_trigger_event))
             file_trigger.start()
-            print(f"✅ File trigger started and watching Downloads folder")
+            logger.info("File trigger watching %s", file_config["folder_path"])
         else:
-            print(f"❌ Failed to create file trigger")
+            logger.error("Failed to create file trigger")
         
         active_triggers[trigger_type] = file_trigger
-        print(f"📁 Started file trigger for workflow: {workflow['query']}")
+        logger.info("Started file trigger for workflow: %s", workflow['query'])
     
     elif trigger_type == 'email_compose':
         browser_config = {
@@ -171,10 +325,10 @@ def start_trigger_for_workflow(workflow):
             "workflow_id": workflow['id']
         }
         browser_trigger = trigger_manager.add_trigger(browser_config)
-        browser_trigger.register_callback(handle_trigger_event)
+        browser_trigger.register_callback(loop_bridge.wrap(handle_trigger_event))
         browser_trigger.start()
         active_triggers[trigger_type] = browser_trigger
-        print(f"📧 Started email trigger for workflow: {workflow['query']}")
+        logger.info("Started email trigger for workflow: %s", workflow['query'])
     
     elif trigger_type == 'article_read':
         medium_config = {
@@ -185,191 +339,414 @@ def start_trigger_for_workflow(workflow):
             "workflow_id": workflow['id']
         }
         medium_trigger = trigger_manager.add_trigger(medium_config)
-        medium_trigger.register_callback(handle_trigger_event)
+        medium_trigger.register_callback(loop_bridge.wrap(handle_trigger_event))
         medium_trigger.start()
         active_triggers[trigger_type] = medium_trigger
-        print(f"📖 Started medium trigger for workflow: {workflow['query']}")
+        logger.info("Started medium trigger for workflow: %s", workflow['query'])
 
-@app.on_event("startup")
 async def startup():
-    setup_triggers()
+    """Start workers, replay events spooled by the last shutdown, then start triggers"""
+    loop_bridge.attach()
+    event_queue.start()
+    replay_spooled_events()
+    if watcher_lock is not None and watcher_lock.acquire():
+        logger.info("Worker %s owns the file watcher", os.getpid())
+    with startup_profile.phase("triggers"):
+        setup_triggers()
+    startup_profile.mark_ready()
+    logger.info("Ready in %sms (details: /startup-stats)", startup_profile.ready_ms)
+
+async def shutdown():
+    """Stop intake and triggers, drain the queue until the deadline and spool what is left"""
+    logger.info("Shutting down: no longer accepting events")
+    event_queue.close()
+    try:
+        trigger_manager.stop_all()
+    except Exception as e:
+        logger.warning("Failed to stop triggers: %s", e)
+    active_triggers.clear()
+    
+    unfinished = await event_queue.drain(SHUTDOWN_DRAIN_SECONDS)
+    if unfinished:
+        # Trace ids point into this process's trace buffer and mean nothing after a restart
+        event_spool.save([{key: value for key, value in event.items() if key != 'trace_id'} for event in unfinished])
+        logger.info("Spooled %d unprocessed events for the next start", len(unfinished))
+    
+    await close_gemini_client()
+    session_service.close()
+    if watcher_lock is not None:
+        watcher_lock.release()
+    shutdown_logging()
 
 @app.post("/event")
 async def receive_event(event_data: Dict):
     """Receive browser events"""
-    handle_trigger_event(type('Event', (), {
-        'trigger_type': 'BrowserTrigger',
-        'timestamp': __import__('datetime').datetime.now(),
-        'payload': event_data
-    })())
+    trace = tracer.start_trace("BrowserTrigger")
+    with tracer.activate(trace):
+        status = await handle_trigger_event(type('Event', (), {
+            'trigger_type': 'BrowserTrigger',
+            'timestamp': __import__('datetime').datetime.now(),
+            'payload': event_data
+        })(), retryable=True)
+    trace_id = trace.trace_id if trace else None
     
-    asyncio.create_task(process_event_with_agents(event_data))
-    return {"status": "received"}
+    if status == "rejected":
+        return JSONResponse(
+            status_code=429,
+            content={"status": "busy", "message": "Event queue is full, retry later"},
+            headers={"Retry-After": str(EVENT_QUEUE_RETRY_AFTER)}
+        )
+    if status == "duplicate":
+        return {"status": "duplicate", "trace_id": trace_id}
+    return {"status": "received", "trace_id": trace_id}
 
-def process_file_event_sync(event_data: Dict):
-    """Process file event synchronously"""
+async def process_event_with_agents(event_data: Dict):
+    """Process event through agent pipeline, fanning out to every matching workflow"""
+    trace_id = event_data.get('trace_id')
+    # Kept on the queued payload itself, so an event spooled at shutdown skips the workflows it already ran
+    completed = event_data.setdefault('completed_workflows', [])
+    event_data = {key: value for key, value in event_data.items() if key not in ('trace_id', 'completed_workflows')}
+    started = time.perf_counter()
+    with tracer.resume(trace_id), tracer.start_span("process"):
+        outcome = await _process_event(event_data, completed)
+    # The one line per event in the production profile
+    event_log.info("event processed", extra=fields(
+        event_type=event_data.get('event_type'), title=event_data.get('title'), **outcome,
+        ms=round((time.perf_counter() - started) * 1000), trace=trace_id))
+
+async def _process_event(event_data: Dict, completed: List[int]) -> Dict:
+    """Route, extract once, then run every matching workflow not in completed; returns the outcome summary"""
     try:
-        file_name = event_data.get('file_name', 'Unknown file')
-        file_path = event_data.get('file_path', 'Downloads')
-        file_size = event_data.get('size', 0)
+        event_type = event_data.get('event_type', 'unknown')
+        logger.debug("Processing event", extra=fields(event_type=event_type))
         
-        print(f"📁 Processing file event: {file_name} ({file_size} bytes)")
+        # Indexed lookup by trigger type / extension / domain
+        with tracer.start_span("route") as span:
+            matching_workflows = session_service.match_workflows(event_data)
+            span.set_attribute("matched", len(matching_workflows))
+        logger.debug("Found %d matching workflows", len(matching_workflows))
         
-        all_workflows = session_service.get_all_workflows()
-        matching_workflows = [w for w in all_workflows if w['status'] == 'active' and w['trigger_type'] == 'file_download']
+        if completed:
+            # Replay of an event interrupted at shutdown: do not deliver the finished workflows twice
+            matching_workflows = [workflow for workflow in matching_workflows if workflow['id'] not in completed]
+            logger.debug("Skipping %d workflows finished before the restart", len(completed))
         
-        print(f"🔍 Found {len(matching_workflows)} matching workflows")
+        if not matching_workflows:
+            return {"status": "no_match", "workflows": 0}
         
-        if matching_workflows:
-            workflow = matching_workflows[0]
-            print(f"✅ Using workflow: {workflow['query']}")
-            print(f"🔍 Workflow trigger_type: {workflow.get('trigger_type')}")
-            print(f"🔍 Event trigger matching: file_download")
-            
-            # Use LLM processing for all file events
-            intent = {'action': 'process_with_llm', 'intent': 'file_event'}
-            
-            # Ensure all file details and query are passed to executor
-            enhanced_event_data = {
+        if event_type == 'file_download':
+            # Ensure all file details are passed to the agents
+            event_data = {
                 **event_data,
-                'file_name': file_name,
-                'file_path': file_path,
-                'file_size': file_size,
-                'workflow_config': {**workflow.get('config', {}), 'query': workflow['query']}
+                'file_name': event_data.get('file_name', 'Unknown file'),
+                'file_path': event_data.get('file_path', 'Downloads'),
+                'file_size': event_data.get('size', 0)
             }
-            
-            print(f"📝 File workflow query being passed: {workflow['query']}")
-            
-            print(f"🎯 Processing file with Multi-Agent System: {file_name}")
-            
-            # Use orchestrator for multi-agent processing
-            orchestrator_result = asyncio.run(orchestrator.handle_event(
-                enhanced_event_data, 
-                workflow_config=workflow
-            ))
-            
-            # Extract result for compatibility
-            if orchestrator_result.get('status') == 'completed':
-                raw_result = orchestrator_result['results'][0] if orchestrator_result['results'] else {}
-                print(f"🔍 Raw result from orchestrator: {raw_result}")
-                
-                # Extract content from nested result structure
-                content = raw_result.get('result', raw_result.get('content', 'No content generated'))
-                print(f"📝 Extracted content length: {len(str(content))} chars")
-                
-                # Ensure proper result format with all required fields
-                result = {
-                    'type': 'result',
-                    'content': content,
-                    'title': file_name,
-                    'success': raw_result.get('success', True),
-                    'created_at': datetime.now().isoformat(),
-                    'event_type': 'file_download',
-                    'file_size': file_size
-                }
-            else:
-                # Fallback to original executor
-                print(f"🔄 Falling back to original executor")
-                result = executor.execute(intent, enhanced_event_data)
-            
-            session_service.store_result("default_session", result)
-            
-            print(f"📊 File result: {result.get('type')} - Content length: {len(str(result.get('content', '')))} chars")
-            
-            # Email already sent by orchestrator's delivery agent, no need to send again
-            workflow_config = enhanced_event_data.get('workflow_config', {})
-            if workflow_config.get('output_preference') == 'email':
-                print(f"📧 Email already sent by delivery agent")
-            else:
-                print(f"💬 Result ready for popup display")
-        else:
-            print(f"⚠️ No matching workflows found for file event")
-            print(f"🔍 Available workflows: {[(w['id'], w['trigger_type'], w['query']) for w in all_workflows]}")
-            print(f"🔍 Looking for trigger_type: file_download")
-    except Exception as e:
-        print(f"❌ File processing error: {e}")
-        import traceback
-        traceback.print_exc()
+        
+        # Extract (e.g. parse the PDF) once and share it across all workflows
+        content = await action_agent.extract_content(event_data)
+        
+        async def run_and_record(workflow: Dict) -> str:
+            status = await run_workflow(workflow, event_data, content)
+            completed.append(workflow['id'])
+            return status
+        
+        statuses = await asyncio.gather(*(run_and_record(workflow) for workflow in matching_workflows))
+        failed = sum(1 for status in statuses if status != 'complete')
+        return {"status": "failed" if failed else "done", "workflows": len(statuses), "failed": failed}
+    except Exception:
+        logger.exception("Agent pipeline error", extra=fields(event_type=event_data.get('event_type')))
+        return {"status": "error", "workflows": 0}
 
-async def process_event_with_agents(event_data: Dict):
-    """Process event through agent pipeline"""
+async def run_workflow(workflow: Dict, event_data: Dict, content: str = None) -> str:
+    """Run a single workflow against an event, streaming and then storing its result; returns its status"""
+    event_type = event_data.get('event_type', 'unknown')
+    if event_type == 'file_download':
+        title = event_data['file_name']
+    else:
+        title = event_data.get('email_subject', event_data.get('title', 'Workflow Result'))
+    
+    # Publish a placeholder up front so clients can subscribe to /results/{id}/stream
+    result_id = str(uuid.uuid4())
+    placeholder = {
+        'id': result_id,
+        'type': 'result',
+        'status': 'streaming',
+        'content': '',
+        'title': title,
+        'created_at': datetime.now().isoformat(),
+        'event_type': event_type,
+        'workflow_id': workflow['id']
+    }
+    result_streams.open(result_id)
+    session_service.store_result("default_session", placeholder, result_id=result_id)
+    sink_token = token_sink.set(result_streams.sink(result_id))
+    
     try:
-        event_type = event_data.get('event_type', 'unknown')
-        print(f"🌐 Processing browser event: {event_type}")
+        logger.debug("Using workflow", extra=fields(workflow_id=workflow['id'], query=workflow['query']))
         
-        all_workflows = session_service.get_all_workflows()
-        # Match workflow by trigger type
-        matching_workflows = [w for w in all_workflows if w['status'] == 'active' and w['trigger_type'] == event_type]
+        # Pass user query to executor
+        enhanced_event_data = {
+            **event_data,
+            'workflow_config': {**workflow.get('config', {}), 'query': workflow['query']}
+        }
         
-        if matching_workflows:
-            workflow = matching_workflows[0]
-            print(f"✅ Using workflow: {workflow['query']}")
-            
-            # Pass user query to executor
-            enhanced_event_data = {
-                **event_data,
-                'workflow_config': {**workflow.get('config', {}), 'query': workflow['query']}
-            }
-            
-            print(f"🎯 Processing browser event with Multi-Agent System: {event_type}")
-            
-            # Use orchestrator for multi-agent processing
+        logger.debug("Processing with multi-agent system", extra=fields(event_type=event_type, title=title))
+        
+        # Use orchestrator for multi-agent processing
+        with tracer.start_span("workflow", workflow_id=workflow['id'], result_id=result_id):
             orchestrator_result = await orchestrator.handle_event(
                 enhanced_event_data,
-                workflow_config=workflow
+                workflow_config=workflow,
+                content=content
             )
+        
+        # Extract result for compatibility
+        if orchestrator_result.get('status') == 'completed':
+            raw_result = orchestrator_result['results'][0] if orchestrator_result['results'] else {}
+            logger.debug("Raw result from orchestrator", extra=fields(result=raw_result))
             
-            # Extract result for compatibility
-            if orchestrator_result.get('status') == 'completed':
-                raw_result = orchestrator_result['results'][0] if orchestrator_result['results'] else {}
-                print(f"🔍 Raw result from orchestrator: {raw_result}")
-                
-                # Extract content from nested result structure
-                content = raw_result.get('result', raw_result.get('content', 'No content generated'))
-                print(f"📝 Extracted content length: {len(str(content))} chars")
-                
-                # Ensure proper result format with all required fields
-                result = {
-                    'type': 'result',
-                    'content': content,
-                    'title': event_data.get('email_subject', event_data.get('title', 'Workflow Result')),
-                    'success': raw_result.get('success', True),
-                    'created_at': datetime.now().isoformat(),
-                    'event_type': event_type
-                }
-            else:
-                # Fallback to original executor
-                print(f"🔄 Falling back to original executor")
-                intent = {'action': 'process_with_llm', 'intent': 'browser_event'}
-                result = executor.execute(intent, enhanced_event_data)
-            
-            session_service.store_result("default_session", result)
+            # Extract content from nested result structure
+            content = raw_result.get('result', raw_result.get('content', 'No content generated'))
             
-            print(f"📊 Browser result: {result.get('type')} - Content length: {len(str(result.get('content', '')))} chars")
+            # Ensure proper result format with all required fields
+            result = {
+                'type': 'result',
+                'content': content,
+                'title': title,
+                'success': raw_result.get('success', True),
+                'created_at': datetime.now().isoformat(),
+                'event_type': event_type
+            }
+            if event_type == 'file_download':
+                result['file_size'] = event_data['file_size']
         else:
-            print(f"⚠️ No matching workflows found for {event_type} event")
+            # Fallback to original executor
+            logger.debug("Falling back to original executor")
+            intent = {'action': 'process_with_llm', 'intent': 'file_event' if event_type == 'file_download' else 'browser_event'}
+            result = await executor.execute(intent, enhanced_event_data)
+        
+        result['id'] = result_id
+        result['status'] = 'complete'
+        result['workflow_id'] = workflow['id']
+        session_service.update_result(result_id, result)
+        
+        logger.debug("Workflow result stored", extra=fields(
+            workflow_id=workflow['id'], result_id=result_id, chars=len(str(result.get('content', '')))))
+        return 'complete'
     except Exception as e:
-        print(f"❌ Agent error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Workflow failed", extra=fields(workflow_id=workflow.get('id'), result_id=result_id))
+        result = {**placeholder, 'status': 'failed', 'content': f"Processing failed: {e}", 'success': False}
+        session_service.update_result(result_id, result)
+        return 'failed'
+    except asyncio.CancelledError:
+        # Shutdown deadline hit; the event is spooled and this workflow reruns on the next start
+        result = {**placeholder, 'status': 'interrupted', 'content': 'Interrupted by server shutdown', 'success': False}
+        session_service.update_result(result_id, result)
+        raise
+    finally:
+        token_sink.reset(sink_token)
+        stored = session_service.get_result(result_id)
+        result_streams.close(result_id, stored["result"] if stored else placeholder)
+
+# Bounded ingest queue; workers are started on server startup
+event_queue = EventQueue(process_event_with_agents, maxsize=EVENT_QUEUE_MAXSIZE, workers=EVENT_QUEUE_WORKERS)
+
+# Events still queued or running at shutdown, replayed on the next start
+event_spool = EventSpool(EVENT_SPOOL_PATH)
+
+# Point-in-time gauges, read on each /metrics scrape
+REGISTRY.gauge("syntra_queue_depth", "Events waiting in the ingest queue",
+               collect=lambda: {(): event_queue.get_stats()["depth"]})
+REGISTRY.gauge("syntra_stored_items", "Items held by the session store", ["collection"],
+               collect=lambda: {
+                   ("events",): len(session_service.events),
+                   ("results",): len(session_service.results),
+                   ("workflows",): len(session_service.workflows)
+               })
+REGISTRY.gauge("syntra_log_records_dropped", "Log records dropped because the log queue was full",
+               collect=lambda: {(): get_log_stats().get("dropped", 0)})
+
+def replay_spooled_events():
+    """Requeue events left over from the last shutdown (already de-duplicated and stored back then)"""
+    events = event_spool.take()
+    if not events:
+        return
+    overflow = [event for event in events if not event_queue.submit(event)]
+    # Whatever does not fit now waits for the next start rather than being dropped
+    event_spool.save(overflow)
+    logger.info("Replayed %d spooled events (%d kept for later)", len(events) - len(overflow), len(overflow))
+
+@app.get("/queue-stats")
+async def get_queue_stats():
+    """Get event ingest queue statistics"""
+    return {**event_queue.get_stats(), "dropped": dict(dropped_trigger_events), "spool": event_spool.get_stats()}
+
+@app.get("/dedupe-stats")
+async def get_dedupe_stats():
+    """Get event de-duplication statistics"""
+    return processed_events.get_stats()
+
+@app.get("/metrics")
+async def get_metrics():
+    """Per-stage latency histograms, in-flight gauges and error counters in Prometheus text format"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/startup-stats")
+async def get_startup_stats():
+    """Start-up cost per import and init phase, plus components built lazily since"""
+    return startup_profile.get_stats()
+
+@app.get("/llm-stats")
+async def get_llm_stats():
+    """Get Gemini client and response cache statistics"""
+    return {
+        **get_gemini_client().get_stats(),
+        "intent_cache": get_intent_cache().get_stats(),
+        "result_streams": result_streams.get_stats(),
+        "change_feed": session_service.changes.get_stats()
+    }
+
+def list_response(request: Request, collection: str, run_query, **params):
+    """Paginated, filtered, projected list with ETag / If-None-Match (304) support"""
+    try:
+        query = ListQuery(**params)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
+    
+    etag = query.etag(collection, session_service.versions[collection])
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    
+    page = run_query(query)
+    return JSONResponse(
+        content={collection: page["items"], "next_since": page["next_since"], "has_more": page["has_more"]},
+        headers=headers
+    )
 
 @app.get("/events")
-async def get_events():
-    """Get all events"""
-    events = session_service.get_all_events()
-    return {"events": events}
+async def get_events(request: Request, since: int = None, limit: int = None, event_type: str = None,
+                     session: str = None, start: str = None, end: str = None, fields: str = None):
+    """Get events (since/limit cursor, filters, fields projection, ETag)"""
+    return list_response(request, "events", session_service.query_events, since=since, limit=limit,
+                         event_type=event_type, session_id=session, start=start, end=end, fields=fields)
+
+@app.get("/events/{event_id}/trace")
+async def get_event_trace(event_id: str):
+    """Span timeline of one event from ingest to delivery (sampled events, while still buffered)"""
+    trace = tracer.buffer.for_event(event_id)
+    if trace is None:
+        return JSONResponse(status_code=404, content={"error": "No trace for this event (not sampled or expired)"})
+    return trace.to_dict()
+
+@app.get("/traces/{trace_id}")
+async def get_trace(trace_id: str):
+    """Span timeline by the trace_id returned from /event (sampled traces, while still buffered)"""
+    trace = tracer.buffer.get(trace_id)
+    if trace is None:
+        return JSONResponse(status_code=404, content={"error": "No such trace (not sampled or expired)"})
+    return trace.to_dict()
+
+@app.get("/traces")
+async def get_traces(limit: int = 20):
+    """Most recent sampled traces, newest first, without their spans"""
+    traces = [trace.to_dict() for trace in tracer.buffer.recent(max(1, min(limit, TRACE_BUFFER_SIZE)))]
+    return {
+        "traces": [{key: value for key, value in trace.items() if key != "spans"} for trace in traces],
+        "stats": tracer.get_stats()
+    }
 
 @app.get("/results")
-async def get_results():
-    """Get all results"""
-    results = session_service.get_all_results()
-    return {"results": [r["result"] for r in results]}
+async def get_results(request: Request, since: int = None, limit: int = None, event_type: str = None,
+                      session: str = None, workflow_id: int = None, start: str = None, end: str = None,
+                      fields: str = None):
+    """Get results (since/limit cursor, indexed session/workflow/event_type/time filters, projection, ETag)"""
+    return list_response(request, "results", session_service.query_results, since=since, limit=limit,
+                         event_type=event_type, session_id=session, workflow_id=workflow_id,
+                         start=start, end=end, fields=fields)
+
+@app.get("/results/{result_id}/stream")
+async def stream_result(result_id: str):
+    """Stream a result's LLM output as Server-Sent Events (snapshot, token..., done)"""
+    stored = session_service.get_result(result_id)
+    if stored is None:
+        return JSONResponse(status_code=404, content={"error": "Result not found"})
+    
+    async def event_stream():
+        if not result_streams.is_open(result_id):
+            if SHARED_STATE and stored['result'].get('status') == 'streaming':
+                # Another worker is producing it: no tokens here, but wait for its final version
+                async for line in wait_for_remote_result(result_id):
+                    yield line
+                return
+            yield f"event: done\ndata: {json.dumps(stored['result'])}\n\n"
+            return
+        async for event, data in result_streams.subscribe(result_id):
+            if event is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def wait_for_remote_result(result_id: str):
+    """SSE lines for a result still streaming on another worker: keep-alives, then its final 'done'"""
+    deadline = time.monotonic() + REMOTE_RESULT_WAIT_SECONDS
+    # Replaying from the seq taken before the check means an update landing in between is not missed
+    since = session_service.changes.seq
+    current = session_service.get_result(result_id)
+    changes = session_service.changes.subscribe(since)
+    try:
+        while current is not None and current['result'].get('status') == 'streaming':
+            if time.monotonic() >= deadline:
+                # Not 'done': clients keep the placeholder and pick up the final version from /changes
+                yield f"event: pending\ndata: {json.dumps(current['result'])}\n\n"
+                return
+            change = await changes.__anext__()
+            if change is None:
+                yield ": keep-alive\n\n"
+            elif change["kind"] == "resync" or (change["kind"] == "result" and change["data"].get("id") == result_id):
+                current = session_service.get_result(result_id)
+        final = current['result'] if current else {'id': result_id, 'status': 'expired'}
+        yield f"event: done\ndata: {json.dumps(final)}\n\n"
+    finally:
+        await changes.aclose()
+
+@app.get("/changes")
+async def stream_changes(request: Request, since: int = None):
+    """Live feed of event/result/workflow deltas as Server-Sent Events"""
+    # EventSource reconnects send Last-Event-ID; resume from there when the backlog allows.
+    # Ids from another worker or an earlier process cannot be resumed and get a resync instead.
+    if since is None:
+        since = session_service.changes.resume_seq(request.headers.get("last-event-id"))
+    
+    async def event_stream():
+        yield f"event: ready\ndata: {json.dumps({'seq': session_service.changes.seq})}\n\n"
+        async for change in session_service.changes.subscribe(since):
+            if change is None:
+                yield ": keep-alive\n\n"
+            elif change["kind"] == "resync":
+                yield f"event: resync\ndata: {json.dumps(change)}\n\n"
+            else:
+                yield f"id: {session_service.changes.event_id(change)}\nevent: change\ndata: {json.dumps(change)}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.get("/workflows")
-async def get_workflows():
-    """Get all workflows"""
-    workflows = session_service.get_all_workflows()
-    return {"workflows": workflows}
+async def get_workflows(request: Request, since: int = None, limit: int = None, trigger_type: str = None,
+                        session: str = None, start: str = None, end: str = None, fields: str = None):
+    """Get workflows (since/limit cursor, filters, fields projection, ETag)"""
+    return list_response(request, "workflows", session_service.query_workflows, since=since, limit=limit,
+                         event_type=trigger_type, session_id=session, start=start, end=end, fields=fields)
 
 @app.post("/workflow")
 async def add_workflow(workflow_data: Dict):
@@ -378,11 +755,13 @@ async def add_workflow(workflow_data: Dict):
     use_smart = workflow_data.get("use_smart", True)
     use_multi_agent = workflow_data.get("use_multi_agent", True)
     use_hierarchy = workflow_data.get("use_hierarchy", False)
+    # Optional per-workflow map-reduce tuning for long documents
+    chunking = {k: workflow_data[k] for k in ("chunk_size", "max_parallel") if workflow_data.get(k)}
     
     if use_smart:
-        print(f"🧠 Creating smart trigger for: '{query}'")
+        logger.info("Creating smart trigger for: %r", query)
         # Use smart trigger service
-        smart_result = smart_trigger_service.create_trigger_from_query(query)
+        smart_result = await smart_trigger_service.create_trigger_from_query(query)
         
         if smart_result["status"] == "success":
             workflow_config = {
@@ -393,7 +772,8 @@ async def add_workflow(workflow_data: Dict):
                 "config": {
                     "output_preference": smart_result["output_method"],
                     "confidence": smart_result["confidence"],
-                    "smart_created": True
+                    "smart_created": True,
+                    **chunking
                 }
             }
             
@@ -402,7 +782,7 @@ async def add_workflow(workflow_data: Dict):
             # Add to appropriate system
             if use_hierarchy:
                 hierarchy_result = await hierarchical_processor.create_workflow(query)
-                print(f"🏗️ Added workflow to hierarchical ADK system")
+                logger.info("Added workflow to hierarchical ADK system")
             elif use_multi_agent:
                 orchestrator.active_workflows.append({
                     "trigger_type": workflow['trigger_type'],
@@ -410,12 +790,12 @@ async def add_workflow(workflow_data: Dict):
                     "config": workflow['config'],
                     "workflow_id": workflow['id']
                 })
-                print(f"🤖 Added workflow to multi-agent orchestrator")
+                logger.info("Added workflow to multi-agent orchestrator")
             
             # Start trigger using existing method
             start_trigger_for_workflow(workflow)
             
-            print(f"✅ Smart workflow created and trigger started")
+            logger.info("Smart workflow created and trigger started")
             return {
                 "status": "created", 
                 "workflow": workflow,
@@ -423,18 +803,18 @@ async def add_workflow(workflow_data: Dict):
                 "hierarchy_enabled": use_hierarchy
             }
         else:
-            print(f"⚠️ Smart trigger failed: {smart_result['message']}, using traditional")
+            logger.warning("Smart trigger failed: %s, using traditional", smart_result['message'])
     
     # Fallback to traditional workflow creation
-    print(f"🔄 Using traditional workflow parsing")
-    parsed = workflow_parser.parse(query)
+    logger.info("Using traditional workflow parsing")
+    parsed = await workflow_parser.parse(query)
     
     workflow_config = {
         "query": query,
         "trigger_type": parsed["trigger_type"],
         "conditions": parsed["conditions"],
         "actions": parsed["actions"],
-        "config": {**parsed["config"], "smart_created": False}
+        "config": {**parsed["config"], "smart_created": False, **chunking}
     }
     
     workflow = session_service.store_workflow(workflow_config)
@@ -442,7 +822,7 @@ async def add_workflow(workflow_data: Dict):
     # Add to appropriate system
     if use_hierarchy:
         hierarchy_result = await hierarchical_processor.create_workflow(query)
-        print(f"🏗️ Added workflow to hierarchical ADK system")
+        logger.info("Added workflow to hierarchical ADK system")
     elif use_multi_agent:
         orchestrator.active_workflows.append({
             "trigger_type": workflow['trigger_type'],
@@ -450,14 +830,14 @@ async def add_workflow(workflow_data: Dict):
             "config": workflow['config'],
             "workflow_id": workflow['id']
         })
-        print(f"🤖 Added workflow to multi-agent orchestrator")
+        logger.info("Added workflow to multi-agent orchestrator")
     
     # Start trigger for this workflow
     try:
         start_trigger_for_workflow(workflow)
-        print(f"✅ Traditional workflow ready: {workflow['query']}")
+        logger.info("Traditional workflow ready: %s", workflow['query'])
     except Exception as e:
-        print(f"❌ Failed to start trigger: {e}")
+        logger.error("Failed to start trigger: %s", e)
     
     return {"status": "created", "workflow": workflow, "multi_agent_enabled": use_multi_agent, "hierarchy_enabled": use_hierarchy}
 
@@ -475,24 +855,10 @@ async def dashboard():
 
 @app.get("/stats")
 async def get_stats():
-    """Get statistics"""
-    events = session_service.get_all_events()
-    workflows = session_service.get_all_workflows()
-    results = session_service.get_all_results()
-    
-    smart_triggers = smart_trigger_service.get_active_triggers()
-    smart_workflows = [w for w in workflows if w.get('config', {}).get('smart_created', False)]
-    
+    """Get statistics (constant-time snapshot of the session counters)"""
     return {
-        "total_events": len(events),
-        "email_events": sum(1 for e in events if e.get('payload', {}).get('event_type') == 'email_compose'),
-        "file_events": sum(1 for e in events if 'file_name' in e.get('payload', {})),
-        "article_events": 0,
-        "active_workflows": len([w for w in workflows if w['status'] == 'active']),
-        "results_generated": len(results),
-        "smart_triggers": smart_triggers["total"],
-        "smart_workflows": len(smart_workflows),
-        "avg_confidence": sum(w.get('config', {}).get('confidence', 0) for w in smart_workflows) / len(smart_workflows) if smart_workflows else 0
+        **session_service.get_stats(),
+        "smart_triggers": len(smart_trigger_service.created_triggers)
     }
 
 @app.post("/send-email")
@@ -521,7 +887,7 @@ async def create_smart_trigger(trigger_data: Dict):
     if not query:
         return {"status": "error", "message": "Query is required"}
     
-    result = smart_trigger_service.create_trigger_from_query(query)
+    result = await smart_trigger_service.create_trigger_from_query(query)
     
     if result["status"] == "success":
         # Start the trigger
@@ -542,11 +908,13 @@ async def analyze_query(query_data: Dict):
     if not query:
         return {"status": "error", "message": "Query is required"}
     
-    return smart_trigger_service.get_trigger_recommendations(query)
+    return await smart_trigger_service.get_trigger_recommendations(query)
 
 @app.get("/multi-agent-stats")
 async def get_multi_agent_stats():
     """Get multi-agent system statistics"""
+    # orchestrator.active_workflows is per worker and is not synced: events are routed from
+    # session_service.match_workflows and handed over as workflow_config, so it only feeds these stats
     return {
         "orchestrator_active": True,
         "active_workflows": len(orchestrator.active_workflows),
@@ -592,9 +960,10 @@ async def test_hierarchy(test_data: Dict):
         return {"status": "error", "message": str(e)}
 
 if __name__ == "__main__":
-    print("\n✅ Syntra Server Starting...")
-    print("🌐 Dashboard: http://localhost:8000/dashboard")
-    print("⚡ Workflow automation: Ready")
-    print("📂 Monitoring: ~/Downloads\n")
-    
-    uvicorn.run(app, host="0.0.0.0", port=8000, log_level="warning")
\ No newline at end of file
+    # Multi-worker runs were handed off to uvicorn at the top of the module
+    print_banner()
+    if SERVER_WORKERS > 1:
+        print("⚠️ SERVER_WORKERS > 1 needs SESSION_BACKEND = 'sqlite'; running a single worker\n")
+    # Open SSE streams would otherwise hold off the lifespan shutdown (drain and spool) indefinitely
+    uvicorn.run(app, host=SERVER_HOST, port=SERVER_PORT, log_level="warning",
+                timeout_graceful_shutdown=SHUTDOWN_STREAM_GRACE_SECONDS)
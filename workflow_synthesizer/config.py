@@ -11,6 +11,4 @@ GMAIL_DISPLAY_NAME = "Syntra"
 # File monitoring
 DOWNLOADS_PATH = "~/Downloads"
 
-# Session limits
-MAX_EVENTS = 100
-MAX_RESULTS = 50
+# Session limits (MAX_EVENTS, MAX_RESULTS, byte caps) live in the root config.py